@@ -0,0 +1,57 @@
+"""
+Awaitable versions of the gazu task, shot, asset and files functions, for
+asyncio applications. Every request goes through gazu.aioclient, so one
+event loop can keep many requests in flight. Results are not cached, but
+writes still invalidate the cache entries of the synchronous functions
+referencing the written models.
+
+Usage::
+
+    import gazu.aio
+
+    async def main():
+        tasks = await gazu.aio.task.all_tasks_for_shot(shot)
+
+It requires Python 3 and aiohttp.
+"""
+
+from .. import aioclient as raw
+
+from . import asset
+from . import files
+from . import shot
+from . import task
+
+from ..aioclient import AsyncKitsuClient, create_client
+from ..exception import AuthFailedException, ParameterException
+
+client = raw
+default = raw.default_client
+
+
+def get_host(client=default):
+    return raw.get_host(client=client)
+
+
+def set_host(url, client=default):
+    raw.set_host(url, client=client)
+
+
+async def log_in(email, password, client=default):
+    tokens = {}
+    try:
+        tokens = await raw.post(
+            "auth/login",
+            {"email": email, "password": password},
+            client=client,
+        )
+    except ParameterException:
+        pass
+
+    if not tokens or (
+        "login" in tokens and tokens.get("login", False) == False
+    ):
+        raise AuthFailedException
+    else:
+        raw.set_tokens(tokens, client=client)
+    return tokens
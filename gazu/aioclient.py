@@ -0,0 +1,862 @@
+"""
+Asyncio version of gazu.client. It requires Python 3 and aiohttp, which
+is imported only when the first request is sent. This module is not loaded
+by gazu, import it (or gazu.aio) explicitly.
+"""
+
+import asyncio
+import contextlib
+import threading
+import time
+
+from . import client as raw
+from . import encoder
+from . import scheduler
+from .multipart import CHUNK_SIZE, MultipartEncoder
+from .exception import (
+    DownloadFailedException,
+    NotAuthenticatedException,
+    UploadFailedException,
+)
+
+from .client import (
+    build_bulk_report,
+    url_path_join,
+    build_path_with_params,
+    check_status,
+    get_full_url,
+    make_auth_header,
+    get_retry_delay,
+    can_refresh_token,
+    IDEMPOTENT_METHODS,
+)
+
+DEFAULT_POOL_SIZE = 100
+
+
+class AsyncKitsuClient(object):
+    """
+    Asynchronous connection to a Kitsu instance. The HTTP session and its
+    connection pool are created on first use, in the running event loop.
+    When a synchronous client is linked, its host and tokens are used, so
+    gazu.set_host and gazu.log_in apply to both clients.
+
+    Args:
+        host (str): Url of the Kitsu API, like "https://kitsu.com/api".
+        tokens (dict): Authentication tokens to start with.
+        pool_size (int): Maximum number of connections open at the same
+        time.
+        linked_client (KitsuClient): Synchronous client sharing its host
+        and tokens.
+    """
+
+    def __init__(
+        self,
+        host=None,
+        event_host=None,
+        tokens=None,
+        pool_size=DEFAULT_POOL_SIZE,
+        linked_client=None,
+    ):
+        self.linked_client = linked_client
+        if linked_client is None:
+            self._host = host
+            self._event_host = event_host
+            if tokens is None:
+                tokens = {"access_token": "", "refresh_token": ""}
+            self._tokens = tokens
+        self.pool_size = pool_size
+        self.timeout = None
+        self.retry_policy = dict(raw.default_client.retry_policy)
+        self.retry_stats = {
+            "retries": 0,
+            "retried_requests": 0,
+            "failed_requests": 0,
+            "backoff_time": 0.0,
+        }
+        self.stats_lock = threading.Lock()
+        self.session = None
+        self.session_loop = None
+        self.refresh_lock = None
+
+    def __repr__(self):
+        return "<AsyncKitsuClient %s>" % self.host
+
+    def _get_linked_attribute(name):
+        def get_value(self):
+            if self.linked_client is not None:
+                return getattr(self.linked_client, name)
+            return getattr(self, "_" + name)
+
+        def set_value(self, value):
+            if self.linked_client is not None:
+                setattr(self.linked_client, name, value)
+            else:
+                setattr(self, "_" + name, value)
+
+        return property(get_value, set_value)
+
+    host = _get_linked_attribute("host")
+    event_host = _get_linked_attribute("event_host")
+    tokens = _get_linked_attribute("tokens")
+    del _get_linked_attribute
+
+    def get_session(self):
+        """
+        Returns:
+            aiohttp.ClientSession: Session bound to the running event loop.
+            A new one is created when the loop changed.
+        """
+        loop = asyncio.get_running_loop()
+        if (
+            self.session is None
+            or self.session.closed
+            or (
+                self.session_loop is not None and self.session_loop is not loop
+            )
+        ):
+            import aiohttp
+
+            self.session = aiohttp.ClientSession(
+                connector=aiohttp.TCPConnector(limit=self.pool_size),
+                json_serialize=encoder.dumps,
+            )
+            self.session_loop = loop
+            self.refresh_lock = None
+        return self.session
+
+    def get_refresh_lock(self):
+        if self.refresh_lock is None:
+            self.refresh_lock = asyncio.Lock()
+        return self.refresh_lock
+
+    async def close(self):
+        """
+        Close the connections of the client session.
+        """
+        if self.session is not None and not self.session.closed:
+            await self.session.close()
+        self.session = None
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *args):
+        await self.close()
+
+
+def create_client(host, event_host=None, tokens=None, pool_size=100):
+    """
+    Args:
+        host (str): Url of the Kitsu API.
+        event_host (str): Url of the event stream, defaults to the host.
+        tokens (dict): Authentication tokens to start with.
+        pool_size (int): Maximum number of connections open at the same
+        time.
+
+    Returns:
+        AsyncKitsuClient: A new client, independent from the default one.
+    """
+    return AsyncKitsuClient(
+        host, event_host=event_host, tokens=tokens, pool_size=pool_size
+    )
+
+
+default_client = AsyncKitsuClient(linked_client=raw.default_client)
+
+
+def get_host(client=default_client):
+    """
+    Returns:
+        Host on which requests are sent.
+    """
+    return client.host
+
+
+def set_host(new_host, client=default_client):
+    """
+    Set the host on which requests are sent. For a linked client, the host
+    of the synchronous client is changed.
+    """
+    if client.linked_client is not None:
+        raw.set_host(new_host, client=client.linked_client)
+    else:
+        client.host = new_host
+
+
+def set_tokens(new_tokens, client=default_client):
+    """
+    Store authentication tokens to reuse them for all requests. For a
+    linked client, the tokens of the synchronous client are changed.
+
+    Args:
+        new_tokens (dict): Tokens to use for authentication.
+    """
+    if client.linked_client is not None:
+        raw.set_tokens(new_tokens, client=client.linked_client)
+    else:
+        client.tokens = new_tokens
+    return new_tokens
+
+
+def get_zou_url_from_host(client=default_client):
+    """
+    Returns:
+        Zou url, retrieved from host.
+    """
+    return client.host[:-4]
+
+
+class Response(object):
+    """
+    Response whose body is already read. It exposes the attributes of a
+    requests response used by check_status and get_retry_delay.
+    """
+
+    def __init__(self, status_code, headers, text):
+        self.status_code = status_code
+        self.headers = headers
+        self.text = text
+
+    def json(self):
+        return encoder.loads(self.text)
+
+    def release(self):
+        pass
+
+
+def set_pool_size(pool_size, client=default_client):
+    """
+    Set the maximum number of connections open at the same time. It's
+    applied the next time the client session is created.
+
+    Args:
+        pool_size (int): Maximum number of connections, 0 for no limit.
+    """
+    client.pool_size = pool_size
+
+
+def set_timeout(connect=None, read=None, client=default_client):
+    """
+    Set the time allowed to the server to accept connections and to send
+    data. None means no limit, which is the default.
+
+    Args:
+        connect (float): Seconds to wait for the connection to be made.
+        read (float): Seconds to wait between two chunks sent by the server.
+    """
+    if connect is None and read is None:
+        client.timeout = None
+    else:
+        client.timeout = (connect, read)
+
+
+def _get_request_timeout(client):
+    import aiohttp
+
+    if client.timeout is None:
+        return aiohttp.ClientTimeout(total=None)
+    connect, read = client.timeout
+    return aiohttp.ClientTimeout(
+        total=None, sock_connect=connect, sock_read=read
+    )
+
+
+async def refresh_access_token(expired_token=None, client=default_client):
+    """
+    Get a new access token from the API with the stored refresh token. Only
+    one refresh is sent at a time (see gazu.client.refresh_access_token).
+
+    Returns:
+        dict: The client tokens.
+    """
+    async with client.get_refresh_lock():
+        if (
+            expired_token is None
+            or client.tokens.get("access_token") == expired_token
+        ):
+            path = "auth/refresh-token"
+            session = client.get_session()
+            async with session.get(
+                get_full_url(path, client=client),
+                headers={
+                    "Authorization": "Bearer %s"
+                    % client.tokens["refresh_token"]
+                },
+                timeout=_get_request_timeout(client),
+            ) as response:
+                response = Response(
+                    response.status, response.headers, await response.text()
+                )
+            check_status(response, path)
+            client.tokens["access_token"] = response.json()["access_token"]
+    return client.tokens
+
+
+async def _send_request(
+    method,
+    path,
+    retry=None,
+    client=default_client,
+    body=None,
+    stream=False,
+    **kwargs
+):
+    """
+    Send a request to the API, with the same retry and token refresh rules
+    as the synchronous client.
+
+    Args:
+        body (callable): Function building the body of the request. It's
+        called for each attempt, so a streamed body can be sent again.
+        stream (bool): Return the aiohttp response without reading its
+        body. The caller has to release it.
+
+    Returns:
+        Response: The last response received, with its body already read
+        unless stream is True.
+    """
+    import aiohttp
+
+    if retry is None:
+        retry = method in IDEMPOTENT_METHODS
+    url = get_full_url(path, client=client)
+    headers = dict(kwargs.pop("headers", None) or {})
+    policy = client.retry_policy
+    attempt = 0
+    token_refreshed = False
+    while True:
+        access_token = client.tokens.get("access_token")
+        if body is not None:
+            kwargs["data"] = body()
+        try:
+            response = await client.get_session().request(
+                method.upper(),
+                url,
+                headers=dict(make_auth_header(client=client), **headers),
+                timeout=_get_request_timeout(client),
+                **kwargs
+            )
+            status = response.status
+            if not stream:
+                try:
+                    text = await response.text()
+                finally:
+                    response.release()
+                response = Response(status, response.headers, text)
+        except (aiohttp.ClientConnectionError, asyncio.TimeoutError):
+            if not retry or attempt >= policy["max_retries"]:
+                raw._record_retries(client, attempt, failed=True)
+                raise
+            delay = get_retry_delay(attempt, client=client)
+        else:
+            if (
+                status in [401, 422]
+                and not token_refreshed
+                and can_refresh_token(path, client=client)
+            ):
+                token_refreshed = True
+                try:
+                    await refresh_access_token(access_token, client=client)
+                except NotAuthenticatedException:
+                    return response
+                response.release()
+                continue
+            if not retry or status not in policy["statuses"]:
+                raw._record_retries(client, attempt)
+                return response
+            if attempt >= policy["max_retries"]:
+                raw._record_retries(client, attempt, failed=True)
+                return response
+            delay = get_retry_delay(attempt, response, client=client)
+            response.release()
+        attempt += 1
+        with client.stats_lock:
+            client.retry_stats["retries"] += 1
+            client.retry_stats["backoff_time"] += delay
+        await asyncio.sleep(delay)
+
+
+async def get(
+    path, json_response=True, params=None, retry=True, client=default_client
+):
+    """
+    Run a get request toward given path for configured host.
+
+    Returns:
+        The request result.
+    """
+    path = build_path_with_params(path, params)
+    response = await _send_request("get", path, retry=retry, client=client)
+    check_status(response, path)
+    if json_response:
+        return response.json()
+    else:
+        return response.text
+
+
+async def post(path, data, retry=False, client=default_client):
+    """
+    Run a post request toward given path for configured host. It is retried
+    only if *retry* is True.
+
+    Returns:
+        The request result.
+    """
+    response = await _send_request(
+        "post", path, retry=retry, client=client, json=data
+    )
+    check_status(response, path)
+    return response.json()
+
+
+async def put(path, data, retry=True, client=default_client):
+    """
+    Run a put request toward given path for configured host.
+
+    Returns:
+        The request result.
+    """
+    response = await _send_request(
+        "put", path, retry=retry, client=client, json=data
+    )
+    check_status(response, path)
+    return response.json()
+
+
+async def delete(path, params=None, retry=True, client=default_client):
+    """
+    Run a delete request toward given path for configured host.
+
+    Returns:
+        The request result.
+    """
+    path = build_path_with_params(path, params)
+    response = await _send_request("delete", path, retry=retry, client=client)
+    check_status(response, path)
+    return response.text
+
+
+async def fetch_all(path, params=None, client=default_client):
+    """
+    Args:
+        path (str): The path for which we want to retrieve all entries.
+
+    Returns:
+        list: All entries stored in database for a given model.
+    """
+    return await get(url_path_join("data", path), params=params, client=client)
+
+
+async def fetch_first(path, params=None, client=default_client):
+    """
+    Args:
+        path (str): The path for which we want to retrieve the first entry.
+
+    Returns:
+        dict: The first entry for which a model is required.
+    """
+    entries = await get(
+        url_path_join("data", path), params=params, client=client
+    )
+    if len(entries) > 0:
+        return entries[0]
+    else:
+        return None
+
+
+async def fetch_one(model_name, id, client=default_client):
+    """
+    Args:
+        model_name (str): Model type name.
+        id (str): Model instance ID.
+
+    Returns:
+        dict: The model instance matching id and model name.
+    """
+    return await get(url_path_join("data", model_name, id), client=client)
+
+
+async def create(model_name, data, client=default_client):
+    """
+    Create an entry for given model and data.
+
+    Returns:
+        dict: Created entry
+    """
+    return await post(url_path_join("data", model_name), data, client=client)
+
+
+async def upload(
+    path,
+    file_path,
+    data={},
+    extra_files=[],
+    progress_callback=None,
+    chunked=False,
+    retry=False,
+    checksum=None,
+    file_infos=None,
+    priority=None,
+    client=default_client,
+):
+    """
+    Upload file located at *file_path* to given url *path*. The multipart
+    body is streamed from the files, like with gazu.client.upload.
+
+    Args:
+        path (str): The url path to upload file.
+        file_path (str): The file location on the hard drive.
+        data (dict): Form fields sent with the file.
+        extra_files (list): Locations of other files to send.
+        progress_callback (func): Called while the body is sent with the
+        number of bytes sent, the body size and the throughput in bytes per
+        second.
+        chunked (bool): Send the body with chunked transfer encoding instead
+        of announcing its size.
+        retry (bool): Send the whole body again if the connection fails or
+        the server is unavailable (see gazu.client.set_retry_policy).
+        checksum (str): Algorithm of a checksum of the file to compute while
+        it's sent (md5, sha256, xxh64...).
+        file_infos (dict): Filled with the size and the checksum of the
+        uploaded file once it's sent.
+        priority (str): Priority class of the transfer in the process
+        scheduler (see gazu.scheduler).
+
+    Returns:
+        dict: Result sent by the API.
+    """
+    files = raw._build_file_dict(file_path, extra_files)
+    try:
+        body = MultipartEncoder(
+            data,
+            files,
+            progress_callback=progress_callback,
+            checksums=[checksum] if checksum is not None else [],
+        )
+        headers = {"Content-Type": body.content_type}
+        if not chunked:
+            headers["Content-Length"] = str(len(body))
+        async with _transfer(priority):
+            response = await _send_request(
+                "post",
+                path,
+                retry=retry,
+                client=client,
+                body=lambda: _read_body(body),
+                headers=headers,
+            )
+    finally:
+        for file_object in files.values():
+            file_object.close()
+    check_status(response, path)
+    result = response.json()
+    if "message" in result:
+        raise UploadFailedException(result["message"])
+    if file_infos is not None:
+        checksums = body.file_parts["file"].checksums
+        file_infos["size"] = checksums.size
+        file_infos["checksum"] = checksums.hexdigests().get(checksum)
+    return result
+
+
+async def _read_body(body):
+    """
+    Yield the pieces of a multipart body from its start, waiting between
+    them as long as the bandwidth limit of the process requires.
+    """
+    body.seek(0)
+    chunk = body.read(CHUNK_SIZE)
+    while chunk:
+        await _consume(len(chunk))
+        yield chunk
+        chunk = body.read(CHUNK_SIZE)
+
+
+@contextlib.asynccontextmanager
+async def _transfer(priority=None):
+    """
+    Hold a slot of the process scheduler while a transfer runs. Waiting
+    transfers sleep in the event loop until the scheduler wakes them up, so
+    they neither block the loop nor hold a thread.
+    """
+    transfer_scheduler = scheduler.default_scheduler
+    loop = asyncio.get_running_loop()
+    woken = asyncio.Event()
+
+    def wake():
+        try:
+            loop.call_soon_threadsafe(woken.set)
+        except RuntimeError:
+            pass  # The loop is closed, nobody waits for this transfer.
+
+    ticket = transfer_scheduler.enqueue(
+        priority or scheduler.get_thread_priority(), wake
+    )
+    try:
+        while not transfer_scheduler.start(ticket):
+            await woken.wait()
+            woken.clear()
+    except BaseException:
+        transfer_scheduler.cancel(ticket)
+        raise
+    try:
+        yield transfer_scheduler
+    finally:
+        transfer_scheduler.release()
+
+
+async def _consume(size):
+    """
+    Count transferred bytes against the bandwidth limit of the process and
+    sleep if it's exceeded.
+    """
+    delay = scheduler.reserve(size)
+    if delay > 0:
+        await asyncio.sleep(delay)
+
+
+async def download(
+    path,
+    file_path,
+    ranges=1,
+    resume=True,
+    progress_callback=None,
+    checksum=None,
+    priority=None,
+    client=default_client,
+):
+    """
+    Download file located at given url *path* to *file_path*, like
+    gazu.client.download: data are written to a ".part" file renamed once
+    the download is complete, interrupted downloads are resumed, big files
+    can be downloaded through several ranges at once and the file is checked
+    against the checksums sent by the server.
+
+    Args:
+        path (str): The url path to download file from.
+        file_path (str): The location to store the file on the hard drive.
+        ranges (int): Number of ranges downloaded at the same time.
+        resume (bool): Continue the download left by a previous attempt
+        instead of starting over.
+        progress_callback (func): Called after each written chunk with the
+        number of bytes written so far, the file size (None if unknown) and
+        the throughput in bytes per second.
+        checksum (str): Algorithm of the checksum to compute (md5, sha256,
+        xxh64...).
+        priority (str): Priority class of the transfer in the process
+        scheduler (see gazu.scheduler).
+
+    Returns:
+        dict: Size of the file, bytes taken from a previous attempt, number
+        of ranges used, duration of the download in seconds, the checksum
+        and whether the file was verified against server checksums.
+
+    Raises:
+        DownloadFailedException: when the file does not match the size or
+        the checksums announced by the server.
+    """
+    async with _transfer(priority):
+        return await _download_file(
+            path,
+            file_path,
+            ranges,
+            resume,
+            progress_callback,
+            checksum,
+            client,
+        )
+
+
+async def _download_file(
+    path, file_path, ranges, resume, progress_callback, checksum, client
+):
+    part_path = file_path + ".part"
+    state_path = part_path + ".json"
+    state = raw._open_download_state(part_path, state_path, resume)
+    progress = raw._build_progress(state, progress_callback)
+
+    response = await _send_range_request(
+        path, state, state["ranges"][0], client
+    )
+    if response.status == 416 and state["ranges"][0][0] > 0:
+        response.release()
+        return await _download_file(
+            path, file_path, ranges, False, progress_callback, checksum, client
+        )
+    await _check_stream_status(response, path)
+    checksums, is_checksum_streamed = raw._start_download(
+        Response(response.status, response.headers, None),
+        part_path,
+        state_path,
+        state,
+        ranges,
+        progress,
+        checksum,
+    )
+
+    workers = [
+        asyncio.ensure_future(
+            _download_range(
+                path,
+                part_path,
+                state,
+                byte_range,
+                response if index == 0 else None,
+                progress,
+                checksums if is_checksum_streamed else None,
+                client,
+            )
+        )
+        for index, byte_range in enumerate(state["ranges"])
+    ]
+    try:
+        await asyncio.wait(workers)
+        for worker in workers:
+            worker.result()
+    except BaseException:
+        for worker in workers:
+            worker.cancel()
+        raw._save_download_state(state_path, state, progress)
+        raise
+
+    return raw._finish_download(
+        path,
+        file_path,
+        state,
+        progress,
+        checksums,
+        is_checksum_streamed,
+        checksum,
+    )
+
+
+async def _send_range_request(path, state, byte_range, client):
+    headers = {"Accept-Encoding": "identity"}
+    start, end = byte_range
+    if start > 0 or end is not None or state["size"] is None:
+        headers["Range"] = "bytes=%s-%s" % (
+            start,
+            "" if end is None else end - 1,
+        )
+        if state["validator"]:
+            headers["If-Range"] = state["validator"]
+    return await _send_request(
+        "get", path, client=client, stream=True, headers=headers
+    )
+
+
+async def _check_stream_status(response, path):
+    """
+    Read the body of a streamed error response to raise the matching
+    exception (see gazu.client.check_status).
+    """
+    if response.status >= 400:
+        try:
+            text = await response.text()
+        finally:
+            response.release()
+        check_status(Response(response.status, response.headers, text), path)
+
+
+async def _download_range(
+    path, part_path, state, byte_range, response, progress, checksums, client
+):
+    """
+    Write the data of given range at its place in the part file. When the
+    connection drops, the rest of the range is requested again according to
+    the client retry policy.
+    """
+    import aiohttp
+
+    attempt = 0
+    while True:
+        try:
+            if response is None:
+                response = await _send_range_request(
+                    path, state, byte_range, client
+                )
+                await _check_stream_status(response, path)
+                if response.status != 206:
+                    raise DownloadFailedException(
+                        "%s: the server did not send the requested range"
+                        % path
+                    )
+            await _write_range(
+                response, part_path, byte_range, progress, checksums
+            )
+            return
+        except (aiohttp.ClientError, asyncio.TimeoutError):
+            if attempt >= client.retry_policy["max_retries"]:
+                raise
+            await asyncio.sleep(get_retry_delay(attempt, client=client))
+            attempt += 1
+        finally:
+            if response is not None:
+                response.release()
+                response = None
+
+
+async def _write_range(response, part_path, byte_range, progress, checksums):
+    with open(part_path, "r+b") as part_file:
+        part_file.seek(byte_range[0])
+        async for chunk in response.content.iter_chunked(
+            raw.DOWNLOAD_CHUNK_SIZE
+        ):
+            chunk = raw._write_chunk(
+                part_file, chunk, byte_range, progress, checksums
+            )
+            await _consume(len(chunk))
+            if byte_range[1] is not None and byte_range[0] >= byte_range[1]:
+                break
+
+
+async def run_bulk(function, items, file_paths=[], max_workers=4):
+    """
+    Await given coroutine function for each item, with at most max_workers
+    items processed at the same time. A failing item does not stop the
+    others: its error is reported instead.
+
+    Returns:
+        dict: Result or error of each item, number of succeeded and failed
+        items, bytes transferred, duration and throughput (see
+        gazu.client.run_bulk).
+    """
+    start = time.time()
+    semaphore = asyncio.Semaphore(max(1, max_workers))
+
+    async def run(item):
+        async with semaphore:
+            try:
+                result = await function(*item)
+                return {"item": item, "result": result, "error": None}
+            except Exception as exception:
+                return {"item": item, "result": None, "error": exception}
+
+    results = await asyncio.gather(*[run(item) for item in items])
+    return build_bulk_report(list(results), file_paths, time.time() - start)
+
+
+async def get_api_version(client=default_client):
+    """
+    Returns:
+        str: Current version of the API.
+    """
+    return (await get("", client=client))["version"]
+
+
+async def get_current_user(client=default_client):
+    """
+    Returns:
+        dict: User database information for user linked to auth tokens.
+    """
+    return (await get("auth/authenticated", client=client))["user"]
+
+
+async def import_data(model_name, data, client=default_client):
+    """
+    Args:
+        model_name (str): The data model to import
+        data (dict): The data to import
+    """
+    return await post("/import/kitsu/%s" % model_name, data, client=client)
@@ -1,27 +1,29 @@
 from .helpers import normalize_model_parameter
 
-from . import client
+from . import client as raw
 from . import project as gazu_project
 
 from .sorting import sort_by_name
 
-from .cache import cache
+from .cache import cache, write_through
+
+default = raw.default_client
 
 
 @cache
-def all_assets_for_open_projects():
+def all_assets_for_open_projects(client=default):
     """
     Returns:
         list: Assets stored in the database for open projects.
     """
     all_assets = []
-    for project in gazu_project.all_open_projects():
-        all_assets.extend(all_assets_for_project(project))
+    for project in gazu_project.all_open_projects(client=client):
+        all_assets.extend(all_assets_for_project(project, client=client))
     return sort_by_name(all_assets)
 
 
-@cache
-def all_assets_for_project(project):
+@cache(key_by_id=True)
+def all_assets_for_project(project, client=default):
     """
     Args:
         project (str / dict): The project dict or the project ID.
@@ -32,15 +34,15 @@ def all_assets_for_project(project):
     project = normalize_model_parameter(project)
 
     if project is None:
-        return sort_by_name(client.fetch_all("assets/all"))
+        return sort_by_name(raw.fetch_all("assets/all", client=client))
     else:
         return sort_by_name(
-            client.fetch_all("projects/%s/assets" % project["id"])
+            raw.fetch_all("projects/%s/assets" % project["id"], client=client)
         )
 
 
-@cache
-def all_assets_for_episode(episode):
+@cache(key_by_id=True)
+def all_assets_for_episode(episode, client=default):
     """
     Args:
         episode (str / dict): The episode dict or the episode ID.
@@ -51,12 +53,12 @@ def all_assets_for_episode(episode):
     episode = normalize_model_parameter(episode)
 
     return sort_by_name(
-        client.fetch_all("assets", {"source_id": episode["id"]})
+        raw.fetch_all("assets", {"source_id": episode["id"]}, client=client)
     )
 
 
-@cache
-def all_assets_for_shot(shot):
+@cache(key_by_id=True)
+def all_assets_for_shot(shot, client=default):
     """
     Args:
         shot (str / dict): The shot dict or the shot ID.
@@ -65,11 +67,13 @@ def all_assets_for_shot(shot):
         list: Assets stored in the database for given shot.
     """
     shot = normalize_model_parameter(shot)
-    return sort_by_name(client.fetch_all("shots/%s/assets" % shot["id"]))
+    return sort_by_name(
+        raw.fetch_all("shots/%s/assets" % shot["id"], client=client)
+    )
 
 
-@cache
-def all_assets_for_project_and_type(project, asset_type):
+@cache(key_by_id=True)
+def all_assets_for_project_and_type(project, asset_type, client=default):
     """
     Args:
         project (str / dict): The project dict or the project ID.
@@ -86,12 +90,12 @@ def all_assets_for_project_and_type(project, asset_type):
     path = "projects/{project_id}/asset-types/{asset_type_id}/assets"
     path = path.format(project_id=project_id, asset_type_id=asset_type_id)
 
-    assets = client.fetch_all(path)
+    assets = raw.fetch_all(path, client=client)
     return sort_by_name(assets)
 
 
-@cache
-def get_asset_by_name(project, name, asset_type=None):
+@cache(key_by_id=True)
+def get_asset_by_name(project, name, asset_type=None, client=default):
     """
     Args:
         project (str / dict): The project dict or the project ID.
@@ -113,11 +117,11 @@ def get_asset_by_name(project, name, asset_type=None):
             "name": name,
             "entity_type_id": asset_type["id"],
         }
-    return client.fetch_first(path, params)
+    return raw.fetch_first(path, params, client=client)
 
 
 @cache
-def get_asset(asset_id):
+def get_asset(asset_id, client=default):
     """
     Args:
         asset_id (str): Id of claimed asset.
@@ -125,11 +129,11 @@ def get_asset(asset_id):
     Returns:
         dict: Asset matching given ID.
     """
-    return client.fetch_one("assets", asset_id)
+    return raw.fetch_one("assets", asset_id, client=client)
 
 
 @cache
-def get_asset_url(asset):
+def get_asset_url(asset, client=default):
     """
     Args:
         asset (str / dict): The asset dict or the asset ID.
@@ -140,14 +144,20 @@ def get_asset_url(asset):
     asset = normalize_model_parameter(asset)
     path = "{host}/productions/{project_id}/assets/{asset_id}/"
     return path.format(
-        host=client.get_zou_url_from_host(),
+        host=raw.get_zou_url_from_host(client=client),
         project_id=asset["project_id"],
         asset_id=asset["id"],
     )
 
 
 def new_asset(
-    project, asset_type, name, description="", extra_data={}, episode=None
+    project,
+    asset_type,
+    name,
+    description="",
+    extra_data={},
+    episode=None,
+    client=default,
 ):
     """
     Create a new asset in the database for given project and asset type.
@@ -172,17 +182,19 @@ def new_asset(
     if episode is not None:
         data["episode_id"] = episode["id"]
 
-    asset = get_asset_by_name(project, name, asset_type)
+    asset = get_asset_by_name(project, name, asset_type, client=client)
     if asset is None:
-        asset = client.post(
+        asset = raw.post(
             "data/projects/%s/asset-types/%s/assets/new"
             % (project["id"], asset_type["id"]),
             data,
+            client=client,
         )
+        write_through("asset:new", asset, client=client)
     return asset
 
 
-def update_asset(asset):
+def update_asset(asset, client=default):
     """
     Save given asset data into the API. It assumes that the asset already
     exists.
@@ -192,10 +204,14 @@ def update_asset(asset):
     """
     if "episode_id" in asset:
         asset["source_id"] = asset["episode_id"]
-    return client.put("data/entities/%s" % asset["id"], asset)
+    return write_through(
+        "asset:update",
+        raw.put("data/entities/%s" % asset["id"], asset, client=client),
+        client=client,
+    )
 
 
-def remove_asset(asset, force=False):
+def remove_asset(asset, force=False, client=default):
     """
     Remove given asset from database.
 
@@ -207,20 +223,22 @@ def remove_asset(asset, force=False):
     params = {}
     if force:
         params = {"force": "true"}
-    return client.delete(path, params)
+    result = raw.delete(path, params, client=client)
+    write_through("asset:delete", asset, client=client)
+    return result
 
 
 @cache
-def all_asset_types():
+def all_asset_types(client=default):
     """
     Returns:
         list: Asset types stored in the database.
     """
-    return sort_by_name(client.fetch_all("asset-types"))
+    return sort_by_name(raw.fetch_all("asset-types", client=client))
 
 
-@cache
-def all_asset_types_for_project(project):
+@cache(key_by_id=True)
+def all_asset_types_for_project(project, client=default):
     """
     Args:
         project (str / dict): The project dict or the project ID.
@@ -229,12 +247,12 @@ def all_asset_types_for_project(project):
         list: Asset types from assets listed in given project.
     """
     return sort_by_name(
-        client.fetch_all("projects/%s/asset-types" % project["id"])
+        raw.fetch_all("projects/%s/asset-types" % project["id"], client=client)
     )
 
 
-@cache
-def all_asset_types_for_shot(shot):
+@cache(key_by_id=True)
+def all_asset_types_for_shot(shot, client=default):
     """
     Args:
         shot (str / dict): The shot dict or the shot ID.
@@ -242,11 +260,13 @@ def all_asset_types_for_shot(shot):
     Returns:
         list: Asset types from assets casted in given shot.
     """
-    return sort_by_name(client.fetch_all("shots/%s/asset-types" % shot["id"]))
+    return sort_by_name(
+        raw.fetch_all("shots/%s/asset-types" % shot["id"], client=client)
+    )
 
 
 @cache
-def get_asset_type(asset_id):
+def get_asset_type(asset_id, client=default):
     """
     Args:
         asset_type_id (str): Id of claimed asset type.
@@ -254,11 +274,11 @@ def get_asset_type(asset_id):
     Returns:
         dict: Asset Type matching given ID.
     """
-    return client.fetch_one("asset-types", asset_id)
+    return raw.fetch_one("asset-types", asset_id, client=client)
 
 
 @cache
-def get_asset_type_by_name(name):
+def get_asset_type_by_name(name, client=default):
     """
     Args:
         asset_type_id (str): Id of claimed asset type.
@@ -266,10 +286,10 @@ def get_asset_type_by_name(name):
     Returns:
         dict: Asset Type matching given name.
     """
-    return client.fetch_first("entity-types", {"name": name})
+    return raw.fetch_first("entity-types", {"name": name}, client=client)
 
 
-def new_asset_type(name):
+def new_asset_type(name, client=default):
     """
     Create a new asset type in the database.
 
@@ -280,13 +300,14 @@ def new_asset_type(name):
         (dict): Created asset type.
     """
     data = {"name": name}
-    asset_type = client.fetch_first("entity-types", {"name": name})
+    asset_type = raw.fetch_first("entity-types", {"name": name}, client=client)
     if asset_type is None:
-        asset_type = client.create("entity-types", data)
+        asset_type = raw.create("entity-types", data, client=client)
+        write_through("asset-type:new", asset_type, client=client)
     return asset_type
 
 
-def update_asset_type(asset_type):
+def update_asset_type(asset_type, client=default):
     """
     Save given asset type data into the API. It assumes that the asset type
     already exists.
@@ -295,10 +316,15 @@ def update_asset_type(asset_type):
         asset_type (dict): Asset Type to save.
     """
     data = {"name": asset_type["name"]}
-    return client.put("data/asset-types/%s" % asset_type["id"], data)
+    return write_through(
+        "asset-type:update",
+        raw.put("data/asset-types/%s" % asset_type["id"], data, client=client),
+        readers=[get_asset_type],
+        client=client,
+    )
 
 
-def remove_asset_type(asset_type):
+def remove_asset_type(asset_type, client=default):
     """
     Remove given asset type from database.
 
@@ -306,11 +332,15 @@ def remove_asset_type(asset_type):
         asset_type (dict): Asset type to remove.
     """
     asset_type = normalize_model_parameter(asset_type)
-    return client.delete("data/asset-types/%s" % asset_type["id"])
+    result = raw.delete(
+        "data/asset-types/%s" % asset_type["id"], client=client
+    )
+    write_through("asset-type:delete", asset_type, client=client)
+    return result
 
 
 @cache
-def get_asset_instance(asset_instance_id):
+def get_asset_instance(asset_instance_id, client=default):
     """
     Args:
         asset_instance_id (str): Id of claimed asset instance.
@@ -318,11 +348,11 @@ def get_asset_instance(asset_instance_id):
     Returns:
         dict: Asset Instance matching given ID.
     """
-    return client.fetch_one("asset-instances", asset_instance_id)
+    return raw.fetch_one("asset-instances", asset_instance_id, client=client)
 
 
-@cache
-def all_shot_asset_instances_for_asset(asset):
+@cache(key_by_id=True)
+def all_shot_asset_instances_for_asset(asset, client=default):
     """
     Args:
         asset (str / dict): The asset dict or the asset ID.
@@ -331,10 +361,12 @@ def all_shot_asset_instances_for_asset(asset):
         list: Asset instances existing for a given asset.
     """
     asset = normalize_model_parameter(asset)
-    return client.fetch_all("assets/%s/shot-asset-instances" % asset["id"])
+    return raw.fetch_all(
+        "assets/%s/shot-asset-instances" % asset["id"], client=client
+    )
 
 
-def enable_asset_instance(asset_instance):
+def enable_asset_instance(asset_instance, client=default):
     """
     Set active flag of given asset instance to True.
 
@@ -343,10 +375,16 @@ def enable_asset_instance(asset_instance):
     """
     asset_instance = normalize_model_parameter(asset_instance)
     data = {"active": True}
-    return client.put("asset-instances/%s" % asset_instance["id"], data)
+    return write_through(
+        "asset-instance:update",
+        raw.put(
+            "asset-instances/%s" % asset_instance["id"], data, client=client
+        ),
+        client=client,
+    )
 
 
-def disable_asset_instance(asset_instance):
+def disable_asset_instance(asset_instance, client=default):
     """
     Set active flag of given asset instance to False.
 
@@ -355,11 +393,17 @@ def disable_asset_instance(asset_instance):
     """
     asset_instance = normalize_model_parameter(asset_instance)
     data = {"active": False}
-    return client.put("asset-instances/%s" % asset_instance["id"], data)
+    return write_through(
+        "asset-instance:update",
+        raw.put(
+            "asset-instances/%s" % asset_instance["id"], data, client=client
+        ),
+        client=client,
+    )
 
 
-@cache
-def all_scene_asset_instances_for_asset(asset):
+@cache(key_by_id=True)
+def all_scene_asset_instances_for_asset(asset, client=default):
     """
     Args:
         asset (str / dict): The asset dict or the asset ID.
@@ -368,11 +412,13 @@ def all_scene_asset_instances_for_asset(asset):
         list: Scene asset instances existing for a given asset.
     """
     asset = normalize_model_parameter(asset)
-    return client.fetch_all("assets/%s/scene-asset-instances" % asset["id"])
+    return raw.fetch_all(
+        "assets/%s/scene-asset-instances" % asset["id"], client=client
+    )
 
 
-@cache
-def all_asset_instances_for_shot(shot):
+@cache(key_by_id=True)
+def all_asset_instances_for_shot(shot, client=default):
     """
     Args:
         shot (str / dict): The shot dict or the shot ID.
@@ -380,11 +426,13 @@ def all_asset_instances_for_shot(shot):
     Returns:
         list: Asset instances existing for a given shot.
     """
-    return client.fetch_all("shots/%s/asset-instances" % shot["id"])
+    return raw.fetch_all(
+        "shots/%s/asset-instances" % shot["id"], client=client
+    )
 
 
-@cache
-def all_asset_instances_for_asset(asset):
+@cache(key_by_id=True)
+def all_asset_instances_for_asset(asset, client=default):
     """
     Args:
         asset (str / dict): The asset dict or the asset ID.
@@ -393,10 +441,14 @@ def all_asset_instances_for_asset(asset):
         list: Asset instances existing for a given asset.
     """
     asset = normalize_model_parameter(asset)
-    return client.fetch_all("assets/%s/asset-asset-instances" % asset["id"])
+    return raw.fetch_all(
+        "assets/%s/asset-asset-instances" % asset["id"], client=client
+    )
 
 
-def new_asset_asset_instance(asset, asset_to_instantiate, description=""):
+def new_asset_asset_instance(
+    asset, asset_to_instantiate, description="", client=default
+):
     """
     Creates a new asset instance for given asset. The instance number is
     automatically generated (increment highest number).
@@ -415,6 +467,10 @@ def new_asset_asset_instance(asset, asset_to_instantiate, description=""):
         "asset_to_instantiate_id": asset_to_instantiate["id"],
         "description": description,
     }
-    return client.post(
-        "data/assets/%s/asset-asset-instances" % asset["id"], data
+    asset_instance = raw.post(
+        "data/assets/%s/asset-asset-instances" % asset["id"],
+        data,
+        client=client,
     )
+    write_through("asset:update", asset, client=client)
+    return asset_instance
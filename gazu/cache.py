@@ -1,21 +1,996 @@
 import copy
 import datetime
-import json
+import functools
+import hashlib
+import os
+import sys
+import sqlite3
+import threading
+import time
 
-from functools import wraps
+from collections import OrderedDict, deque
+from multiprocessing.pool import ThreadPool
 
-cache_settings = {"enabled": False}
+from . import client
+from . import encoder
+from . import events
+from .helpers import normalize_model_parameter
+
+try:
+    string_types = basestring
+except NameError:
+    string_types = str
+
+cache_settings = {
+    "enabled": False,
+    "read_only": False,
+    "invalidations": 0,
+    "memory_budget": 0,
+}
 cached_functions = []
+invalidation_lock = threading.Lock()
+recent_invalidations = deque(maxlen=1000)
+
+# Cached functions listing entities of a given kind. They are cleared when an
+# entity of this kind is created or deleted, because the new entity is not
+# referenced yet by their stored results.
+event_invalidations = {
+    "asset:new": [
+        "gazu.asset.all_assets_for_open_projects",
+        "gazu.asset.all_assets_for_project",
+        "gazu.asset.all_assets_for_episode",
+        "gazu.asset.all_assets_for_shot",
+        "gazu.asset.all_assets_for_project_and_type",
+        "gazu.asset.get_asset_by_name",
+    ],
+    "shot:new": [
+        "gazu.shot.all_shots_for_project",
+        "gazu.shot.all_shots_for_sequence",
+        "gazu.shot.get_shot_by_name",
+    ],
+    "sequence:new": [
+        "gazu.shot.all_sequences_for_project",
+        "gazu.shot.all_sequences_for_episode",
+        "gazu.shot.get_sequence_by_name",
+    ],
+    "episode:new": [
+        "gazu.shot.all_episodes_for_project",
+        "gazu.shot.get_episode_by_name",
+    ],
+    "task:new": [
+        "gazu.task.all_tasks_for_shot",
+        "gazu.task.all_tasks_for_sequence",
+        "gazu.task.all_tasks_for_scene",
+        "gazu.task.all_tasks_for_asset",
+        "gazu.task.all_tasks_for_episode",
+        "gazu.task.all_shot_tasks_for_sequence",
+        "gazu.task.all_shot_tasks_for_episode",
+        "gazu.task.all_tasks_for_task_status",
+        "gazu.task.all_tasks_for_task_type",
+        "gazu.task.all_task_types_for_shot",
+        "gazu.task.all_task_types_for_asset",
+        "gazu.task.all_task_types_for_scene",
+        "gazu.task.all_task_types_for_sequence",
+        "gazu.task.all_task_types_for_episode",
+        "gazu.task.all_tasks_for_entity_and_task_type",
+        "gazu.task.all_tasks_for_person",
+        "gazu.task.get_task_by_name",
+    ],
+    "output-file:new": [
+        "gazu.files.get_last_output_files_for_entity",
+        "gazu.files.get_last_output_files_for_asset_instance",
+        "gazu.files.get_output_file_by_path",
+    ],
+    "working-file:new": [
+        "gazu.files.get_all_working_files_for_entity",
+        "gazu.files.get_working_files_for_task",
+        "gazu.files.get_last_working_files",
+        "gazu.files.get_last_working_file_revision",
+    ],
+    "preview-file:new": [
+        "gazu.shot.all_previews_for_shot",
+        "gazu.files.get_all_preview_files_for_task",
+    ],
+}
+for model_name in ["asset", "shot", "sequence", "episode", "task"]:
+    event_invalidations["%s:update" % model_name] = []
+    event_invalidations["%s:delete" % model_name] = event_invalidations[
+        "%s:new" % model_name
+    ]
+event_invalidations["output-file:update"] = []
+event_invalidations["working-file:update"] = []
+event_invalidations["task:status-changed"] = []
+event_invalidations["task:assign"] = ["gazu.task.all_tasks_for_person"]
+event_invalidations["task:unassign"] = ["gazu.task.all_tasks_for_person"]
+event_invalidations["comment:new"] = []
+event_invalidations["task-type:new"] = ["gazu.task.all_task_types"]
+event_invalidations["task-status:new"] = ["gazu.task.all_task_statuses"]
+event_invalidations["asset-type:new"] = [
+    "gazu.asset.all_asset_types",
+    "gazu.asset.all_asset_types_for_project",
+    "gazu.asset.all_asset_types_for_shot",
+]
+event_invalidations["output-type:new"] = ["gazu.files.all_output_types"]
+
+# Cached functions returning the same model as client.fetch_one for a given
+# model name. They let client.fetch_many use and fill the cache.
+model_readers = {
+    "assets": "gazu.asset.get_asset",
+    "asset-types": "gazu.asset.get_asset_type",
+    "asset-instances": "gazu.asset.get_asset_instance",
+    "entities": "gazu.entity.get_entity",
+    "entity-types": "gazu.entity.get_entity_type",
+    "episodes": "gazu.shot.get_episode",
+    "file-status": "gazu.files.get_file_status",
+    "output-types": "gazu.files.get_output_type",
+    "persons": "gazu.person.get_person",
+    "projects": "gazu.project.get_project",
+    "scenes": "gazu.scene.get_scene",
+    "sequences": "gazu.shot.get_sequence",
+    "shots": "gazu.shot.get_shot",
+    "softwares": "gazu.files.get_software",
+    "task-types": "gazu.task.get_task_type",
+    "working-files": "gazu.files.get_working_file",
+}
+
+
+class ReadOnlyDict(dict):
+    """
+    Dict returned by cached functions when read-only mode is enabled. Any
+    attempt to modify it raises a TypeError. Use copy.deepcopy to get a
+    mutable version of it.
+    """
+
+    def _read_only(self, *args, **kwargs):
+        raise TypeError(
+            "Cached values are read-only, use copy.deepcopy to modify them."
+        )
+
+    __setitem__ = _read_only
+    __delitem__ = _read_only
+    __ior__ = _read_only
+    clear = _read_only
+    pop = _read_only
+    popitem = _read_only
+    setdefault = _read_only
+    update = _read_only
+
+    def __copy__(self):
+        return dict(self)
+
+    def __deepcopy__(self, memo):
+        return dict(
+            (copy.deepcopy(key, memo), copy.deepcopy(value, memo))
+            for key, value in self.items()
+        )
+
+    def __reduce__(self):
+        return (ReadOnlyDict, (dict(self),))
+
+
+class ReadOnlyList(list):
+    """
+    List returned by cached functions when read-only mode is enabled. Any
+    attempt to modify it raises a TypeError. Use copy.deepcopy to get a
+    mutable version of it.
+    """
+
+    def _read_only(self, *args, **kwargs):
+        raise TypeError(
+            "Cached values are read-only, use copy.deepcopy to modify them."
+        )
 
+    __setitem__ = _read_only
+    __delitem__ = _read_only
+    __iadd__ = _read_only
+    __imul__ = _read_only
+    __setslice__ = _read_only
+    __delslice__ = _read_only
+    append = _read_only
+    clear = _read_only
+    extend = _read_only
+    insert = _read_only
+    pop = _read_only
+    remove = _read_only
+    reverse = _read_only
+    sort = _read_only
 
-def enable():
+    def __copy__(self):
+        return list(self)
+
+    def __deepcopy__(self, memo):
+        return [copy.deepcopy(value, memo) for value in self]
+
+    def __reduce__(self):
+        return (ReadOnlyList, (list(self),))
+
+
+class MemoryBackend(object):
+    """
+    Default cache storage. Entries are stored in memory, in one ordered dict
+    per cached function, the least recently used entry being the first one.
+    An index maps each tag (model ID) to the entries referencing it.
+
+    The approximate size of every entry is tracked too. When a memory budget
+    is set (see set_memory_budget), entries are evicted among all cached
+    functions until the budget is respected. Candidates are the least
+    recently used entries, the biggest of them is evicted first.
+    """
+
+    eviction_candidates = 8
+
+    def __init__(self):
+        self.stores = {}
+        self.tags = {}
+        self.recency = OrderedDict()
+        self.namespace_bytes = {}
+        self.total_bytes = 0
+        self.lock = threading.Lock()
+
+    def get_store(self, namespace):
+        if namespace not in self.stores:
+            self.stores[namespace] = OrderedDict()
+            self.namespace_bytes[namespace] = 0
+        return self.stores[namespace]
+
+    def get(self, namespace, key):
+        """
+        Returns:
+            dict: Entry stored for given key (None if there is no entry). The
+            entry is flagged as the most recently used one.
+        """
+        with self.lock:
+            store = self.get_store(namespace)
+            entry = store.get(key)
+            if entry is not None:
+                mark_as_recently_used(store, key)
+                mark_as_recently_used(self.recency, (namespace, key))
+            return entry
+
+    def set(self, namespace, key, entry, maxsize):
+        """
+        Store given entry and evict least recently used entries if the store
+        contains more than maxsize entries or if the memory budget is
+        exceeded. An entry bigger than the whole budget is not stored.
+        """
+        with self.lock:
+            store = self.get_store(namespace)
+            self._remove(namespace, store, key)
+            size = entry.get("size", 0)
+            budget = cache_settings["memory_budget"]
+            if budget > 0 and size > budget:
+                return
+            store[key] = entry
+            self.recency[(namespace, key)] = size
+            self.namespace_bytes[namespace] += size
+            self.total_bytes += size
+            for tag in entry.get("tags", []):
+                self.tags.setdefault(tag, set()).add((namespace, key))
+            self._remove_oldest_entries(namespace, store, maxsize)
+            self._respect_memory_budget((namespace, key))
+
+    def delete(self, namespace, key):
+        with self.lock:
+            self._remove(namespace, self.get_store(namespace), key)
+
+    def invalidate(self, tags, namespace=None):
+        """
+        Remove all entries tagged with one of given tags. If a namespace is
+        given, only the entries of this namespace are removed.
+
+        Returns:
+            list: Namespace and key of removed entries.
+        """
+        with self.lock:
+            removed_entries = set()
+            for tag in tags:
+                removed_entries.update(
+                    (entry_namespace, key)
+                    for (entry_namespace, key) in self.tags.get(tag, [])
+                    if namespace is None or entry_namespace == namespace
+                )
+            for (namespace, key) in removed_entries:
+                self._remove(namespace, self.get_store(namespace), key)
+            return list(removed_entries)
+
+    def resize(self, namespace, maxsize):
+        with self.lock:
+            self._remove_oldest_entries(
+                namespace, self.get_store(namespace), maxsize
+            )
+
+    def clear(self, namespace):
+        with self.lock:
+            store = self.get_store(namespace)
+            for key in list(store.keys()):
+                self._remove(namespace, store, key)
+
+    def size(self, namespace):
+        with self.lock:
+            return len(self.get_store(namespace))
+
+    def bytes_used(self, namespace=None):
+        """
+        Returns:
+            int: Approximate memory used by the entries of given namespace
+            (or by all entries if no namespace is given).
+        """
+        with self.lock:
+            if namespace is None:
+                return self.total_bytes
+            else:
+                return self.namespace_bytes.get(namespace, 0)
+
+    def reduce_to_budget(self):
+        with self.lock:
+            self._respect_memory_budget()
+
+    def _remove(self, namespace, store, key):
+        entry = store.pop(key, None)
+        if entry is not None:
+            self._forget(namespace, key, entry)
+
+    def _remove_oldest_entries(self, namespace, store, maxsize):
+        for key, entry in remove_oldest_entries(store, maxsize):
+            self._forget(namespace, key, entry)
+
+    def _respect_memory_budget(self, protected_entry=None):
+        budget = cache_settings["memory_budget"]
+        while budget > 0 and self.total_bytes > budget and self.recency:
+            candidates = []
+            for entry_id, size in self.recency.items():
+                if entry_id != protected_entry:
+                    candidates.append((size, entry_id))
+                if len(candidates) == self.eviction_candidates:
+                    break
+            if not candidates:
+                break
+            (namespace, key) = max(candidates, key=lambda item: item[0])[1]
+            self._remove(namespace, self.stores[namespace], key)
+
+    def _forget(self, namespace, key, entry):
+        size = self.recency.pop((namespace, key), 0)
+        self.namespace_bytes[namespace] -= size
+        self.total_bytes -= size
+        for tag in entry.get("tags", []):
+            tagged_entries = self.tags.get(tag)
+            if tagged_entries is not None:
+                tagged_entries.discard((namespace, key))
+                if not tagged_entries:
+                    del self.tags[tag]
+
+
+class SQLiteBackend(object):
+    """
+    Cache storage kept in a SQLite file, so cached values survive the current
+    session and are shared between processes running on the same
+    workstation. Entries are scoped by API host and by user, which avoids
+    mixing data coming from different servers or accounts. Entries are stored as JSON, so reading
+    a cache file cannot run code, whoever wrote it. Entries that cannot be
+    decoded are treated as missing.
+    """
+
+    def __init__(self, file_path=None, timeout=30):
+        if file_path is None:
+            file_path = os.path.join(
+                os.path.expanduser("~"), ".gazu", "cache.sqlite"
+            )
+        folder = os.path.dirname(os.path.abspath(file_path))
+        if not os.path.exists(folder):
+            os.makedirs(folder)
+        self.file_path = file_path
+        self.timeout = timeout
+        self.local = threading.local()
+        connection = self.get_connection()
+        with connection:
+            connection.execute(
+                "CREATE TABLE IF NOT EXISTS entries ("
+                "namespace TEXT NOT NULL, "
+                "key TEXT NOT NULL, "
+                "entry BLOB NOT NULL, "
+                "last_access REAL NOT NULL, "
+                "PRIMARY KEY (namespace, key))"
+            )
+            connection.execute(
+                "CREATE INDEX IF NOT EXISTS entries_last_access "
+                "ON entries (namespace, last_access)"
+            )
+            connection.execute(
+                "CREATE TABLE IF NOT EXISTS tags ("
+                "namespace TEXT NOT NULL, "
+                "key TEXT NOT NULL, "
+                "tag TEXT NOT NULL)"
+            )
+            connection.execute(
+                "CREATE INDEX IF NOT EXISTS tags_tag ON tags (tag)"
+            )
+            connection.execute(
+                "CREATE INDEX IF NOT EXISTS tags_entry ON tags (namespace, key)"
+            )
+
+    def get_connection(self):
+        """
+        Returns:
+            Connection to the cache file dedicated to current thread.
+        """
+        connection = getattr(self.local, "connection", None)
+        if connection is None:
+            connection = sqlite3.connect(self.file_path, timeout=self.timeout)
+            connection.execute("PRAGMA journal_mode=WAL")
+            self.local.connection = connection
+        return connection
+
+    def get_namespace(self, namespace):
+        return "%s %s" % (client.get_host(), namespace)
+
+    def get_key(self, key):
+        """
+        Entries are shared between processes, so the key names the user of
+        the client as well: two clients on the same host logged in as
+        different users never read each other's entries.
+        """
+        args, kwargs = key
+        return "%s %s" % (
+            get_client_identity(get_call_client(args, dict(kwargs))),
+            serialize_cache_key(key),
+        )
+
+    def get(self, namespace, key):
+        """
+        Returns:
+            dict: Entry stored for given key (None if there is no entry). The
+            entry is flagged as the most recently used one.
+        """
+        connection = self.get_connection()
+        namespace = self.get_namespace(namespace)
+        key = self.get_key(key)
+        with connection:
+            row = connection.execute(
+                "SELECT entry FROM entries WHERE namespace = ? AND key = ?",
+                (namespace, key),
+            ).fetchone()
+            if row is None:
+                return None
+            connection.execute(
+                "UPDATE entries SET last_access = ? "
+                "WHERE namespace = ? AND key = ?",
+                (time.time(), namespace, key),
+            )
+        return self.decode_entry(row[0])
+
+    def set(self, namespace, key, entry, maxsize):
+        """
+        Store given entry and evict least recently used entries if the store
+        contains more than maxsize entries.
+        """
+        connection = self.get_connection()
+        namespace = self.get_namespace(namespace)
+        key = self.get_key(key)
+        data = self.encode_entry(entry)
+        with connection:
+            connection.execute(
+                "INSERT OR REPLACE INTO entries "
+                "(namespace, key, entry, last_access) VALUES (?, ?, ?, ?)",
+                (namespace, key, sqlite3.Binary(data), time.time()),
+            )
+            connection.execute(
+                "DELETE FROM tags WHERE namespace = ? AND key = ?",
+                (namespace, key),
+            )
+            connection.executemany(
+                "INSERT INTO tags (namespace, key, tag) VALUES (?, ?, ?)",
+                [(namespace, key, tag) for tag in entry.get("tags", [])],
+            )
+            self._remove_oldest_entries(connection, namespace, maxsize)
+
+    def encode_entry(self, entry):
+        """
+        Returns:
+            bytes: Given entry serialized to JSON.
+        """
+        date = entry["date_accessed"]
+        return encoder.dumps(
+            {
+                "date_accessed": time.mktime(date.timetuple())
+                + date.microsecond / 1e6,
+                "value": entry["value"],
+                "validators": entry.get("validators"),
+                "tags": sorted(entry.get("tags", [])),
+                "size": entry.get("size", 0),
+            }
+        ).encode("utf-8")
+
+    def decode_entry(self, data):
+        """
+        Returns:
+            dict: Entry read from given JSON data, None if it's not valid.
+        """
+        try:
+            entry = encoder.loads(bytes(data))
+            entry["date_accessed"] = datetime.datetime.fromtimestamp(
+                entry["date_accessed"]
+            )
+            entry["tags"] = frozenset(entry["tags"])
+        except (ValueError, TypeError, KeyError):
+            return None
+        return entry
+
+    def delete(self, namespace, key):
+        connection = self.get_connection()
+        with connection:
+            self._remove_entries(
+                connection,
+                [(self.get_namespace(namespace), self.get_key(key))],
+            )
+
+    def invalidate(self, tags, namespace=None):
+        """
+        Remove all entries tagged with one of given tags. If a namespace is
+        given, only the entries of this namespace are removed.
+
+        Returns:
+            list: Namespace and serialized key of removed entries.
+        """
+        connection = self.get_connection()
+        removed_entries = set()
+        with connection:
+            for tag in tags:
+                if namespace is None:
+                    rows = connection.execute(
+                        "SELECT namespace, key FROM tags WHERE tag = ?",
+                        (tag,),
+                    )
+                else:
+                    rows = connection.execute(
+                        "SELECT namespace, key FROM tags "
+                        "WHERE tag = ? AND namespace = ?",
+                        (tag, self.get_namespace(namespace)),
+                    )
+                removed_entries.update(
+                    tuple(row) for row in rows.fetchall()
+                )
+            self._remove_entries(connection, removed_entries)
+        return list(removed_entries)
+
+    def resize(self, namespace, maxsize):
+        connection = self.get_connection()
+        with connection:
+            self._remove_oldest_entries(
+                connection, self.get_namespace(namespace), maxsize
+            )
+
+    def clear(self, namespace):
+        connection = self.get_connection()
+        namespace = self.get_namespace(namespace)
+        with connection:
+            connection.execute(
+                "DELETE FROM entries WHERE namespace = ?", (namespace,)
+            )
+            connection.execute(
+                "DELETE FROM tags WHERE namespace = ?", (namespace,)
+            )
+
+    def size(self, namespace):
+        return self.get_connection().execute(
+            "SELECT COUNT(*) FROM entries WHERE namespace = ?",
+            (self.get_namespace(namespace),),
+        ).fetchone()[0]
+
+    def bytes_used(self, namespace=None):
+        """
+        Returns:
+            int: Disk space used by the entries of given namespace (or by all
+            entries if no namespace is given).
+        """
+        if namespace is None:
+            row = self.get_connection().execute(
+                "SELECT SUM(LENGTH(entry)) FROM entries"
+            ).fetchone()
+        else:
+            row = self.get_connection().execute(
+                "SELECT SUM(LENGTH(entry)) FROM entries WHERE namespace = ?",
+                (self.get_namespace(namespace),),
+            ).fetchone()
+        return row[0] or 0
+
+    def reduce_to_budget(self):
+        pass
+
+    def _remove_oldest_entries(self, connection, namespace, maxsize):
+        if maxsize > 0:
+            oldest_keys = connection.execute(
+                "SELECT key FROM entries WHERE namespace = ? "
+                "ORDER BY last_access DESC LIMIT -1 OFFSET ?",
+                (namespace, maxsize),
+            ).fetchall()
+            self._remove_entries(
+                connection, [(namespace, key) for (key,) in oldest_keys]
+            )
+
+    def _remove_entries(self, connection, entries):
+        entries = list(entries)
+        connection.executemany(
+            "DELETE FROM entries WHERE namespace = ? AND key = ?", entries
+        )
+        connection.executemany(
+            "DELETE FROM tags WHERE namespace = ? AND key = ?", entries
+        )
+
+
+backends = {"memory": MemoryBackend, "sqlite": SQLiteBackend}
+cache_settings["backend"] = MemoryBackend()
+
+
+def enable(read_only=False, backend=None):
     """
     Enable caching on all decorated functions.
+
+    Args:
+        read_only (bool): If True, cached functions return the stored values
+        directly instead of deep copies. These values are frozen: they raise
+        a TypeError when modified. Callers that need to modify a value must
+        copy it with copy.deepcopy.
+        backend (str / object): Storage used for cached values: "memory",
+        "sqlite" (stored in ~/.gazu/cache.sqlite) or a backend instance like
+        SQLiteBackend("/path/to/cache.sqlite"). The current backend is kept
+        when it's not given (memory by default).
     """
     cache_settings["enabled"] = True
+    cache_settings["read_only"] = read_only
+    if backend is not None:
+        set_backend(backend)
     return cache_settings["enabled"]
 
 
+def set_memory_budget(max_bytes):
+    """
+    Set the maximum amount of memory that all cached functions can use
+    together. Entry sizes are approximated when they are stored. When the
+    budget is exceeded, the biggest of the least recently used entries are
+    evicted first. It applies to the memory backend.
+
+    Args:
+        max_bytes (int): Memory budget in bytes (0 to disable it).
+    """
+    cache_settings["memory_budget"] = max_bytes
+    get_backend().reduce_to_budget()
+    return cache_settings["memory_budget"]
+
+
+def get_cache_infos():
+    """
+    Returns:
+        dict: Memory budget, memory used by all cached functions and the
+        cache infos of each cached function (indexed by function name).
+    """
+    return {
+        "memory_budget": cache_settings["memory_budget"],
+        "current_bytes": get_backend().bytes_used(),
+        "functions": dict(
+            (function.cache_namespace, function.get_cache_infos())
+            for function in cached_functions
+        ),
+    }
+
+
+def set_backend(backend):
+    """
+    Set storage used by all cached functions. The current backend is kept
+    when the same kind of backend is required, so enabling the cache again
+    does not drop stored values.
+
+    Args:
+        backend (str / object): "memory", "sqlite" or a backend instance.
+
+    Returns:
+        The backend in use.
+    """
+    if backend in backends:
+        if not isinstance(cache_settings["backend"], backends[backend]):
+            cache_settings["backend"] = backends[backend]()
+    else:
+        cache_settings["backend"] = backend
+    return cache_settings["backend"]
+
+
+def get_backend():
+    """
+    Returns:
+        The storage used by all cached functions.
+    """
+    return cache_settings["backend"]
+
+
+def invalidate(*models):
+    """
+    Remove from all cached functions the entries referencing given models,
+    either through their arguments or through their results (a dict with
+    matching ID or a list containing one).
+
+    Args:
+        models (str / dict): Model IDs or dicts.
+
+    Returns:
+        int: Number of removed entries.
+    """
+    return invalidate_tags(models)
+
+
+def invalidate_tags(models, namespace=None):
+    """
+    Remove entries tagged with the IDs of given models. Only entries of given
+    namespace are removed if one is set.
+
+    Returns:
+        int: Number of removed entries.
+    """
+    ids = [
+        model["id"] if isinstance(model, dict) else model
+        for model in models
+        if model
+    ]
+    with invalidation_lock:
+        cache_settings["invalidations"] += 1
+        recent_invalidations.append(
+            (cache_settings["invalidations"], frozenset(ids))
+        )
+    return len(get_backend().invalidate(ids, namespace))
+
+
+def write_through(change, model, readers=[], client=client.default_client):
+    """
+    Update the cache after a write sent to the API, so cached functions can
+    stay enabled without serving outdated data. Only the entries depending
+    on given model are removed:
+
+    * For an update or a deletion, all entries referencing the model.
+    * For a creation, the entries of the functions listing this kind of
+      model (see event_invalidations) that reference one of the model
+      parents (project, entity, task, assignees...), plus their entry
+      without argument.
+    * For an assignment, the entries referencing the model and the entries
+      of the functions listing the tasks of its assignees.
+
+    Args:
+        change (str): Kind of write, named like Zou events ("task:update",
+        "shot:new", "asset:delete"...).
+        model (dict): The model returned by the API (or the deleted one).
+        readers (list): Cached functions taking the model ID as argument and
+        returning the model as sent by the API. Their entry for this model is
+        replaced by given model.
+        client (KitsuClient): Client which sent the write. An async client
+        linked to a synchronous one updates the synchronous entries.
+
+    Returns:
+        dict: Given model.
+    """
+    if not isinstance(model, dict) or "id" not in model:
+        return model
+
+    if not change.endswith(":new"):
+        invalidate(model)
+    if not change.endswith((":update", ":delete")):
+        parent_ids = [
+            value
+            for (name, value) in model.items()
+            if name.endswith("_id") and isinstance(value, string_types)
+        ] + [
+            person_id
+            for person_id in model.get("assignees") or []
+            if isinstance(person_id, string_types)
+        ]
+        for namespace in event_invalidations.get(change, []):
+            function = get_cached_function(namespace)
+            if function is not None:
+                function.invalidate(*parent_ids)
+                function.remove_cache_value(client=client)
+
+    if cache_settings["enabled"]:
+        for reader in readers:
+            reader.set_cache_value(model, model["id"], client=client)
+    return model
+
+
+def is_invalidated_since(invalidations, tags):
+    """
+    Check if one of given tags was invalidated after the invalidation counter
+    reached given value. It prevents a request started before an
+    invalidation from storing an outdated result.
+
+    Args:
+        invalidations (int): Invalidation counter when the request started.
+        tags (frozenset): Tags of the entry to store.
+
+    Returns:
+        True if the entry should not be stored.
+    """
+    with invalidation_lock:
+        if invalidations == cache_settings["invalidations"]:
+            return False
+        elif not recent_invalidations or \
+                recent_invalidations[0][0] > invalidations + 1:
+            return True
+        else:
+            return any(
+                not tags.isdisjoint(ids)
+                for (count, ids) in recent_invalidations
+                if count > invalidations
+            )
+
+
+def get_cached_function(namespace):
+    """
+    Args:
+        namespace (str): Full name of the function like
+        "gazu.task.get_task".
+
+    Returns:
+        The cached function matching given name (None if it's not found).
+    """
+    for function in cached_functions:
+        if function.cache_namespace == namespace:
+            return function
+    return None
+
+
+def get_cached_models(model_name, ids, client=client.default_client):
+    """
+    Args:
+        model_name (str): Model type name, like in client.fetch_one.
+        ids (list): IDs of the wanted models.
+
+    Returns:
+        dict: Models found in the cache indexed by ID. It's empty when the
+        cache is disabled or when no cached function reads this model.
+    """
+    reader = get_cached_function(model_readers.get(model_name))
+    models = {}
+    if reader is None:
+        return models
+    for model_id in ids:
+        try:
+            models[model_id] = reader.get_cache_value(model_id, client=client)
+        except KeyError:
+            pass
+    return models
+
+
+def set_cached_models(model_name, models, client=client.default_client):
+    """
+    Store models fetched with client.fetch_one in the cache of the function
+    reading them, if the cache is enabled.
+
+    Args:
+        model_name (str): Model type name, like in client.fetch_one.
+        models (list): Models returned by the API.
+    """
+    reader = get_cached_function(model_readers.get(model_name))
+    if reader is None or not cache_settings["enabled"]:
+        return
+    for model in models:
+        if isinstance(model, dict) and "id" in model:
+            reader.set_cache_value(model, model["id"], client=client)
+
+
+def invalidate_from_event(event_name, data):
+    """
+    Remove cached entries affected by given Zou event. Entries referencing
+    the model the event is about are removed: its ID is sent as "id" or as
+    "<model>_id" ("task_id" for "task:update"). Other IDs sent with the
+    event, like project_id, are ignored. Creations and deletions also clear
+    the functions listing entities of the same kind (see
+    event_invalidations).
+
+    Args:
+        event_name (str): Name of the event like "task:update".
+        data (dict): Event data.
+    """
+    data = data or {}
+    model_name = event_name.split(":")[0].replace("-", "_")
+    invalidate(
+        *[
+            data[name]
+            for name in ["id", "%s_id" % model_name]
+            if isinstance(data.get(name), string_types)
+        ]
+    )
+    for namespace in event_invalidations.get(event_name, []):
+        function = get_cached_function(namespace)
+        if function is not None:
+            function.clear_cache()
+
+
+def enable_event_invalidation(
+    event_client=None, client=client.default_client
+):
+    """
+    Listen to Zou events to remove outdated cache entries as soon as data
+    change on the server. It allows to use long expiration times. The event
+    client still needs to be run (in a dedicated thread for instance) with
+    gazu.events.run_client.
+
+    Args:
+        event_client: Event client built with gazu.events.init. A new one is
+        created if none is given.
+        client (KitsuClient): Client used to build the event client.
+
+    Returns:
+        The event client listening to the invalidation events.
+    """
+    if event_client is None:
+        event_client = events.init(client=client)
+    for event_name in event_invalidations:
+        events.add_listener(
+            event_client,
+            event_name,
+            functools.partial(invalidate_from_event, event_name),
+        )
+    return event_client
+
+
+def preload(project, max_workers=8, client=client.default_client):
+    """
+    Warm the cache for given project: the reference data tools usually need
+    when opening a project are fetched in parallel, then the getters by ID
+    (get_shot, get_asset, get_entity, get_person...) are seeded with the
+    items of the fetched lists. The cache must be enabled.
+
+    Args:
+        project (str / dict): The project dict or the project ID.
+        max_workers (int): Number of requests sent at the same time.
+        client (KitsuClient): Client used to fetch the data.
+
+    Returns:
+        dict: Fetched lists indexed by name (shots, assets, persons...).
+    """
+    from . import asset, files, person, project as gazu_project, shot, task
+    from . import entity
+
+    project = normalize_model_parameter(project)
+    list_functions = {
+        "project": (gazu_project.get_project, [project["id"]]),
+        "episodes": (shot.all_episodes_for_project, [project]),
+        "sequences": (shot.all_sequences_for_project, [project]),
+        "shots": (shot.all_shots_for_project, [project]),
+        "assets": (asset.all_assets_for_project, [project]),
+        "asset_types": (asset.all_asset_types_for_project, [project]),
+        "task_types": (task.all_task_types, []),
+        "task_statuses": (task.all_task_statuses, []),
+        "output_types": (files.all_output_types, []),
+        "persons": (person.all_persons, []),
+    }
+    names = list(list_functions.keys())
+
+    def fetch(name):
+        function, args = list_functions[name]
+        return function(*args, client=client)
+
+    pool = ThreadPool(max(1, min(max_workers, len(names))))
+    try:
+        results = dict(zip(names, pool.map(fetch, names)))
+    finally:
+        pool.close()
+        pool.join()
+
+    if not cache_settings["enabled"]:
+        return results
+
+    readers = {
+        "episodes": [shot.get_episode, entity.get_entity],
+        "sequences": [shot.get_sequence, entity.get_entity],
+        "shots": [shot.get_shot, entity.get_entity],
+        "assets": [asset.get_asset, entity.get_entity],
+        "task_types": [task.get_task_type],
+        "output_types": [files.get_output_type],
+        "persons": [person.get_person],
+    }
+    for name, functions in readers.items():
+        for model in results[name] or []:
+            for function in functions:
+                function.set_cache_value(model, model["id"], client=client)
+    return results
+
+
 def disable():
     """
     Disable caching on all decorated functions.
@@ -32,79 +1007,312 @@ def clear_all():
         function.clear_cache()
 
 
-def remove_oldest_entry(memo, maxsize):
+def remove_oldest_entries(memo, maxsize):
     """
-    Remove the oldest cache entry if there is more value stored than allowed.
+    Remove the least recently used entries if there is more value stored than
+    allowed. The memo is an ordered dict where the first key is the least
+    recently used one, so eviction does not require to scan the whole cache.
 
     Params:
-        memo (dict): Cache used for function memoization.
+        memo (OrderedDict): Cache used for function memoization.
         maxsize (int): Maximum number of entries for the cache.
 
     Returns:
-        Oldest entry for given cache.
+        list: Keys and entries removed from given cache.
+    """
+    removed_entries = []
+    while maxsize > 0 and len(memo) > maxsize:
+        removed_entries.append(memo.popitem(last=False))
+    return removed_entries
+
+
+def mark_as_recently_used(memo, key):
+    """
+    Move given key at the end of the memo to flag it as the most recently
+    used entry. Popping and reinserting the key keeps this operation O(1) on
+    every supported Python version.
+
+    Params:
+        memo (OrderedDict): Cache used for function memoization.
+        key: The key of the accessed entry.
     """
-    oldest_entry = None
-    if maxsize > 0 and len(memo) > maxsize:
-        oldest_entry_key = list(memo.keys())[0]
-        for entry_key in memo.keys():
-            oldest_date = memo[oldest_entry_key]["date_accessed"]
-            if memo[entry_key]["date_accessed"] < oldest_date:
-                oldest_entry_key = entry_key
-        memo.pop(oldest_entry_key)
-    return oldest_entry
+    memo[key] = memo.pop(key)
 
 
-def get_cache_key(args, kwargs):
+def get_cache_key_element(value, key_by_id=False):
     """
-    Serialize arguments to get a cache key. It will be used to store function
-    results.
+    Turn given function argument into a hashable value. Dicts become
+    frozensets and lists become tuples, so the result does not depend on the
+    dict order. With key_by_id, model dicts are reduced to their ID like in
+    normalize_model_parameter, so an ID string and its model dict share the
+    same cache slot. It's only correct for functions that read nothing but
+    the ID of their model arguments.
+
+    Args:
+        value: Function argument to convert.
+        key_by_id (bool): Whether model dicts are reduced to their ID.
 
     Returns:
-        str: generated key
+        Hashable value representing given argument.
     """
-    if len(args) == 0 and len(kwargs) == 0:
-        return ""
-    elif len(args) == 0:
-        return json.dumps(kwargs)
-    elif len(kwargs.keys()) == 0:
-        return json.dumps(args)
+    if isinstance(value, dict):
+        if key_by_id and "id" in value:
+            return value["id"]
+        else:
+            return frozenset(
+                (key, get_cache_key_element(entry, key_by_id))
+                for key, entry in value.items()
+            )
+    elif isinstance(value, (list, tuple)):
+        return tuple(
+            get_cache_key_element(entry, key_by_id) for entry in value
+        )
+    elif isinstance(value, (set, frozenset)):
+        return frozenset(
+            get_cache_key_element(entry, key_by_id) for entry in value
+        )
     else:
-        return json.dumps([args, kwargs])
+        try:
+            hash(value)
+            return value
+        except TypeError:
+            return repr(value)
 
 
-def insert_value(function, cache_store, args, kwargs):
+def get_cache_key(args, kwargs, key_by_id=False):
     """
-    Serialize function call arguments and store function result in given cache
-    store.
+    Build a hashable key from function arguments. It will be used to store
+    function results. Keyword arguments are sorted by name, so their order
+    does not matter. The client is part of the key, so each Kitsu client gets
+    its own entries, except the default client which is the same as giving
+    no client at all. An async client linked to a synchronous one (see
+    gazu.aioclient) stands for the synchronous client.
 
     Args:
-        function (func): The function to cache value for.
-        cache_store (dict): The cache which will contain the value to cache.
-        args, kwargs: The arguments for which a cache must be set.
+        args (tuple): Positional arguments of the function call.
+        kwargs (dict): Keyword arguments of the function call.
+        key_by_id (bool): Whether model dicts are reduced to their ID (see
+        get_cache_key_element).
 
     Returns:
-        The cached value.
+        tuple: generated key
     """
-    returned_value = function(*args, **kwargs)
-    key = get_cache_key(args, kwargs)
-    cache_store[key] = {
+    if "client" in kwargs:
+        kwargs = dict(kwargs)
+        kwargs["client"] = get_linked_client(kwargs["client"])
+        if kwargs["client"] is client.default_client:
+            del kwargs["client"]
+    return (
+        tuple(get_cache_key_element(arg, key_by_id) for arg in args),
+        tuple(
+            sorted(
+                (name, get_cache_key_element(value, key_by_id))
+                for name, value in kwargs.items()
+            )
+        ),
+    )
+
+
+def serialize_cache_key(key):
+    """
+    Turn a cache key into a string that is the same in every process. Sets
+    are sorted because their iteration order depends on string hashing.
+
+    Returns:
+        str: serialized key
+    """
+    if isinstance(key, tuple):
+        return "(%s)" % ", ".join(serialize_cache_key(item) for item in key)
+    elif isinstance(key, frozenset):
+        return "{%s}" % ", ".join(
+            sorted(serialize_cache_key(item) for item in key)
+        )
+    else:
+        return repr(key)
+
+
+def get_client_identity(kitsu_client):
+    """
+    Returns:
+        str: Host of given client with a hash of its refresh token (its
+        access token if it has none), which tells its user apart without
+        storing the token.
+    """
+    tokens = kitsu_client.tokens or {}
+    token = tokens.get("refresh_token") or tokens.get("access_token") or ""
+    return "%s %s" % (
+        kitsu_client.host,
+        hashlib.sha256(token.encode("utf-8")).hexdigest()[:16],
+    )
+
+
+def get_cache_tags(key, value):
+    """
+    List IDs referenced by a cache entry: string arguments (model dicts are
+    already reduced to their ID in the key) and IDs of the models returned by
+    the function.
+
+    Args:
+        key (tuple): The cache key built from function arguments.
+        value: The function result.
+
+    Returns:
+        frozenset: Tags of the cache entry.
+    """
+    tags = set()
+    args, kwargs = key
+    add_key_tags(tags, args)
+    add_key_tags(tags, tuple(argument for (_, argument) in kwargs))
+    if isinstance(value, dict):
+        add_model_tag(tags, value)
+    elif isinstance(value, list):
+        for model in value:
+            add_model_tag(tags, model)
+    return frozenset(tags)
+
+
+def add_key_tags(tags, key_element):
+    if isinstance(key_element, string_types):
+        tags.add(key_element)
+    elif isinstance(key_element, (tuple, frozenset)):
+        for item in key_element:
+            add_key_tags(tags, item)
+
+
+def add_model_tag(tags, model):
+    if isinstance(model, dict) and isinstance(model.get("id"), string_types):
+        tags.add(model["id"])
+
+
+def estimate_size(value, sample_size=32):
+    """
+    Approximate memory used by given value. For big lists, only a sample of
+    the items is measured to keep the computation cheap.
+
+    Args:
+        value: The value to measure.
+        sample_size (int): Number of items measured in big lists.
+
+    Returns:
+        int: Approximate size in bytes.
+    """
+    size = sys.getsizeof(value)
+    if isinstance(value, dict):
+        for key, item in value.items():
+            size += sys.getsizeof(key) + estimate_size(item, sample_size)
+    elif isinstance(value, (list, tuple)):
+        nb_items = len(value)
+        if nb_items > sample_size:
+            step = nb_items // sample_size
+            sample = value[::step][:sample_size]
+            sample_bytes = sum(
+                estimate_size(item, sample_size) for item in sample
+            )
+            size += sample_bytes * nb_items // len(sample)
+        else:
+            size += sum(estimate_size(item, sample_size) for item in value)
+    return size
+
+
+def freeze(value):
+    """
+    Build a read-only version of given value. Dicts and lists are converted
+    recursively to ReadOnlyDict and ReadOnlyList.
+
+    Args:
+        value: The value to freeze.
+
+    Returns:
+        The frozen value.
+    """
+    if isinstance(value, (ReadOnlyDict, ReadOnlyList)):
+        return value
+    elif isinstance(value, dict):
+        return ReadOnlyDict(
+            (key, freeze(entry)) for key, entry in value.items()
+        )
+    elif isinstance(value, list):
+        return ReadOnlyList(freeze(entry) for entry in value)
+    elif isinstance(value, tuple):
+        return tuple(freeze(entry) for entry in value)
+    else:
+        return value
+
+
+def get_stored_value(value):
+    """
+    Args:
+        value: A function result to store in cache.
+
+    Returns:
+        The value frozen when the read-only mode is enabled, given value
+        otherwise (callers get deep copies of it).
+    """
+    if cache_settings["read_only"]:
+        return freeze(value)
+    else:
+        return value
+
+
+def build_entry(key, value, validators=None):
+    """
+    Build the cache entry storing given function result. In read-only mode,
+    the stored value is frozen, so it can be shared safely between callers
+    and threads.
+
+    Args:
+        key: The cache key built from function arguments.
+        value: The function result to store.
+        validators (list): Validators of the responses the result was built
+        from, to revalidate it once it's expired (see client.revalidate).
+
+    Returns:
+        dict: The entry to give to the cache backend.
+    """
+    return {
         "date_accessed": datetime.datetime.now(),
-        "value": returned_value,
+        "value": get_stored_value(value),
+        "validators": validators,
+        "tags": get_cache_tags(key, value),
+        "size": estimate_size(value) + estimate_size(validators),
     }
-    return get_value(cache_store, key)
 
 
-def get_value(cache_store, key):
+def get_call_client(args, kwargs):
+    """
+    Returns:
+        KitsuClient: The client given to a cached function.
+    """
+    for arg in args:
+        if isinstance(arg, client.KitsuClient):
+            return arg
+    return get_linked_client(kwargs.get("client", client.default_client))
+
+
+def get_linked_client(kitsu_client):
+    """
+    Returns:
+        KitsuClient: The synchronous client linked to given async client, or
+        given client if it isn't linked to any.
+    """
+    return getattr(kitsu_client, "linked_client", None) or kitsu_client
+
+
+def copy_value(value):
     """
     It generates a deep copy of the requested value. It's needed because if a
     pointer is returned, the value can be changed. Which leads to a modified
-    cache and unexpected results.
+    cache and unexpected results. When the read-only mode is enabled, the
+    stored value is frozen, so it is returned as it is without any copy
+    (values stored before the mode was enabled are frozen first).
 
     Returns:
-        Value matching given key inside given cache store
+        Value to return to the caller of a cached function.
     """
-    value = cache_store[key]["value"]
-    return copy.deepcopy(value)
+    if cache_settings["read_only"]:
+        return freeze(value)
+    else:
+        return copy.deepcopy(value)
 
 
 def is_cache_enabled(state):
@@ -118,61 +1326,136 @@ def is_cache_enabled(state):
     return cache_settings["enabled"] and state["enabled"]
 
 
-def is_cache_expired(memo, state, key):
+def is_cache_expired(entry, state):
     """
-    Check if cache is expired (outdated) for given wrapper state and cache key.
+    Check if cache is expired (outdated) for given wrapper state and cache
+    entry.
 
     Args:
-        memo (dict): The function cache
+        entry (dict): The cache entry to check
         state (dict): The parameters of the cache (enabled, expire, maxsize)
-        key: The key to check
 
     Returns:
         True if cache value is expired.
 
     """
-    date = memo[key]["date_accessed"]
+    date = entry["date_accessed"]
     expire = state["expire"]
     date_to_check = date + datetime.timedelta(seconds=expire)
     return expire > 0 and date_to_check < datetime.datetime.now()
 
 
-def cache(function, maxsize=300, expire=120):
+def cache(function=None, maxsize=300, expire=120, key_by_id=False):
     """
     Decorator that generate cache wrapper and that adds cache feature to
     target function. A max cache size and and expiration time (in seconds) can
-    be set too.
+    be set too. With the stale-while-revalidate mode (see
+    set_cache_stale_while_revalidate), an expired value is returned
+    immediately while a background thread fetches the new one.
+
+    Called without function, it returns a decorator using given options:
+    @cache(key_by_id=True).
 
     Args:
         function (func): Decorated function:
         maxsize: Number of value stored in cache (300 by default).
         expire: Time to live in seconds of stored value (disabled by default)
+        key_by_id (bool): Reduce model dicts given as arguments to their ID
+        in cache keys. Only for functions that read nothing else from their
+        model arguments.
     """
-    cache_store = {}
-    state = {"enabled": True, "expire": expire, "maxsize": maxsize}
+    if function is None:
+        return functools.partial(
+            cache, maxsize=maxsize, expire=expire, key_by_id=key_by_id
+        )
+    namespace = "%s.%s" % (function.__module__, function.__name__)
+    state = {
+        "enabled": True,
+        "expire": expire,
+        "maxsize": maxsize,
+        "stale_while_revalidate": False,
+    }
+    lock = threading.Lock()
+    calls_in_flight = {}
+    generation = {"value": 0}
 
     statistics = {
         "hits": 0,
         "misses": 0,
-        "expired_hits": 0
+        "expired_hits": 0,
+        "coalesced": 0,
+        "stale_hits": 0,
+        "refreshes": 0,
+        "refreshes_in_flight": 0,
+        "refresh_errors": 0,
+        "refresh_time": 0.0,
+        "last_refresh_latency": 0.0,
     }
 
     def clear_cache():
-        cache_store.clear()
+        with lock:
+            get_backend().clear(namespace)
+            generation["value"] += 1
 
     def get_cache_infos():
-        size = {'current_size': len(cache_store)}
-        infos = {}
-        for d in [state, statistics, size]:
-            infos.update(d)
+        size = {
+            "current_size": get_backend().size(namespace),
+            "current_bytes": get_backend().bytes_used(namespace),
+        }
+        with lock:
+            infos = {}
+            for d in [state, statistics, size]:
+                infos.update(d)
 
+        if infos["refreshes"] > 0:
+            infos["average_refresh_latency"] = (
+                infos["refresh_time"] / infos["refreshes"]
+            )
+        else:
+            infos["average_refresh_latency"] = 0.0
         return infos
 
     def set_expire(new_expire):
         state["expire"] = new_expire
 
+    def set_stale_while_revalidate(stale_while_revalidate=True):
+        state["stale_while_revalidate"] = stale_while_revalidate
+
     def set_max_size(maxsize):
         state["maxsize"] = maxsize
+        get_backend().resize(namespace, maxsize)
+
+    def invalidate_entries(*models):
+        return invalidate_tags(models, namespace)
+
+    def set_cache_value(value, *args, **kwargs):
+        key = get_cache_key(args, kwargs, key_by_id)
+        get_backend().set(
+            namespace,
+            key,
+            build_entry(key, copy_value(value)),
+            state["maxsize"],
+        )
+
+    def get_cache_value(*args, **kwargs):
+        """
+        Return the cached result for given arguments without calling the
+        function. Raise a KeyError if there is no valid entry.
+        """
+        if not is_cache_enabled(state):
+            raise KeyError("Cache is disabled")
+        entry = get_backend().get(
+            namespace, get_cache_key(args, kwargs, key_by_id)
+        )
+        if entry is None or is_cache_expired(entry, state):
+            raise KeyError("No cached value for these arguments")
+        with lock:
+            statistics["hits"] += 1
+        client.add_validators(entry.get("validators"))
+        return copy_value(entry["value"])
+
+    def remove_cache_value(*args, **kwargs):
+        get_backend().delete(namespace, get_cache_key(args, kwargs, key_by_id))
 
     def enable_cache():
         state["enabled"] = True
@@ -180,37 +1463,159 @@ def cache(function, maxsize=300, expire=120):
     def disable_cache():
         state["enabled"] = False
 
-    @wraps(function)
+    def call_function(key, call, args, kwargs, expired_entry=None):
+        """
+        Run the decorated function for a call that missed the cache, store its
+        result and wake up the callers waiting for the same key. An expired
+        entry is first revalidated with conditional requests: if none of the
+        responses it was built from changed, its value is kept.
+        """
+        recording = client.start_recording_validators()
+        try:
+            if (
+                expired_entry is not None
+                and expired_entry.get("validators")
+                and client.revalidate(
+                    expired_entry["validators"],
+                    client=get_call_client(args, kwargs),
+                )
+            ):
+                call["value"] = get_stored_value(expired_entry["value"])
+                client.add_validators(expired_entry["validators"])
+            else:
+                call["value"] = get_stored_value(function(*args, **kwargs))
+        except Exception as exception:
+            call["error"] = exception
+            raise
+        finally:
+            call["validators"] = client.stop_recording_validators(recording)
+            with lock:
+                calls_in_flight.pop(key, None)
+                if (
+                    "error" not in call
+                    and call["generation"] == generation["value"]
+                ):
+                    entry = build_entry(
+                        key, call["value"], call["validators"]
+                    )
+                    if not is_invalidated_since(
+                        call["invalidations"], entry["tags"]
+                    ):
+                        get_backend().set(
+                            namespace, key, entry, state["maxsize"]
+                        )
+            call["done"].set()
+        return copy_value(call["value"])
+
+    def refresh_value(key, call, args, kwargs, expired_entry):
+        """
+        Run the decorated function in a background thread to replace an
+        expired value. The callers get the expired value meanwhile.
+        """
+        start = time.time()
+        try:
+            call_function(key, call, args, kwargs, expired_entry)
+        except Exception:
+            with lock:
+                statistics["refresh_errors"] += 1
+        finally:
+            latency = time.time() - start
+            with lock:
+                statistics["refreshes_in_flight"] -= 1
+                statistics["refreshes"] += 1
+                statistics["refresh_time"] += latency
+                statistics["last_refresh_latency"] = latency
+
+    def start_refresh(key, call, args, kwargs, expired_entry):
+        thread = threading.Thread(
+            target=refresh_value,
+            args=(key, call, args, kwargs, expired_entry),
+        )
+        thread.daemon = True
+        thread.start()
+
+    def new_call():
+        return {
+            "done": threading.Event(),
+            "generation": generation["value"],
+            "invalidations": cache_settings["invalidations"],
+        }
+
+    def wait_for_call(call):
+        """
+        Wait for a call of the decorated function run by another thread for
+        the same key and return its result.
+        """
+        call["done"].wait()
+        if "error" in call:
+            raise call["error"]
+        client.add_validators(call["validators"])
+        return copy_value(call["value"])
+
+    @functools.wraps(function)
     def wrapper(*args, **kwargs):
 
         if is_cache_enabled(state):
-            key = get_cache_key(args, kwargs)
+            key = get_cache_key(args, kwargs, key_by_id)
+            entry = get_backend().get(namespace, key)
 
-            if key in cache_store:
-                if is_cache_expired(cache_store, state, key):
+            with lock:
+                call = calls_in_flight.get(key)
+                is_refresh_needed = False
+                if entry is not None and not is_cache_expired(entry, state):
+                    statistics["hits"] += 1
+                    value = entry["value"]
+                    return_cached_value = True
+                elif entry is not None and state["stale_while_revalidate"]:
                     statistics["expired_hits"] += 1
-                    return insert_value(function, cache_store, args, kwargs)
+                    statistics["stale_hits"] += 1
+                    value = entry["value"]
+                    return_cached_value = True
+                    if call is None:
+                        call = new_call()
+                        calls_in_flight[key] = call
+                        statistics["refreshes_in_flight"] += 1
+                        is_refresh_needed = True
+                elif call is not None:
+                    statistics["coalesced"] += 1
+                    return_cached_value = False
+                    is_first_call = False
                 else:
-                    statistics["hits"] += 1
-                    return get_value(cache_store, key)
+                    if entry is not None:
+                        statistics["expired_hits"] += 1
+                    else:
+                        statistics["misses"] += 1
+                    call = new_call()
+                    calls_in_flight[key] = call
+                    return_cached_value = False
+                    is_first_call = True
 
+            if is_refresh_needed:
+                start_refresh(key, call, args, kwargs, entry)
+
+            if return_cached_value:
+                client.add_validators(entry.get("validators"))
+                return copy_value(value)
+            elif is_first_call:
+                return call_function(key, call, args, kwargs, entry)
             else:
-                statistics["misses"] += 1
-                returned_value = insert_value(
-                    function, cache_store, args, kwargs
-                )
-                remove_oldest_entry(cache_store, state["maxsize"])
-                return returned_value
+                return wait_for_call(call)
 
         else:
             return function(*args, **kwargs)
 
     wrapper.set_cache_expire = set_expire
     wrapper.set_cache_max_size = set_max_size
+    wrapper.set_cache_stale_while_revalidate = set_stale_while_revalidate
     wrapper.clear_cache = clear_cache
     wrapper.enable_cache = enable_cache
     wrapper.disable_cache = disable_cache
     wrapper.get_cache_infos = get_cache_infos
+    wrapper.invalidate = invalidate_entries
+    wrapper.get_cache_value = get_cache_value
+    wrapper.set_cache_value = set_cache_value
+    wrapper.remove_cache_value = remove_cache_value
+    wrapper.cache_namespace = namespace
 
     cached_functions.append(wrapper)
     return wrapper
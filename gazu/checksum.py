@@ -0,0 +1,119 @@
+import base64
+import binascii
+import hashlib
+
+# Names used in Digest and Repr-Digest headers for hashlib algorithms.
+digest_algorithms = {
+    "md5": "md5",
+    "sha": "sha1",
+    "sha-256": "sha256",
+    "sha-512": "sha512",
+}
+
+
+def get_hasher(algorithm):
+    """
+    Args:
+        algorithm (str): Name of a hashlib algorithm (md5, sha256...) or of
+        an xxhash one (xxh64, xxh3_64...), which requires the xxhash
+        package.
+
+    Returns:
+        Object to feed with data through its update method.
+    """
+    if algorithm.startswith("xxh"):
+        import xxhash
+
+        return getattr(xxhash, algorithm)()
+    return hashlib.new(algorithm)
+
+
+class Checksums(object):
+    """
+    Compute the size and the checksums of data read in several pieces.
+
+    Args:
+        algorithms (list): Names of the algorithms to use (see get_hasher).
+    """
+
+    def __init__(self, algorithms):
+        self.algorithms = list(algorithms)
+        self.reset()
+
+    def reset(self):
+        self.size = 0
+        self.hashers = dict(
+            (algorithm, get_hasher(algorithm)) for algorithm in self.algorithms
+        )
+
+    def update(self, data):
+        self.size += len(data)
+        for hasher in self.hashers.values():
+            hasher.update(data)
+
+    def update_from_file(self, file_path, end=None, chunk_size=1024 * 1024):
+        """
+        Feed the content of given file, up to end (excluded) if given.
+        """
+        with open(file_path, "rb") as data_file:
+            remaining = end
+            while remaining is None or remaining > 0:
+                size = chunk_size
+                if remaining is not None:
+                    size = min(size, remaining)
+                    remaining -= size
+                data = data_file.read(size)
+                if not data:
+                    break
+                self.update(data)
+
+    def hexdigests(self):
+        """
+        Returns:
+            dict: Hexadecimal checksum for each algorithm.
+        """
+        return dict(
+            (algorithm, hasher.hexdigest())
+            for algorithm, hasher in self.hashers.items()
+        )
+
+
+def get_server_checksums(response):
+    """
+    Read the checksums of the file sent by the server, from the Repr-Digest
+    and Digest headers. For complete responses, Content-Digest and
+    Content-MD5 are read too. Algorithms unknown to hashlib are ignored.
+
+    Returns:
+        dict: Hexadecimal checksum for each hashlib algorithm name.
+    """
+    headers = ["Repr-Digest", "Digest"]
+    if response.status_code == 200:
+        headers.append("Content-Digest")
+    checksums = {}
+    for header in headers:
+        for value in response.headers.get(header, "").split(","):
+            if "=" not in value:
+                continue
+            name, digest = value.strip().split("=", 1)
+            algorithm = digest_algorithms.get(name.strip().lower())
+            if algorithm is not None:
+                checksum = decode_digest(digest.strip().strip(":"))
+                if checksum is not None:
+                    checksums.setdefault(algorithm, checksum)
+    if response.status_code == 200 and "Content-MD5" in response.headers:
+        checksum = decode_digest(response.headers["Content-MD5"])
+        if checksum is not None:
+            checksums.setdefault("md5", checksum)
+    return checksums
+
+
+def decode_digest(digest):
+    """
+    Returns:
+        str: Given base64 digest in hexadecimal, None if it's not valid.
+    """
+    try:
+        return binascii.hexlify(base64.b64decode(digest)).decode("ascii")
+    except (binascii.Error, ValueError):
+        return None
@@ -1,11 +1,24 @@
+import codecs
+import email.utils
 import functools
 import json
-import shutil
+import os
+import random
+import re
+import threading
+import time
 import urllib
+import zlib
 
-from .encoder import CustomJSONEncoder
+from multiprocessing.pool import ThreadPool
+
+from . import encoder
+from . import scheduler
+from .checksum import Checksums, get_server_checksums
+from .multipart import ChunkedBody, MultipartEncoder
 
 from .exception import (
+    DownloadFailedException,
     TooBigFileException,
     NotAuthenticatedException,
     NotAllowedException,
@@ -21,9 +34,8 @@ try:
 
     # Little hack to allow json encoder to manage dates.
     requests.models.complexjson.dumps = functools.partial(
-        json.dumps, cls=CustomJSONEncoder
+        json.dumps, cls=encoder.CustomJSONEncoder
     )
-    requests_session = requests.Session()
 except:
     print("Warning, running in setup mode!")
 
@@ -33,79 +45,212 @@ EVENT_HOST = None
 
 tokens = {"access_token": "", "refresh_token": ""}
 
+DEFAULT_POOL_SIZE = 10
+DOWNLOAD_CHUNK_SIZE = 1024 * 1024
+MIN_RANGE_SIZE = 16 * 1024 * 1024
+
+IDEMPOTENT_METHODS = ["get", "head", "put", "delete", "options"]
+
+ID_PATTERN = re.compile(
+    "[0-9a-f]{8}-[0-9a-f]{4}-[0-9a-f]{4}-[0-9a-f]{4}-[0-9a-f]{12}"
+)
+
+conditional_requests = threading.local()
+
+
+class KitsuClient(object):
+    """
+    Connection to a Kitsu instance. Each client owns its HTTP session, its
+    hosts and its authentication tokens, so several clients can talk to
+    different servers, or to the same server as different users, from the
+    same process. Every module level function accepts a *client* argument
+    to target a given instance; cached results are stored per client.
+
+    Args:
+        host (str): Url of the Kitsu API, like "https://kitsu.com/api".
+        event_host (str): Url of the event stream, defaults to the host.
+        tokens (dict): Authentication tokens to start with.
+    """
+
+    def __init__(self, host, event_host=None, tokens=None):
+        self.host = host
+        self.event_host = event_host
+        if tokens is None:
+            tokens = {"access_token": "", "refresh_token": ""}
+        self.tokens = tokens
+        self.timeout = None
+        self.connection_stats = {"new_connections": 0, "requests": 0}
+        self.retry_policy = {
+            "max_retries": 3,
+            "backoff_factor": 0.5,
+            "max_backoff": 30,
+            "statuses": [429, 502, 503, 504],
+        }
+        self.retry_stats = {
+            "retries": 0,
+            "retried_requests": 0,
+            "failed_requests": 0,
+            "backoff_time": 0.0,
+        }
+        self.compression = {"request_threshold": None}
+        self.transfer_stats = {}
+        self.validator_stats = {
+            "conditional_requests": 0,
+            "not_modified": 0,
+            "saved_bytes": 0,
+        }
+        self.stats_lock = threading.Lock()
+        self.refresh_lock = threading.Lock()
+        self.session = requests.Session()
+        self.session.headers["Accept-Encoding"] = get_accept_encoding()
+        _mount_http_adapter(self)
+
+    def __repr__(self):
+        return "<KitsuClient %s>" % self.host
+
+
+def get_accept_encoding():
+    """
+    Returns:
+        str: Compressions the client can decode: gzip and deflate, plus
+        brotli when the brotli package is installed.
+    """
+    return requests.packages.urllib3.util.make_headers(accept_encoding=True)[
+        "accept-encoding"
+    ]
+
+
+def _mount_http_adapter(
+    client,
+    pool_connections=DEFAULT_POOL_SIZE,
+    pool_maxsize=DEFAULT_POOL_SIZE,
+    pool_block=False,
+):
+    """
+    Replace the adapters of the client session by new ones using given pool
+    sizes. Statistics of the connection pools are kept when they are
+    discarded, so connection counters survive a pool reconfiguration.
+    """
+    adapter = requests.adapters.HTTPAdapter(
+        pool_connections=pool_connections,
+        pool_maxsize=pool_maxsize,
+        pool_block=pool_block,
+    )
+    pools = adapter.poolmanager.pools
+    pools.dispose_func = functools.partial(
+        _dispose_pool, client, pools.dispose_func
+    )
+    previous_adapters = set(client.session.adapters.values())
+    client.session.mount("https://", adapter)
+    client.session.mount("http://", adapter)
+    for previous_adapter in previous_adapters:
+        previous_adapter.close()
+
+
+def _dispose_pool(client, dispose, pool):
+    with client.stats_lock:
+        client.connection_stats["new_connections"] += pool.num_connections
+        client.connection_stats["requests"] += pool.num_requests
+    if dispose is not None:
+        dispose(pool)
+
+
+def create_client(host, event_host=None, tokens=None):
+    """
+    Args:
+        host (str): Url of the Kitsu API.
+        event_host (str): Url of the event stream, defaults to the host.
+        tokens (dict): Authentication tokens to start with.
+
+    Returns:
+        KitsuClient: A new client, independent from the default one.
+    """
+    return KitsuClient(host, event_host=event_host, tokens=tokens)
+
+
+try:
+    default_client = create_client(HOST, tokens=tokens)
+    requests_session = default_client.session
+except:
+    default_client = None
+
 
-def host_is_up():
+def host_is_up(client=default_client):
     """
     Returns:
         True if the host is up.
     """
     try:
-        response = requests_session.head(HOST)
+        response = client.session.head(client.host, timeout=client.timeout)
     except:
         return False
     return response.status_code == 200
 
 
-def host_is_valid():
+def host_is_valid(client=default_client):
     """
     Check if the host is valid by simulating a fake login.
     Returns:
         True if the host is valid.
     """
-    if not host_is_up():
+    if not host_is_up(client=client):
         return False
     try:
-        post("auth/login", {"email": "", "password": ""})
+        post("auth/login", {"email": "", "password": ""}, client=client)
     except Exception as exc:
         return type(exc) == ParameterException
 
 
-def get_host():
+def get_host(client=default_client):
     """
     Returns:
         Host on which requests are sent.
     """
-    return HOST
+    return client.host
 
 
-def get_zou_url_from_host():
+def get_zou_url_from_host(client=default_client):
     """
     Returns:
         Zou url, retrieved from host.
     """
-    return HOST[:-4]
+    return client.host[:-4]
 
 
-def set_host(new_host):
+def set_host(new_host, client=default_client):
     """
     Returns:
         Set currently configured host on which requests are sent.
     """
     global HOST
-    HOST = new_host
+    client.host = new_host
+    if client is default_client:
+        HOST = new_host
 
 
-def get_event_host():
+def get_event_host(client=default_client):
     """
     Returns:
         Host on which listening for events.
     """
-    if EVENT_HOST is None:
-        return HOST
+    if client.event_host is None:
+        return client.host
     else:
-        return EVENT_HOST
+        return client.event_host
 
 
-def set_event_host(new_host):
+def set_event_host(new_host, client=default_client):
     """
     Returns:
         Set currently configured host on which listening for events.
     """
     global EVENT_HOST
-    EVENT_HOST = new_host
+    client.event_host = new_host
+    if client is default_client:
+        EVENT_HOST = new_host
 
 
-def set_tokens(new_tokens):
+def set_tokens(new_tokens, client=default_client):
     """
     Store authentication token to reuse them for all requests.
 
@@ -113,22 +258,590 @@ def set_tokens(new_tokens):
         new_tokens (dict): Tokens to use for authentication.
     """
     global tokens
-    tokens = new_tokens
-    return tokens
+    client.tokens = new_tokens
+    if client is default_client:
+        tokens = new_tokens
+    return new_tokens
 
 
-def make_auth_header():
+def make_auth_header(client=default_client):
     """
     Returns:
         Headers required to authenticate.
     """
-    global tokens
-    if "access_token" in tokens:
-        return {"Authorization": "Bearer %s" % tokens["access_token"]}
+    if "access_token" in client.tokens:
+        return {"Authorization": "Bearer %s" % client.tokens["access_token"]}
     else:
         return {}
 
 
+def set_connection_pool(
+    pool_connections=DEFAULT_POOL_SIZE,
+    pool_maxsize=DEFAULT_POOL_SIZE,
+    pool_block=False,
+    keep_alive=True,
+    client=default_client,
+):
+    """
+    Configure the connections kept open by the client session. Threaded
+    scripts should use a pool at least as big as their number of threads,
+    otherwise extra connections are opened and closed for each request.
+
+    Args:
+        pool_connections (int): Number of hosts for which a connection pool
+        is kept.
+        pool_maxsize (int): Number of connections kept open per host.
+        pool_block (bool): Wait for a free connection instead of opening an
+        extra one when all pooled connections are busy.
+        keep_alive (bool): Reuse connections between requests. When False,
+        the server is asked to close the connection after each request.
+    """
+    _mount_http_adapter(
+        client,
+        pool_connections=pool_connections,
+        pool_maxsize=pool_maxsize,
+        pool_block=pool_block,
+    )
+    if keep_alive:
+        client.session.headers.pop("Connection", None)
+    else:
+        client.session.headers["Connection"] = "close"
+
+
+def set_timeout(connect=None, read=None, client=default_client):
+    """
+    Set the time allowed to the server to accept connections and to send
+    data, so a stuck server raises an error instead of blocking forever.
+    None means no limit, which is the default.
+
+    Args:
+        connect (float): Seconds to wait for the connection to be made.
+        read (float): Seconds to wait between two bytes sent by the server.
+    """
+    if connect is None and read is None:
+        client.timeout = None
+    else:
+        client.timeout = (connect, read)
+
+
+def get_timeout(client=default_client):
+    """
+    Returns:
+        tuple: Connect and read timeouts used for requests, None if there is
+        no limit.
+    """
+    return client.timeout
+
+
+def get_connection_stats(client=default_client):
+    """
+    Count the connections opened by the client session. A connection is
+    reused when a request is sent through an already open connection.
+
+    Returns:
+        dict: Number of requests sent, new connections made, reused
+        connections and open connection pools.
+    """
+    with client.stats_lock:
+        stats = dict(client.connection_stats)
+    stats["pools"] = 0
+    for adapter in set(client.session.adapters.values()):
+        pools = adapter.poolmanager.pools
+        with pools.lock:
+            open_pools = list(pools._container.values())
+        for pool in open_pools:
+            stats["new_connections"] += pool.num_connections
+            stats["requests"] += pool.num_requests
+            stats["pools"] += 1
+    stats["reused_connections"] = max(
+        0, stats["requests"] - stats["new_connections"]
+    )
+    return stats
+
+
+def set_compression(
+    compress_responses=True, request_threshold=None, client=default_client
+):
+    """
+    Configure the compression of the data exchanged with the API. Big lists
+    of entries are very repetitive, compressing them divides the transfer
+    time on slow networks.
+
+    Args:
+        compress_responses (bool): Ask the server for compressed responses.
+        request_threshold (int): Compress JSON bodies of post and put
+        requests bigger than this number of bytes with gzip. None, the
+        default, never compresses them because the server must be set to
+        accept compressed requests.
+    """
+    if compress_responses:
+        client.session.headers["Accept-Encoding"] = get_accept_encoding()
+    else:
+        client.session.headers["Accept-Encoding"] = "identity"
+    client.compression["request_threshold"] = request_threshold
+
+
+def get_transfer_stats(client=default_client):
+    """
+    Measure the data sent and received for each endpoint. Wire sizes are
+    the sizes of the bodies as transferred, compressed or not, while the
+    other sizes are the sizes of the decoded bodies. Ids are replaced by
+    ":id" in endpoint paths.
+
+    Returns:
+        dict: For each endpoint, the number of requests, the bytes sent and
+        received and the same amounts on the wire.
+    """
+    with client.stats_lock:
+        return dict(
+            (endpoint, dict(stats))
+            for endpoint, stats in client.transfer_stats.items()
+        )
+
+
+def get_endpoint(path):
+    """
+    Returns:
+        str: Given path without its query string and with ids replaced by
+        ":id", to group statistics of similar requests.
+    """
+    path = path.split("?")[0].strip("/")
+    return ID_PATTERN.sub(":id", path)
+
+
+def _record_transfer(
+    client,
+    path,
+    response,
+    sent_bytes=0,
+    sent_wire_bytes=0,
+    received_bytes=None,
+):
+    if received_bytes is None:
+        received_bytes = len(response.content)
+    try:
+        received_wire_bytes = response.raw.tell()
+    except Exception:
+        received_wire_bytes = 0
+    if not received_wire_bytes:
+        received_wire_bytes = int(
+            response.headers.get("Content-Length", received_bytes)
+        )
+    with client.stats_lock:
+        stats = client.transfer_stats.setdefault(
+            get_endpoint(path),
+            {
+                "requests": 0,
+                "sent_bytes": 0,
+                "sent_wire_bytes": 0,
+                "received_bytes": 0,
+                "received_wire_bytes": 0,
+            },
+        )
+        stats["requests"] += 1
+        stats["sent_bytes"] += sent_bytes
+        stats["sent_wire_bytes"] += sent_wire_bytes
+        stats["received_bytes"] += received_bytes
+        stats["received_wire_bytes"] += received_wire_bytes
+
+
+def gzip_compress(data):
+    """
+    Returns:
+        bytes: Given data in the gzip format.
+    """
+    compressor = zlib.compressobj(6, zlib.DEFLATED, 16 + zlib.MAX_WBITS)
+    return compressor.compress(data) + compressor.flush()
+
+
+def start_recording_validators():
+    """
+    Record the ETag and Last-Modified validators of the JSON get requests
+    sent by the current thread, until stop_recording_validators is called.
+    The cache records them while it computes a value, to revalidate it
+    cheaply once it's expired (see revalidate).
+
+    Returns:
+        list: Validators recorded before, to give to
+        stop_recording_validators.
+    """
+    previous = getattr(conditional_requests, "validators", None)
+    conditional_requests.validators = []
+    return previous
+
+
+def stop_recording_validators(previous):
+    """
+    Stop recording validators and restore the previous recording. The
+    validators recorded meanwhile are added to the previous recording too,
+    because its value depends on the same responses.
+
+    Returns:
+        list: Recorded validators, None if one of the responses can't be
+        revalidated.
+    """
+    validators = conditional_requests.validators
+    conditional_requests.validators = previous
+    conditional_requests.prefetched = {}
+    if validators is not None and None in validators:
+        validators = None
+    add_validators(validators)
+    return validators
+
+
+def add_validators(validators):
+    """
+    Add validators to the current recording, if any. None means that the
+    recorded value can't be revalidated.
+    """
+    recorded = getattr(conditional_requests, "validators", None)
+    if recorded is not None:
+        if validators is None:
+            recorded.append(None)
+        else:
+            recorded.extend(validators)
+
+
+def _record_validator(path, response):
+    if getattr(conditional_requests, "validators", None) is None:
+        return
+    etag = response.headers.get("ETag")
+    last_modified = response.headers.get("Last-Modified")
+    if etag or last_modified:
+        add_validators(
+            [
+                {
+                    "path": path,
+                    "etag": etag,
+                    "last_modified": last_modified,
+                    "size": len(response.content),
+                }
+            ]
+        )
+    else:
+        add_validators(None)
+
+
+def revalidate(validators, client=default_client):
+    """
+    Ask the server whether the responses described by given validators
+    changed, with If-None-Match and If-Modified-Since headers. Unchanged
+    responses are answered with "304 Not Modified" and no body. The first
+    changed response is kept, so the next get request of the current
+    thread for the same path uses it instead of downloading it again.
+
+    Args:
+        validators (list): Validators recorded while a value was computed
+        (see start_recording_validators).
+
+    Returns:
+        bool: True if none of the responses changed.
+    """
+    for validator in validators:
+        response = _send_request(
+            "get",
+            validator["path"],
+            client=client,
+            headers=get_conditional_headers(validator),
+        )
+        with client.stats_lock:
+            client.validator_stats["conditional_requests"] += 1
+            if response.status_code == 304:
+                client.validator_stats["not_modified"] += 1
+                client.validator_stats["saved_bytes"] += validator["size"]
+        if response.status_code != 304:
+            check_status(response, validator["path"])
+            conditional_requests.prefetched = {
+                get_full_url(validator["path"], client=client): response
+            }
+            return False
+    return True
+
+
+def get_validator_stats(client=default_client):
+    """
+    Returns:
+        dict: Number of conditional requests sent, of "304 Not Modified"
+        answers and of bytes that were not downloaded again thanks to them.
+    """
+    with client.stats_lock:
+        return dict(client.validator_stats)
+
+
+def _pop_prefetched_response(path, client):
+    prefetched = getattr(conditional_requests, "prefetched", None)
+    if prefetched:
+        return prefetched.pop(get_full_url(path, client=client), None)
+    return None
+
+
+def get_conditional_headers(validator):
+    """
+    Returns:
+        dict: Headers asking the server to answer "304 Not Modified" if the
+        response described by given validator did not change.
+    """
+    headers = {}
+    if validator["etag"]:
+        headers["If-None-Match"] = validator["etag"]
+    if validator["last_modified"]:
+        headers["If-Modified-Since"] = validator["last_modified"]
+    return headers
+
+
+def set_retry_policy(
+    max_retries=3,
+    backoff_factor=0.5,
+    max_backoff=30,
+    statuses=[429, 502, 503, 504],
+    client=default_client,
+):
+    """
+    Configure how failed requests are sent again. A request is retried when
+    the connection fails or when the server answers with one of given
+    statuses. The delay before the n-th retry is picked randomly between 0
+    and backoff_factor * 2 ** n seconds, unless the server tells how long to
+    wait with a Retry-After header. Both are capped to max_backoff.
+
+    GET, PUT and DELETE requests are retried by default. POST requests are
+    retried only when the caller asks for it, because they are not
+    idempotent.
+
+    Args:
+        max_retries (int): Number of retries after the first attempt, 0
+        disables retries.
+        backoff_factor (float): Base delay in seconds.
+        max_backoff (float): Maximum delay in seconds between two attempts.
+        statuses (list): HTTP statuses for which the request is retried.
+    """
+    client.retry_policy = {
+        "max_retries": max_retries,
+        "backoff_factor": backoff_factor,
+        "max_backoff": max_backoff,
+        "statuses": list(statuses),
+    }
+
+
+def get_retry_stats(client=default_client):
+    """
+    Returns:
+        dict: Number of retries, of requests that needed at least one retry,
+        of requests that failed after all their retries and the time spent
+        waiting between attempts (in seconds).
+    """
+    with client.stats_lock:
+        return dict(client.retry_stats)
+
+
+def get_retry_after(response):
+    """
+    Args:
+        response (Response): Response sent by the server.
+
+    Returns:
+        float: Delay in seconds asked by the Retry-After header of given
+        response, None if there is no such header.
+    """
+    value = response.headers.get("Retry-After")
+    if not value:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    date = email.utils.parsedate_tz(value)
+    if date is None:
+        return None
+    return max(0.0, email.utils.mktime_tz(date) - time.time())
+
+
+def get_retry_delay(attempt, response=None, client=default_client):
+    """
+    Args:
+        attempt (int): Number of retries already made.
+        response (Response): Response of the failed attempt, None if the
+        connection failed.
+
+    Returns:
+        float: Seconds to wait before the next attempt.
+    """
+    policy = client.retry_policy
+    if response is not None:
+        retry_after = get_retry_after(response)
+        if retry_after is not None:
+            return min(retry_after, policy["max_backoff"])
+    max_delay = min(
+        policy["max_backoff"], policy["backoff_factor"] * (2 ** attempt)
+    )
+    return random.uniform(0, max_delay)
+
+
+def refresh_access_token(expired_token=None, client=default_client):
+    """
+    Get a new access token from the API with the stored refresh token. When
+    several threads get their token refused at the same time, only the
+    first one asks for a new token: the others wait for it and see that
+    the token they used was already replaced.
+
+    Args:
+        expired_token (str): Access token refused by the API. If it's no
+        longer the current token, no request is sent.
+
+    Returns:
+        dict: The client tokens.
+
+    Raises:
+        NotAuthenticatedException: when the refresh token is refused too.
+    """
+    with client.refresh_lock:
+        if (
+            expired_token is None
+            or client.tokens.get("access_token") == expired_token
+        ):
+            path = "auth/refresh-token"
+            response = client.session.get(
+                get_full_url(path, client=client),
+                headers={
+                    "Authorization": "Bearer %s"
+                    % client.tokens["refresh_token"]
+                },
+                timeout=client.timeout,
+            )
+            check_status(response, path)
+            client.tokens["access_token"] = encoder.loads(
+                response.content
+            )["access_token"]
+    return client.tokens
+
+
+def can_refresh_token(path, client=default_client):
+    """
+    Returns:
+        bool: True if a request to given path refused for authentication
+        reasons can be sent again after refreshing the access token.
+    """
+    if not client.tokens.get("refresh_token"):
+        return False
+    return not path.lstrip("/").startswith("auth/")
+
+
+def _send_request(method, path, retry=None, client=default_client, **kwargs):
+    """
+    Send a request to the API, retrying it according to the client retry
+    policy. By default only idempotent methods are retried. When the access
+    token is refused, it is refreshed once and the request is sent again.
+    A json argument is serialized with the configured JSON codec, and
+    compressed if it's bigger than the compression threshold.
+
+    Returns:
+        Response: The last response received.
+    """
+    if retry is None:
+        retry = method in IDEMPOTENT_METHODS
+    url = get_full_url(path, client=client)
+    headers = dict(kwargs.pop("headers", None) or {})
+    if "json" in kwargs:
+        kwargs["data"] = encoder.dumps(kwargs.pop("json")).encode("utf-8")
+        headers["Content-Type"] = "application/json"
+    body = kwargs.get("data")
+    if isinstance(body, MultipartEncoder):
+        headers["Content-Type"] = body.content_type
+    elif isinstance(body, ChunkedBody):
+        headers["Content-Type"] = body.body.content_type
+    sent_bytes = sent_wire_bytes = get_body_size(body)
+    if "Content-Type" in headers and isinstance(body, bytes):
+        threshold = client.compression["request_threshold"]
+        if threshold is not None and sent_bytes > threshold:
+            kwargs["data"] = gzip_compress(body)
+            headers["Content-Encoding"] = "gzip"
+            sent_wire_bytes = len(kwargs["data"])
+    send = getattr(client.session, method)
+    policy = client.retry_policy
+    attempt = 0
+    token_refreshed = False
+    while True:
+        access_token = client.tokens.get("access_token")
+        try:
+            response = send(
+                url,
+                headers=dict(make_auth_header(client=client), **headers),
+                timeout=client.timeout,
+                **kwargs
+            )
+        except (
+            requests.exceptions.ConnectionError,
+            requests.exceptions.Timeout,
+        ):
+            if not retry or attempt >= policy["max_retries"]:
+                _record_retries(client, attempt, failed=True)
+                raise
+            delay = get_retry_delay(attempt, client=client)
+        else:
+            if not kwargs.get("stream"):
+                _record_transfer(
+                    client,
+                    path,
+                    response,
+                    sent_bytes=sent_bytes,
+                    sent_wire_bytes=sent_wire_bytes,
+                )
+            if (
+                response.status_code in [401, 422]
+                and not token_refreshed
+                and can_refresh_token(path, client=client)
+            ):
+                token_refreshed = True
+                try:
+                    refresh_access_token(access_token, client=client)
+                except NotAuthenticatedException:
+                    return response
+                response.close()
+                _rewind_body(kwargs)
+                continue
+            if not retry or response.status_code not in policy["statuses"]:
+                _record_retries(client, attempt)
+                return response
+            if attempt >= policy["max_retries"]:
+                _record_retries(client, attempt, failed=True)
+                return response
+            delay = get_retry_delay(attempt, response, client=client)
+            response.close()
+        attempt += 1
+        with client.stats_lock:
+            client.retry_stats["retries"] += 1
+            client.retry_stats["backoff_time"] += delay
+        time.sleep(delay)
+        _rewind_body(kwargs)
+
+
+def get_body_size(body):
+    """
+    Returns:
+        int: Size in bytes of given request body, 0 if it's unknown.
+    """
+    if isinstance(body, (bytes, MultipartEncoder)):
+        return len(body)
+    elif isinstance(body, ChunkedBody):
+        return len(body.body)
+    return 0
+
+
+def _rewind_body(kwargs):
+    for file_object in (kwargs.get("files") or {}).values():
+        file_object.seek(0)
+    if isinstance(kwargs.get("data"), MultipartEncoder):
+        kwargs["data"].seek(0)
+
+
+def _record_retries(client, attempt, failed=False):
+    if attempt > 0 or failed:
+        with client.stats_lock:
+            if attempt > 0:
+                client.retry_stats["retried_requests"] += 1
+            if failed:
+                client.retry_stats["failed_requests"] += 1
+
+
 def url_path_join(*items):
     """
     Make it easier to build url path by joining every arguments with a '/'
@@ -140,7 +853,7 @@ def url_path_join(*items):
     return "/".join([item.lstrip("/").rstrip("/") for item in items])
 
 
-def get_full_url(path):
+def get_full_url(path, client=default_client):
     """
     Args:
         path (str): The path to integrate to host url.
@@ -148,69 +861,85 @@ def get_full_url(path):
     Returns:
         The result of joining configured host url with given path.
     """
-    return url_path_join(get_host(), path)
+    return url_path_join(get_host(client=client), path)
 
 
-def get(path, json_response=True, params=None):
+def get(
+    path, json_response=True, params=None, retry=True, client=default_client
+):
     """
     Run a get request toward given path for configured host.
 
+    Args:
+        retry (bool): Send the request again if it fails (see
+        set_retry_policy).
+
     Returns:
         The request result.
     """
     path = build_path_with_params(path, params)
-
-    response = requests_session.get(
-        get_full_url(path), headers=make_auth_header()
-    )
+    response = _pop_prefetched_response(path, client)
+    if response is None:
+        response = _send_request("get", path, retry=retry, client=client)
     check_status(response, path)
 
     if json_response:
-        return response.json()
+        _record_validator(path, response)
+        return encoder.loads(response.content)
     else:
         return response.text
 
 
-def post(path, data):
+def post(path, data, retry=False, client=default_client):
     """
     Run a post request toward given path for configured host.
 
+    Args:
+        retry (bool): Send the request again if it fails. It's disabled by
+        default because the server could have handled the failed attempt.
+
     Returns:
         The request result.
     """
-    response = requests_session.post(
-        get_full_url(path), json=data, headers=make_auth_header()
+    response = _send_request(
+        "post", path, retry=retry, client=client, json=data
     )
     check_status(response, path)
-    return response.json()
+    return encoder.loads(response.content)
 
 
-def put(path, data):
+def put(path, data, retry=True, client=default_client):
     """
     Run a put request toward given path for configured host.
 
+    Args:
+        retry (bool): Send the request again if it fails (see
+        set_retry_policy).
+
     Returns:
         The request result.
     """
-    response = requests_session.put(
-        get_full_url(path), json=data, headers=make_auth_header()
+    response = _send_request(
+        "put", path, retry=retry, client=client, json=data
     )
     check_status(response, path)
-    return response.json()
+    return encoder.loads(response.content)
 
 
-def delete(path, params=None):
+def delete(path, params=None, retry=True, client=default_client):
     """
     Run a get request toward given path for configured host.
 
+    Args:
+        retry (bool): Send the request again if it fails (see
+        set_retry_policy).
+
     Returns:
         The request result.
     """
     path = build_path_with_params(path, params)
 
-    response = requests_session.delete(
-        get_full_url(path), headers=make_auth_header()
-    )
+    response = _send_request("delete", path, retry=retry, client=client)
     check_status(response, path)
     return response.text
 
@@ -233,7 +962,7 @@ def check_status(request, path):
         NotAllowedException: when 403 response occurs
         MethodNotAllowedException: when 405 response occurs
         TooBigFileException: when 413 response occurs
-        ServerErrorException: when 500 response occurs
+        ServerErrorException: when 500, 502, 503 or 504 response occurs
     """
     status_code = request.status_code
     if status_code == 404:
@@ -252,7 +981,7 @@ def check_status(request, path):
         )
     elif status_code in [401, 422]:
         raise NotAuthenticatedException(path)
-    elif status_code in [500, 502]:
+    elif status_code in [500, 502, 503, 504]:
         try:
             stacktrace = request.json().get(
                 "stacktrace", "No stacktrace sent by the server"
@@ -269,7 +998,7 @@ def check_status(request, path):
     return status_code
 
 
-def fetch_all(path, params=None):
+def fetch_all(path, params=None, client=default_client):
     """
     Args:
         path (str): The path for which we want to retrieve all entries.
@@ -278,10 +1007,173 @@ def fetch_all(path, params=None):
         list: All entries stored in database for a given model. You can add a
         filter to the model name like this: "tasks?project_id=project-id"
     """
-    return get(url_path_join("data", path), params=params)
+    return get(url_path_join("data", path), params=params, client=client)
+
+
+def iter_all(
+    path, params=None, page_size=100, prefetch=False, client=default_client
+):
+    """
+    Generator version of fetch_all that keeps memory usage bounded for big
+    collections. Entries are requested page by page with the page and limit
+    parameters. When the route does not support pagination, the full list
+    sent by the API is parsed while it's downloaded, one entry at a time.
+
+    Args:
+        path (str): The path for which we want to retrieve all entries.
+        params (dict): Filters to apply.
+        page_size (int): Number of entries requested per page.
+        prefetch (bool): Request the next page in a background thread while
+        entries of the current page are consumed.
+
+    Returns:
+        generator: All entries stored in database for a given model.
+    """
+    path = url_path_join("data", path)
+
+    def request_page(page):
+        page_params = dict(params or {})
+        page_params.update({"page": page, "limit": page_size})
+        page_path = build_path_with_params(path, page_params)
+        response = _send_request("get", page_path, client=client, stream=True)
+        check_status(response, page_path)
+        chunks = _iter_text_chunks(response, client=client, path=page_path)
+        first_chunk = ""
+        for chunk in chunks:
+            first_chunk = chunk
+            if chunk.strip():
+                break
+        if first_chunk.lstrip().startswith("{"):
+            body = first_chunk + "".join(chunks)
+            response.close()
+            return encoder.loads(body)
+        else:
+            return _iter_response_array(response, first_chunk, chunks)
+
+    pool = ThreadPool(1) if prefetch else None
+    try:
+        page = 1
+        result = request_page(page)
+        while True:
+            if not isinstance(result, dict):
+                for entry in result:
+                    yield entry
+                return
+            entries = result.get("data") or []
+            nb_pages = result.get("nb_pages")
+            if nb_pages is not None:
+                is_last_page = page >= nb_pages
+            else:
+                is_last_page = len(entries) < page_size
+            next_result = None
+            if not is_last_page and pool is not None:
+                next_result = pool.apply_async(request_page, (page + 1,))
+            for entry in entries:
+                yield entry
+            if is_last_page:
+                return
+            page += 1
+            if next_result is not None:
+                result = next_result.get()
+            else:
+                result = request_page(page)
+    finally:
+        if pool is not None:
+            pool.terminate()
+
+
+def _iter_text_chunks(
+    response, chunk_size=64 * 1024, client=default_client, path=""
+):
+    decoder = codecs.getincrementaldecoder(response.encoding or "utf-8")()
+    received_bytes = 0
+    for chunk in response.iter_content(chunk_size=chunk_size):
+        received_bytes += len(chunk)
+        text = decoder.decode(chunk)
+        if text:
+            yield text
+    text = decoder.decode(b"", final=True)
+    _record_transfer(client, path, response, received_bytes=received_bytes)
+    if text:
+        yield text
+
+
+def _iter_response_array(response, first_chunk, chunks):
+    def iter_chunks():
+        yield first_chunk
+        for chunk in chunks:
+            yield chunk
+
+    try:
+        for item in iter_json_array(iter_chunks()):
+            yield item
+    finally:
+        response.close()
+
+
+def iter_json_array(chunks):
+    """
+    Parse a JSON array sent in several pieces and yield its items as soon as
+    they are complete, so the whole array is never held in memory.
 
+    Args:
+        chunks (iterable): Text pieces of the JSON document.
 
-def fetch_first(path, params=None):
+    Returns:
+        generator: Items of the array.
+    """
+    decoder = json.JSONDecoder()
+    buffer = ""
+    position = 0
+    is_started = False
+    is_finished = False
+    chunks = iter(chunks)
+    while not is_finished:
+        chunk = next(chunks, None)
+        is_finished = chunk is None
+        buffer = buffer[position:] + (chunk or "")
+        position = 0
+        while True:
+            while position < len(buffer) and buffer[position] in " \t\r\n,":
+                position += 1
+            if position == len(buffer):
+                break
+            if not is_started:
+                if buffer[position] != "[":
+                    raise ValueError("Expected a JSON array")
+                is_started = True
+                position += 1
+                continue
+            if buffer[position] == "]":
+                return
+            try:
+                item, end = decoder.raw_decode(buffer, position)
+            except ValueError:
+                if is_finished:
+                    raise
+                break
+            # An item is complete only when it's followed by a separator,
+            # otherwise a number could continue in the next chunk.
+            next_position = end
+            while (
+                next_position < len(buffer)
+                and buffer[next_position] in " \t\r\n"
+            ):
+                next_position += 1
+            if (
+                next_position == len(buffer)
+                or buffer[next_position] not in ",]"
+            ):
+                if is_finished:
+                    raise ValueError("Invalid JSON array")
+                break
+            yield item
+            position = end
+    if is_started:
+        raise ValueError("Unterminated JSON array")
+
+
+def fetch_first(path, params=None, client=default_client):
     """
     Args:
         path (str): The path for which we want to retrieve the first entry.
@@ -289,14 +1181,14 @@ def fetch_first(path, params=None):
     Returns:
         dict: The first entry for which a model is required.
     """
-    entries = get(url_path_join("data", path), params=params)
+    entries = get(url_path_join("data", path), params=params, client=client)
     if len(entries) > 0:
         return entries[0]
     else:
         return None
 
 
-def fetch_one(model_name, id):
+def fetch_one(model_name, id, client=default_client):
     """
     Function dedicated at targeting routes that returns a single model instance.
 
@@ -307,39 +1199,197 @@ def fetch_one(model_name, id):
     Returns:
         dict: The model instance matching id and model name.
     """
-    return get(url_path_join("data", model_name, id))
+    return get(url_path_join("data", model_name, id), client=client)
 
 
-def create(model_name, data):
+def fetch_many(model_name, ids, max_workers=8, client=default_client):
     """
-    Create an entry for given model and data.
+    Function dedicated at retrieving many model instances at once. Each ID
+    is requested only once, models already in the cache (see
+    gazu.cache.model_readers) are not requested and the remaining ones are
+    fetched in parallel. Fetched models are stored in the cache when it's
+    enabled. The connection pool should be at least as big as max_workers
+    (see set_connection_pool).
+
+    Args:
+        model_name (str): Model type name.
+        ids (list): Model instance IDs.
+        max_workers (int): Number of requests sent at the same time.
 
     Returns:
-        dict: Created entry
+        list: The model instances, in the same order as given IDs.
     """
-    return post(url_path_join("data", model_name), data)
+    from . import cache
+
+    unique_ids = []
+    seen_ids = set()
+    for model_id in ids:
+        if model_id not in seen_ids:
+            seen_ids.add(model_id)
+            unique_ids.append(model_id)
+    models = cache.get_cached_models(model_name, unique_ids, client=client)
+    missing_ids = [
+        model_id for model_id in unique_ids if model_id not in models
+    ]
+
+    def fetch(model_id):
+        return fetch_one(model_name, model_id, client=client)
+
+    if missing_ids:
+        pool = ThreadPool(max(1, min(max_workers, len(missing_ids))))
+        try:
+            fetched_models = pool.map(fetch, missing_ids)
+        finally:
+            pool.close()
+            pool.join()
+        models.update(zip(missing_ids, fetched_models))
+        cache.set_cached_models(model_name, fetched_models, client=client)
+    return [models[model_id] for model_id in ids]
+
 
+def run_bulk(function, items, file_paths=[], max_workers=4, priority="bulk"):
+    """
+    Call given function for each item with a pool of threads. A failing
+    item does not stop the others: its error is reported instead. The
+    connection pool should be at least as big as max_workers (see
+    set_connection_pool).
+
+    Args:
+        function (func): Function called with the elements of each item as
+        arguments.
+        items (list): Tuples of arguments.
+        file_paths (list): Files transferred by each item, to measure the
+        throughput.
+        max_workers (int): Number of items processed at the same time.
+        priority (str): Priority class of the transfers run by the items in
+        the process scheduler (see gazu.scheduler).
+
+    Returns:
+        dict: Result or error of each item (in the same order as given
+        items), number of succeeded and failed items, bytes transferred,
+        duration in seconds and throughput in bytes per second.
+    """
+    start = time.time()
+
+    def run(item):
+        previous_priority = scheduler.set_thread_priority(priority)
+        try:
+            return {"item": item, "result": function(*item), "error": None}
+        except Exception as exception:
+            return {"item": item, "result": None, "error": exception}
+        finally:
+            scheduler.set_thread_priority(previous_priority)
+
+    results = []
+    if items:
+        pool = ThreadPool(max(1, min(max_workers, len(items))))
+        try:
+            results = pool.map(run, items)
+        finally:
+            pool.close()
+            pool.join()
+    return build_bulk_report(results, file_paths, time.time() - start)
+
+
+def build_bulk_report(results, file_paths, duration):
+    """
+    Returns:
+        dict: Summary of the results of a bulk operation (see run_bulk).
+    """
+    transferred_bytes = sum(
+        os.path.getsize(file_path)
+        for result, file_path in zip(results, file_paths)
+        if result["error"] is None and os.path.exists(file_path)
+    )
+    failed = len([result for result in results if result["error"]])
+    return {
+        "results": results,
+        "succeeded": len(results) - failed,
+        "failed": failed,
+        "bytes": transferred_bytes,
+        "duration": duration,
+        "throughput": transferred_bytes / duration if duration > 0 else 0.0,
+    }
+
+
+def create(model_name, data, client=default_client):
+    """
+    Create an entry for given model and data.
 
-def upload(path, file_path, data={}, extra_files=[]):
+    Returns:
+        dict: Created entry
+    """
+    return post(url_path_join("data", model_name), data, client=client)
+
+
+def upload(
+    path,
+    file_path,
+    data={},
+    extra_files=[],
+    progress_callback=None,
+    chunked=False,
+    retry=False,
+    checksum=None,
+    file_infos=None,
+    priority=None,
+    client=default_client,
+):
     """
-    Upload file located at *file_path* to given url *path*.
+    Upload file located at *file_path* to given url *path*. The multipart
+    body is streamed from the files, so memory usage stays low whatever
+    their size.
 
     Args:
         path (str): The url path to upload file.
         file_path (str): The file location on the hard drive.
+        data (dict): Form fields sent with the file.
+        extra_files (list): Locations of other files to send.
+        progress_callback (func): Called while the body is sent with the
+        number of bytes sent, the body size and the throughput in bytes per
+        second.
+        chunked (bool): Send the body with chunked transfer encoding instead
+        of announcing its size.
+        retry (bool): Send the whole body again if the connection fails or
+        the server is unavailable (see set_retry_policy).
+        checksum (str): Algorithm of a checksum of the file to compute while
+        it's sent (md5, sha256, xxh64...), to avoid reading it twice.
+        file_infos (dict): Filled with the size and the checksum of the
+        uploaded file once it's sent.
+        priority (str): Priority class of the transfer in the process
+        scheduler (see gazu.scheduler).
 
     Returns:
-        Response: Request response object.
+        dict: Result sent by the API.
     """
-    url = get_full_url(path)
     files = _build_file_dict(file_path, extra_files)
-    response = requests_session.post(
-        url, data=data, headers=make_auth_header(), files=files
-    )
+    try:
+        body = MultipartEncoder(
+            data,
+            files,
+            progress_callback=progress_callback,
+            checksums=[checksum] if checksum is not None else [],
+            throttle=scheduler.consume,
+        )
+        with scheduler.transfer(priority):
+            response = _send_request(
+                "post",
+                path,
+                retry=retry,
+                client=client,
+                data=ChunkedBody(body) if chunked else body,
+            )
+    finally:
+        for file_object in files.values():
+            file_object.close()
     check_status(response, path)
-    result = response.json()
+    result = encoder.loads(response.content)
     if "message" in result:
         raise UploadFailedException(result["message"])
+    if file_infos is not None:
+        checksums = body.file_parts["file"].checksums
+        file_infos["size"] = checksums.size
+        file_infos["checksum"] = checksums.hexdigests().get(checksum)
     return result
 
 
@@ -352,40 +1402,433 @@ def _build_file_dict(file_path, extra_files):
     return files
 
 
-def download(path, file_path):
+def download(
+    path,
+    file_path,
+    ranges=1,
+    resume=True,
+    progress_callback=None,
+    checksum=None,
+    priority=None,
+    client=default_client,
+):
     """
-    Download file located at *file_path* to given url *path*.
+    Download file located at given url *path* to *file_path*. Data are
+    written to a ".part" file renamed once the download is complete, so an
+    interrupted download never leaves a truncated file. When the server
+    supports ranges, an interrupted download is resumed from the data
+    already written and big files can be downloaded through several
+    connections at once. When the server sends checksums of the file
+    (Repr-Digest, Digest, Content-MD5 headers), the downloaded file is
+    checked against them.
 
     Args:
         path (str): The url path to download file from.
         file_path (str): The location to store the file on the hard drive.
+        ranges (int): Number of ranges downloaded in parallel. Each range is
+        at least MIN_RANGE_SIZE bytes long.
+        resume (bool): Continue the download left by a previous attempt
+        instead of starting over.
+        progress_callback (func): Called after each written chunk with the
+        number of bytes written so far, the file size (None if unknown) and
+        the throughput in bytes per second.
+        checksum (str): Algorithm of the checksum to compute (md5, sha256,
+        xxh64...). It's computed while the data are received, unless the
+        file is downloaded through several ranges.
+        priority (str): Priority class of the transfer in the process
+        scheduler (see gazu.scheduler).
+
+    Returns:
+        dict: Size of the file, bytes taken from a previous attempt, number
+        of ranges used, duration of the download in seconds, the checksum
+        and whether the file was verified against server checksums.
+
+    Raises:
+        DownloadFailedException: when the file does not match the size or
+        the checksums announced by the server.
+    """
+    with scheduler.transfer(priority):
+        return _download_file(
+            path,
+            file_path,
+            ranges,
+            resume,
+            progress_callback,
+            checksum,
+            client,
+        )
+
+
+def _download_file(
+    path, file_path, ranges, resume, progress_callback, checksum, client
+):
+    part_path = file_path + ".part"
+    state_path = part_path + ".json"
+    state = _open_download_state(part_path, state_path, resume)
+    progress = _build_progress(state, progress_callback)
+
+    response = _send_range_request(path, state, state["ranges"][0], client)
+    if response.status_code == 416 and state["ranges"][0][0] > 0:
+        response.close()
+        return _download_file(
+            path, file_path, ranges, False, progress_callback, checksum, client
+        )
+    check_status(response, path)
+    checksums, is_checksum_streamed = _start_download(
+        response, part_path, state_path, state, ranges, progress, checksum
+    )
+
+    pool = ThreadPool(len(state["ranges"]))
+    try:
+        results = [
+            pool.apply_async(
+                _download_range,
+                (
+                    path,
+                    part_path,
+                    state,
+                    byte_range,
+                    response if index == 0 else None,
+                    progress,
+                    checksums if is_checksum_streamed else None,
+                    client,
+                ),
+            )
+            for index, byte_range in enumerate(state["ranges"])
+        ]
+        for result in results:
+            result.wait()
+        for result in results:
+            result.get()
+    except BaseException:
+        _save_download_state(state_path, state, progress)
+        raise
+    finally:
+        pool.close()
+        pool.join()
+
+    return _finish_download(
+        path,
+        file_path,
+        state,
+        progress,
+        checksums,
+        is_checksum_streamed,
+        checksum,
+    )
+
+
+def _open_download_state(part_path, state_path, resume):
+    """
+    Returns:
+        dict: State of the download to run, the one left by a previous
+        attempt if it can be resumed. Part files which can't be resumed are
+        removed.
+    """
+    if not resume:
+        _remove_file(part_path)
+        _remove_file(state_path)
+    state = _load_download_state(part_path, state_path)
+    if not state["validator"]:
+        _remove_file(part_path)
+    return state
+
+
+def _build_progress(state, progress_callback):
+    return {
+        "lock": threading.Lock(),
+        "start": time.time(),
+        "written": 0,
+        "resumed": 0,
+        "size": state["size"],
+        "callback": progress_callback,
+    }
+
+
+def _start_download(
+    response, part_path, state_path, state, ranges, progress, checksum
+):
+    """
+    Update the download state from the first response sent by the server,
+    split the file in ranges and save the state, so the download can be
+    resumed from now on. The part file is created if needed.
+
+    Returns:
+        tuple: Checksums to compute (None if there is none) and whether they
+        are computed while the data are received.
+    """
+    if response.status_code == 206:
+        size = get_content_range_size(response)
+        if len(state["ranges"]) == 1:
+            state["ranges"] = split_range(state["ranges"][0][0], size, ranges)
+    else:
+        size = int(response.headers.get("Content-Length", 0)) or None
+        state["ranges"] = [[0, size]]
+        state["checksums"] = {}
+        with open(part_path, "wb"):
+            pass
+    state["size"] = progress["size"] = size
+    state["validator"] = response.headers.get("ETag") or response.headers.get(
+        "Last-Modified"
+    )
+    resumed_bytes = state["ranges"][0][0]
+    if size is not None:
+        resumed_bytes = size - sum(
+            end - start for start, end in state["ranges"]
+        )
+    progress["written"] = progress["resumed"] = resumed_bytes
+    if not os.path.exists(part_path):
+        with open(part_path, "wb"):
+            pass
+    _save_download_state(state_path, state, progress)
+
+    server_checksums = state.get("checksums") or {}
+    server_checksums.update(get_server_checksums(response))
+    state["checksums"] = server_checksums
+    algorithms = set(server_checksums)
+    if checksum is not None:
+        algorithms.add(checksum)
+    checksums = None
+    if algorithms:
+        checksums = Checksums(algorithms)
+    is_checksum_streamed = checksums is not None and len(state["ranges"]) == 1
+    if is_checksum_streamed and state["ranges"][0][0] > 0:
+        checksums.update_from_file(part_path, state["ranges"][0][0])
+    return checksums, is_checksum_streamed
+
+
+def _finish_download(
+    path, file_path, state, progress, checksums, is_checksum_streamed, checksum
+):
+    """
+    Check the size and the checksums of the downloaded part file, then
+    rename it to the target location.
 
     Returns:
-        Response: Request response object.
+        dict: Statistics of the download (see download).
+    """
+    part_path = file_path + ".part"
+    state_path = part_path + ".json"
+    size = state["size"]
+    server_checksums = state["checksums"]
+    if size is not None and os.path.getsize(part_path) != size:
+        _save_download_state(state_path, state, progress)
+        raise DownloadFailedException(
+            "%s: %s bytes received instead of %s"
+            % (path, os.path.getsize(part_path), size)
+        )
+    digests = {}
+    if checksums is not None:
+        if not is_checksum_streamed:
+            checksums.update_from_file(part_path)
+        digests = checksums.hexdigests()
+    for algorithm, server_checksum in server_checksums.items():
+        if digests[algorithm] != server_checksum.lower():
+            _remove_file(part_path)
+            _remove_file(state_path)
+            raise DownloadFailedException(
+                "%s: %s checksum of the downloaded file does not match"
+                % (path, algorithm)
+            )
+    _remove_file(state_path)
+    _replace_file(part_path, file_path)
+    return {
+        "size": os.path.getsize(file_path),
+        "resumed_bytes": progress["resumed"],
+        "ranges": len(state["ranges"]),
+        "duration": time.time() - progress["start"],
+        "checksum": digests.get(checksum),
+        "verified": len(server_checksums) > 0,
+    }
+
+
+def get_content_range_size(response):
+    """
+    Returns:
+        int: Full size of the file a partial response is part of, None if
+        the server does not know it.
+    """
+    content_range = response.headers.get("Content-Range", "")
+    size = content_range.rsplit("/", 1)[-1]
+    if size.isdigit():
+        return int(size)
+    return None
+
+
+def split_range(start, end, ranges, min_size=None):
+    """
+    Split the bytes from start to end (excluded) in ranges of the same
+    length, each being at least min_size long (MIN_RANGE_SIZE by default).
 
+    Returns:
+        list: Start and end of each range.
     """
-    url = get_full_url(path)
-    with requests_session.get(
-        url, headers=make_auth_header(), stream=True
-    ) as response:
-        with open(file_path, "wb") as target_file:
-            shutil.copyfileobj(response.raw, target_file)
+    if end is None:
+        return [[start, None]]
+    if min_size is None:
+        min_size = MIN_RANGE_SIZE
+    ranges = max(1, min(ranges, (end - start) // max(min_size, 1)))
+    length = (end - start) // ranges
+    bounds = [start + index * length for index in range(ranges)] + [end]
+    return [[bounds[index], bounds[index + 1]] for index in range(ranges)]
 
 
-def get_api_version():
+def _load_download_state(part_path, state_path):
+    """
+    Returns:
+        dict: Ranges remaining to download, with the file size and validator
+        known by the previous attempt. The state is written when a download
+        starts. Without state file or validator, nothing tells whether the
+        file changed on the server since the part file was written, so the
+        download starts over.
+    """
+    if os.path.exists(state_path) and os.path.exists(part_path):
+        try:
+            with open(state_path, "r") as state_file:
+                state = json.load(state_file)
+            if state.get("validator"):
+                return state
+        except ValueError:
+            pass
+    return {"size": None, "validator": None, "ranges": [[0, None]]}
+
+
+def _save_download_state(state_path, state, progress):
+    with progress["lock"]:
+        state = dict(
+            state,
+            ranges=[
+                list(byte_range)
+                for byte_range in state["ranges"]
+                if byte_range[1] is None or byte_range[0] < byte_range[1]
+            ],
+        )
+    if state["ranges"]:
+        with open(state_path, "w") as state_file:
+            json.dump(state, state_file)
+
+
+def _remove_file(file_path):
+    if os.path.exists(file_path):
+        os.remove(file_path)
+
+
+def _replace_file(source_path, target_path):
+    """
+    Rename source file to target path, replacing the target file if it
+    exists. os.replace is not available with Python 2 and os.rename does
+    not replace existing files on Windows.
+    """
+    try:
+        os.rename(source_path, target_path)
+    except OSError:
+        if not os.path.exists(target_path):
+            raise
+        os.remove(target_path)
+        os.rename(source_path, target_path)
+
+
+def _send_range_request(path, state, byte_range, client):
+    headers = {"Accept-Encoding": "identity"}
+    start, end = byte_range
+    if start > 0 or end is not None or state["size"] is None:
+        headers["Range"] = "bytes=%s-%s" % (
+            start,
+            "" if end is None else end - 1,
+        )
+        if state["validator"]:
+            headers["If-Range"] = state["validator"]
+    return _send_request(
+        "get", path, client=client, stream=True, headers=headers
+    )
+
+
+def _download_range(
+    path, part_path, state, byte_range, response, progress, checksums, client
+):
+    """
+    Write the data of given range at its place in the part file. When the
+    connection drops, the rest of the range is requested again according to
+    the client retry policy. Given checksums are fed with the written data.
+    """
+    attempt = 0
+    while True:
+        try:
+            if response is None:
+                response = _send_range_request(path, state, byte_range, client)
+                check_status(response, path)
+                if response.status_code != 206:
+                    raise DownloadFailedException(
+                        "%s: the server did not send the requested range"
+                        % path
+                    )
+            _write_range(response, part_path, byte_range, progress, checksums)
+            return
+        except requests.exceptions.RequestException:
+            if attempt >= client.retry_policy["max_retries"]:
+                raise
+            time.sleep(get_retry_delay(attempt, client=client))
+            attempt += 1
+        finally:
+            if response is not None:
+                response.close()
+                response = None
+
+
+def _write_range(response, part_path, byte_range, progress, checksums):
+    with open(part_path, "r+b") as part_file:
+        part_file.seek(byte_range[0])
+        for chunk in response.iter_content(chunk_size=DOWNLOAD_CHUNK_SIZE):
+            chunk = _write_chunk(
+                part_file, chunk, byte_range, progress, checksums
+            )
+            scheduler.consume(len(chunk))
+            if byte_range[1] is not None and byte_range[0] >= byte_range[1]:
+                break
+
+
+def _write_chunk(part_file, chunk, byte_range, progress, checksums):
+    """
+    Write a received chunk at the current position of given range, without
+    going past its end.
+
+    Returns:
+        bytes: The written data.
+    """
+    if byte_range[1] is not None:
+        chunk = chunk[: byte_range[1] - byte_range[0]]
+    part_file.write(chunk)
+    if checksums is not None:
+        checksums.update(chunk)
+    with progress["lock"]:
+        byte_range[0] += len(chunk)
+        progress["written"] += len(chunk)
+        written = progress["written"]
+    _report_progress(progress, written)
+    return chunk
+
+
+def _report_progress(progress, written):
+    if progress["callback"] is not None:
+        duration = time.time() - progress["start"]
+        throughput = written / duration if duration > 0 else 0.0
+        progress["callback"](written, progress["size"], throughput)
+
+
+def get_api_version(client=default_client):
     """
     Returns:
         str: Current version of the API.
     """
-    return get("")["version"]
+    return get("", client=client)["version"]
 
 
-def get_current_user():
+def get_current_user(client=default_client):
     """
     Returns:
         dict: User database information for user linked to auth tokens.
     """
-    return get("auth/authenticated")["user"]
+    return get("auth/authenticated", client=client)["user"]
 
 
 def build_path_with_params(path, params):
@@ -402,28 +1845,34 @@ def build_path_with_params(path, params):
     if not params:
         return path
 
+    separator = "&" if "?" in path else "?"
     if hasattr(urllib, "urlencode"):
-        path = "%s?%s" % (path, urllib.urlencode(params))
+        path = "%s%s%s" % (path, separator, urllib.urlencode(params))
     else:
-        path = "%s?%s" % (path, urllib.parse.urlencode(params))
+        path = "%s%s%s" % (path, separator, urllib.parse.urlencode(params))
     return path
 
 
-def get_file_data_from_url(url, full=False):
+def get_file_data_from_url(url, full=False, client=default_client):
     """
     Return data found at given url.
     """
     if not full:
-        url = get_full_url(url)
-    response = requests.get(url, stream=True, headers=make_auth_header())
+        url = get_full_url(url, client=client)
+    response = client.session.get(
+        url,
+        stream=True,
+        headers=make_auth_header(client=client),
+        timeout=client.timeout,
+    )
     check_status(response, url)
     return response
 
 
-def import_data(model_name, data):
+def import_data(model_name, data, client=default_client):
     """
     Args:
         model_name (str): The data model to import
         data (dict): The data to import
     """
-    return post("/import/kitsu/%s" % model_name, data)
+    return post("/import/kitsu/%s" % model_name, data, client=client)
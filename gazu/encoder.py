@@ -13,3 +13,110 @@ class CustomJSONEncoder(json.JSONEncoder):
             return obj.isoformat()
 
         return json.JSONEncoder.default(self, obj)
+
+
+def encode_default(obj):
+    """
+    Serialize values that fast JSON libraries don't handle the way
+    CustomJSONEncoder does.
+    """
+    if isinstance(obj, datetime.datetime):
+        return obj.isoformat()
+    raise TypeError("%r is not JSON serializable" % obj)
+
+
+def load_json_codec():
+    def dumps(obj, **kwargs):
+        return CustomJSONEncoder(**kwargs).encode(obj)
+
+    def loads(data):
+        if isinstance(data, bytes):
+            data = data.decode("utf-8")
+        return json.loads(data)
+
+    return dumps, loads
+
+
+def load_orjson_codec():
+    import orjson
+
+    def dumps(obj, **kwargs):
+        return orjson.dumps(
+            obj,
+            default=encode_default,
+            option=orjson.OPT_PASSTHROUGH_DATETIME,
+        ).decode("utf-8")
+
+    return dumps, orjson.loads
+
+
+def load_ujson_codec():
+    import ujson
+
+    def dumps(obj, **kwargs):
+        return ujson.dumps(obj, default=encode_default, ensure_ascii=False)
+
+    return dumps, ujson.loads
+
+
+json_codecs = {
+    "orjson": load_orjson_codec,
+    "ujson": load_ujson_codec,
+    "json": load_json_codec,
+}
+
+json_codec = {"name": None, "dumps": None, "loads": None}
+
+
+def set_json_codec(name="auto"):
+    """
+    Choose the library used to encode request bodies and decode responses.
+    Datetimes are always serialized like CustomJSONEncoder does.
+
+    Args:
+        name (str): "orjson", "ujson", "json" (standard library) or "auto"
+        to pick the fastest installed one.
+
+    Returns:
+        str: Name of the codec in use.
+
+    Raises:
+        ImportError: when the required library is not installed.
+    """
+    if name == "auto":
+        for codec_name in ["orjson", "ujson", "json"]:
+            try:
+                return set_json_codec(codec_name)
+            except ImportError:
+                pass
+    if name not in json_codecs:
+        raise ValueError("Unknown JSON codec: %s" % name)
+    dumps, loads = json_codecs[name]()
+    json_codec.update({"name": name, "dumps": dumps, "loads": loads})
+    return name
+
+
+def get_json_codec():
+    """
+    Returns:
+        str: Name of the codec in use.
+    """
+    return json_codec["name"]
+
+
+def dumps(obj, **kwargs):
+    """
+    Serialize given object to a JSON string with the current codec. Extra
+    arguments are supported by the standard library codec only.
+    """
+    return json_codec["dumps"](obj, **kwargs)
+
+
+def loads(data):
+    """
+    Parse given JSON string or UTF-8 bytes with the current codec.
+    """
+    return json_codec["loads"](data)
+
+
+set_json_codec("auto")
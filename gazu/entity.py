@@ -1,29 +1,31 @@
-from . import client
+from . import client as raw
 
 from .cache import cache
 from .sorting import sort_by_name
 
+default = raw.default_client
+
 
 @cache
-def all_entities():
+def all_entities(client=default):
     """
     Returns:
         list: Retrieve all entities
     """
-    return client.fetch_all("entities")
+    return raw.fetch_all("entities", client=client)
 
 
 @cache
-def all_entity_types():
+def all_entity_types(client=default):
     """
     Returns:
         list: Entity types listed in database.
     """
-    return sort_by_name(client.fetch_all("entity-types"))
+    return sort_by_name(raw.fetch_all("entity-types", client=client))
 
 
 @cache
-def get_entity(entity_id):
+def get_entity(entity_id, client=default):
     """
     Args:
         id (str): ID of claimed entity.
@@ -32,11 +34,11 @@ def get_entity(entity_id):
         dict: Retrieve entity matching given ID (It can be an entity of any
         kind: asset, shot, sequence or episode).
     """
-    return client.fetch_one("entities", entity_id)
+    return raw.fetch_one("entities", entity_id, client=client)
 
 
 @cache
-def get_entity_by_name(entity_name):
+def get_entity_by_name(entity_name, client=default):
     """
     Args:
         name (str): The name of the claimed entity.
@@ -44,11 +46,11 @@ def get_entity_by_name(entity_name):
     Returns:
         Retrieve entity matching given name.
     """
-    return client.fetch_first("entities", {"name": entity_name})
+    return raw.fetch_first("entities", {"name": entity_name}, client=client)
 
 
 @cache
-def get_entity_type(entity_type_id):
+def get_entity_type(entity_type_id, client=default):
     """
     Args:
         id (str): ID of claimed entity type.
@@ -57,11 +59,11 @@ def get_entity_type(entity_type_id):
         Retrieve entity type matching given ID (It can be an entity type of any
         kind).
     """
-    return client.fetch_one("entity-types", entity_type_id)
+    return raw.fetch_one("entity-types", entity_type_id, client=client)
 
 
 @cache
-def get_entity_type_by_name(entity_type_name):
+def get_entity_type_by_name(entity_type_name, client=default):
     """
     Args:
         name (str): The name of the claimed entity type
@@ -69,10 +71,12 @@ def get_entity_type_by_name(entity_type_name):
     Returns:
         Retrieve entity type matching given name.
     """
-    return client.fetch_first("entity-types", {"name": entity_type_name})
+    return raw.fetch_first(
+        "entity-types", {"name": entity_type_name}, client=client
+    )
 
 
-def new_entity_type(name):
+def new_entity_type(name, client=default):
     """
     Creates an entity type with the given name.
 
@@ -83,4 +87,4 @@ def new_entity_type(name):
         dict: The created entity type
     """
     data = {"name": name}
-    return client.create("entity-types", data)
+    return raw.create("entity-types", data, client=client)
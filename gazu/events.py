@@ -1,19 +1,24 @@
+from . import client as raw
 from .exception import AuthFailedException
 
+default = raw.default_client
 
-def init():
+
+def init(client=default):
     """
     Init configuration for SocketIO client.
 
+    Args:
+        client (KitsuClient): Client whose event host and tokens are used.
+
     Returns:
         Event client that will be able to set listeners.
     """
     from socketIO_client import SocketIO, BaseNamespace
-    from . import get_event_host
-    from gazu.client import make_auth_header
 
-    path = get_event_host()
-    socketIO = SocketIO(path, None, headers=make_auth_header())
+    path = raw.get_event_host(client=client)
+    headers = raw.make_auth_header(client=client)
+    socketIO = SocketIO(path, None, headers=headers)
     main_namespace = socketIO.define(BaseNamespace, "/events")
     socketIO.main_namespace = main_namespace
     socketIO.on('error', connect_error)
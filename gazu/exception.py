@@ -77,3 +77,12 @@ class TooBigFileException(Exception):
     """
 
     pass
+
+
+class DownloadFailedException(Exception):
+    """
+    Error raised when a downloaded file does not match what the server
+    announced (size or ranges).
+    """
+
+    pass
@@ -1,20 +1,22 @@
-from . import client
+from . import client as raw
 
-from .cache import cache
+from .cache import cache, write_through
 from .helpers import normalize_model_parameter, timeit, get_extension
 
+default = raw.default_client
+
 
 @cache
-def all_output_types():
+def all_output_types(client=default):
     """
     Returns:
         list: Output types listed in database.
     """
-    return client.fetch_all("output-types")
+    return raw.fetch_all("output-types", client=client)
 
 
-@cache
-def all_output_types_for_entity(entity):
+@cache(key_by_id=True)
+def all_output_types_for_entity(entity, client=default):
     """
     Args:
         entity (str / dict): The entity dict or the entity ID.
@@ -23,23 +25,28 @@ def all_output_types_for_entity(entity):
         list: All output types linked to output files for given entity.
     """
     entity = normalize_model_parameter(entity)
-    return client.fetch_all("entities/%s/output-types" % entity["id"])
+    return raw.fetch_all(
+        "entities/%s/output-types" % entity["id"], client=client
+    )
 
 
-@cache
-def all_output_types_for_asset_instance(asset_instance, temporal_entity):
+@cache(key_by_id=True)
+def all_output_types_for_asset_instance(
+    asset_instance, temporal_entity, client=default
+):
     """
     Returns:
         list: Output types for given asset instance and entity (shot or scene).
     """
-    return client.fetch_all(
+    return raw.fetch_all(
         "asset-instances/%s/entities/%s/output-types"
-        % (asset_instance["id"], temporal_entity["id"])
+        % (asset_instance["id"], temporal_entity["id"]),
+        client=client
     )
 
 
 @cache
-def get_output_type(output_type_id):
+def get_output_type(output_type_id, client=default):
     """
     Args:
         output_type_id (str): ID of claimed output type.
@@ -47,11 +54,11 @@ def get_output_type(output_type_id):
     Returns:
         dict: Output type matching given ID.
     """
-    return client.fetch_one("output-types", output_type_id)
+    return raw.fetch_one("output-types", output_type_id, client=client)
 
 
 @cache
-def get_output_type_by_name(output_type_name):
+def get_output_type_by_name(output_type_name, client=default):
     """
     Args:
         output_type_name (str): name of claimed output type.
@@ -59,10 +66,12 @@ def get_output_type_by_name(output_type_name):
     Returns:
         dict: Output type matching given name.
     """
-    return client.fetch_first("output-types", {"name": output_type_name})
+    return raw.fetch_first(
+        "output-types", {"name": output_type_name}, client=client
+    )
 
 
-def new_output_type(name, short_name):
+def new_output_type(name, short_name, client=default):
     """
     Create a new output type in database.
 
@@ -74,15 +83,19 @@ def new_output_type(name, short_name):
         dict: Created output type.
     """
     data = {"name": name, "short_name": short_name}
-    output_type = get_output_type_by_name(name)
+    output_type = get_output_type_by_name(name, client=client)
     if output_type is None:
-        return client.create("output-types", data)
+        return write_through(
+            "output-type:new",
+            raw.create("output-types", data, client=client),
+            client=client,
+        )
     else:
         return output_type
 
 
 @cache
-def get_output_file(output_file_id):
+def get_output_file(output_file_id, client=default):
     """
     Args:
         output_file_id (str): ID of claimed output file.
@@ -91,11 +104,11 @@ def get_output_file(output_file_id):
         dict: Output file matching given ID.
     """
     path = "data/output-files/%s" % (output_file_id)
-    return client.get(path)
+    return raw.get(path, client=client)
 
 
 @cache
-def get_output_file_by_path(path):
+def get_output_file_by_path(path, client=default):
     """
     Args:
         output_file_id (str): Path of claimed output file.
@@ -103,11 +116,13 @@ def get_output_file_by_path(path):
     Returns:
         dict: Output file matching given path.
     """
-    return client.fetch_first("output-files", {"path": path})
+    return raw.fetch_first("output-files", {"path": path}, client=client)
 
 
-@cache
-def get_all_working_files_for_entity(entity, task=None, name=None):
+@cache(key_by_id=True)
+def get_all_working_files_for_entity(
+    entity, task=None, name=None, client=default
+):
     """
     Retrieves all the working files of a given entity and specied parameters
     """
@@ -121,16 +136,18 @@ def get_all_working_files_for_entity(entity, task=None, name=None):
     if name is not None:
         params["name"] = name
 
-    return client.fetch_all(path, params)
+    return raw.fetch_all(path, params, client=client)
 
 
-@cache
-def get_all_preview_files_for_task(task):
+@cache(key_by_id=True)
+def get_all_preview_files_for_task(task, client=default):
     """
     Retrieves all the preview files for a given task.
     """
     task = normalize_model_parameter(task)
-    return client.fetch_all("preview-files", {"task_id":task["id"]})
+    return raw.fetch_all(
+        "preview-files", {"task_id": task["id"]}, client=client
+    )
 
 
 def all_output_files_for_entity(
@@ -142,6 +159,7 @@ def all_output_files_for_entity(
     file_status=None,
     created_at_since=None,
     person=None,
+    client=default,
 ):
     """
     Args:
@@ -180,10 +198,10 @@ def all_output_files_for_entity(
     if person:
         params["person_id"] = person["id"]
 
-    return client.fetch_all(path, params)
+    return raw.fetch_all(path, params, client=client)
 
 
-@cache
+@cache(key_by_id=True)
 def all_output_files_for_asset_instance(
     asset_instance,
     temporal_entity=None,
@@ -194,6 +212,7 @@ def all_output_files_for_asset_instance(
     file_status=None,
     created_at_since=None,
     person=None,
+    client=default,
 ):
     """
     Args:
@@ -237,20 +256,20 @@ def all_output_files_for_asset_instance(
     if person:
         params["person_id"] = person["id"]
 
-    return client.fetch_all(path, params)
+    return raw.fetch_all(path, params, client=client)
 
 
 @cache
-def all_softwares():
+def all_softwares(client=default):
     """
     Returns:
         dict: Software versions listed in database.
     """
-    return client.fetch_all("softwares")
+    return raw.fetch_all("softwares", client=client)
 
 
 @cache
-def get_software(software_id):
+def get_software(software_id, client=default):
     """
     Args:
         software_id (str): ID of claimed output type.
@@ -258,11 +277,11 @@ def get_software(software_id):
     Returns:
         dict: Software object corresponding to given ID.
     """
-    return client.fetch_one("softwares", software_id)
+    return raw.fetch_one("softwares", software_id, client=client)
 
 
 @cache
-def get_software_by_name(software_name):
+def get_software_by_name(software_name, client=default):
     """
     Args:
         software_name (str): Name of claimed output type.
@@ -270,10 +289,10 @@ def get_software_by_name(software_name):
     Returns:
         dict: Software object corresponding to given name.
     """
-    return client.fetch_first("softwares", {"name": software_name})
+    return raw.fetch_first("softwares", {"name": software_name}, client=client)
 
 
-def new_software(name, short_name, file_extension):
+def new_software(name, short_name, file_extension, client=default):
     """
     Create a new software in datatabase.
 
@@ -290,16 +309,22 @@ def new_software(name, short_name, file_extension):
         "short_name": short_name,
         "file_extension": file_extension,
     }
-    software = get_software_by_name(name)
+    software = get_software_by_name(name, client=client)
     if software is None:
-        return client.create("softwares", data)
+        return raw.create("softwares", data, client=client)
     else:
         return software
 
 
-@cache
+@cache(key_by_id=True)
 def build_working_file_path(
-    task, name="main", mode="working", software=None, revision=1, sep="/"
+    task,
+    name="main",
+    mode="working",
+    software=None,
+    revision=1,
+    sep="/",
+    client=default,
 ):
     """
     From the file path template configured at the project level and arguments, it
@@ -321,7 +346,9 @@ def build_working_file_path(
     software = normalize_model_parameter(software)
     if software is not None:
         data["software_id"] = software["id"]
-    result = client.post("data/tasks/%s/working-file-path" % task["id"], data)
+    result = raw.post(
+        "data/tasks/%s/working-file-path" % task["id"], data, client=client
+    )
     return "%s%s%s" % (
         result["path"].replace(" ", "_"),
         sep,
@@ -329,7 +356,7 @@ def build_working_file_path(
     )
 
 
-@cache
+@cache(key_by_id=True)
 def build_entity_output_file_path(
     entity,
     output_type,
@@ -340,6 +367,7 @@ def build_entity_output_file_path(
     revision=0,
     nb_elements=1,
     sep="/",
+    client=default,
 ):
     """
     From the file path template configured at the project level and arguments, it
@@ -376,7 +404,7 @@ def build_entity_output_file_path(
         "separator": sep,
     }
     path = "data/entities/%s/output-file-path" % entity["id"]
-    result = client.post(path, data)
+    result = raw.post(path, data, client=client)
     return "%s%s%s" % (
         result["folder_path"].replace(" ", "_"),
         sep,
@@ -384,7 +412,7 @@ def build_entity_output_file_path(
     )
 
 
-@cache
+@cache(key_by_id=True)
 def build_asset_instance_output_file_path(
     asset_instance,
     temporal_entity,
@@ -396,6 +424,7 @@ def build_asset_instance_output_file_path(
     revision=0,
     nb_elements=1,
     sep="/",
+    client=default,
 ):
     """
     From the file path template configured at the project level and arguments, it
@@ -438,7 +467,7 @@ def build_asset_instance_output_file_path(
         asset_instance["id"],
         temporal_entity["id"],
     )
-    result = client.post(path, data)
+    result = raw.post(path, data, client=client)
     return "%s%s%s" % (
         result["folder_path"].replace(" ", "_"),
         sep,
@@ -457,6 +486,7 @@ def new_working_file(
     revision=0,
     sep="/",
     size=None,
+    client=default,
 ):
     """
     Create a new working_file for given task. It generates and store the
@@ -493,7 +523,13 @@ def new_working_file(
     if software is not None:
         data["software_id"] = software["id"]
 
-    return client.post("data/tasks/%s/working-files/new" % task["id"], data)
+    return write_through(
+        "working-file:new",
+        raw.post(
+            "data/tasks/%s/working-files/new" % task["id"], data, client=client
+        ),
+        client=client,
+    )
 
 
 def new_entity_output_file(
@@ -513,6 +549,7 @@ def new_entity_output_file(
     sep="/",
     size=None,
     file_status_id=None,
+    client=default,
 ):
     """
     Create a new output file for given entity, task type and output type.
@@ -570,7 +607,9 @@ def new_entity_output_file(
     if file_status_id is not None:
         data["file_status_id"] = file_status_id
 
-    return client.post(path, data)
+    return write_through(
+        "output-file:new", raw.post(path, data, client=client), client=client
+    )
 
 
 def new_asset_instance_output_file(
@@ -591,6 +630,7 @@ def new_asset_instance_output_file(
     sep="/",
     size=None,
     file_status_id=None,
+    client=default,
 ):
     """
     Create a new output file for given asset instance, temporal entity, task
@@ -652,11 +692,13 @@ def new_asset_instance_output_file(
     if file_status_id is not None:
         data["file_status_id"] = file_status_id
 
-    return client.post(path, data)
+    return write_through(
+        "output-file:new", raw.post(path, data, client=client), client=client
+    )
 
 
 def get_next_entity_output_revision(
-    entity, output_type, task_type, name="main"
+    entity, output_type, task_type, name="main", client=default
 ):
     """
     Args:
@@ -676,11 +718,16 @@ def get_next_entity_output_revision(
         "task_type_id": task_type["id"],
         "name": name,
     }
-    return client.post(path, data)["next_revision"]
+    return raw.post(path, data, client=client)["next_revision"]
 
 
 def get_next_asset_instance_output_revision(
-    asset_instance, temporal_entity, output_type, task_type, name="master"
+    asset_instance,
+    temporal_entity,
+    output_type,
+    task_type,
+    name="master",
+    client=default,
 ):
     """
     Args:
@@ -707,11 +754,11 @@ def get_next_asset_instance_output_revision(
         "output_type_id": output_type["id"],
         "task_type_id": task_type["id"],
     }
-    return client.post(path, data)["next_revision"]
+    return raw.post(path, data, client=client)["next_revision"]
 
 
 def get_last_entity_output_revision(
-    entity, output_type, task_type, name="master"
+    entity, output_type, task_type, name="master", client=default
 ):
     """
     Args:
@@ -728,7 +775,7 @@ def get_last_entity_output_revision(
     output_type = normalize_model_parameter(output_type)
     task_type = normalize_model_parameter(task_type)
     revision = get_next_entity_output_revision(
-        entity, output_type, task_type, name
+        entity, output_type, task_type, name, client=client
     )
     if revision != 1:
         revision -= 1
@@ -736,7 +783,12 @@ def get_last_entity_output_revision(
 
 
 def get_last_asset_instance_output_revision(
-    asset_instance, temporal_entity, output_type, task_type, name="master"
+    asset_instance,
+    temporal_entity,
+    output_type,
+    task_type,
+    name="master",
+    client=default,
 ):
     """
     Generate last output revision for given asset instance.
@@ -746,14 +798,19 @@ def get_last_asset_instance_output_revision(
     output_type = normalize_model_parameter(output_type)
     task_type = normalize_model_parameter(task_type)
     revision = get_next_asset_instance_output_revision(
-        asset_instance, temporal_entity, output_type, task_type, name=name
+        asset_instance,
+        temporal_entity,
+        output_type,
+        task_type,
+        name=name,
+        client=client,
     )
     if revision != 1:
         revision -= 1
     return revision
 
 
-@cache
+@cache(key_by_id=True)
 def get_last_output_files_for_entity(
     entity,
     output_type=None,
@@ -763,6 +820,7 @@ def get_last_output_files_for_entity(
     file_status=None,
     created_at_since=None,
     person=None,
+    client=default,
 ):
     """
     Args:
@@ -803,10 +861,10 @@ def get_last_output_files_for_entity(
     if person:
         params["person_id"] = person["id"]
 
-    return client.fetch_all(path, params)
+    return raw.fetch_all(path, params, client=client)
 
 
-@cache
+@cache(key_by_id=True)
 def get_last_output_files_for_asset_instance(
     asset_instance,
     temporal_entity,
@@ -817,6 +875,7 @@ def get_last_output_files_for_asset_instance(
     file_status=None,
     created_at_since=None,
     person=None,
+    client=default,
 ):
     """
     Args:
@@ -862,11 +921,11 @@ def get_last_output_files_for_asset_instance(
     if person:
         params["person_id"] = person["id"]
 
-    return client.fetch_all(path, params)
+    return raw.fetch_all(path, params, client=client)
 
 
-@cache
-def get_working_files_for_task(task):
+@cache(key_by_id=True)
+def get_working_files_for_task(task, client=default):
     """
     Args:
         task (str / dict): The task dict or the task ID.
@@ -876,11 +935,11 @@ def get_working_files_for_task(task):
     """
     task = normalize_model_parameter(task)
     path = "data/tasks/%s/working-files" % task["id"]
-    return client.get(path)
+    return raw.get(path, client=client)
 
 
-@cache
-def get_last_working_files(task):
+@cache(key_by_id=True)
+def get_last_working_files(task, client=default):
     """
     Args:
         task (str / dict): The task dict or the task ID.
@@ -891,11 +950,11 @@ def get_last_working_files(task):
     """
     task = normalize_model_parameter(task)
     path = "data/tasks/%s/working-files/last-revisions" % task["id"]
-    return client.get(path)
+    return raw.get(path, client=client)
 
 
-@cache
-def get_last_working_file_revision(task, name="main"):
+@cache(key_by_id=True)
+def get_last_working_file_revision(task, name="main", client=default):
     """
     Args:
         task (str / dict): The task dict or the task ID.
@@ -907,12 +966,12 @@ def get_last_working_file_revision(task, name="main"):
     """
     task = normalize_model_parameter(task)
     path = "data/tasks/%s/working-files/last-revisions" % task["id"]
-    working_files_dict = client.get(path)
+    working_files_dict = raw.get(path, client=client)
     return working_files_dict.get(name)
 
 
 @cache
-def get_working_file(working_file_id):
+def get_working_file(working_file_id, client=default):
     """
     Args:
         working_file_id (str): ID of claimed working file.
@@ -920,10 +979,10 @@ def get_working_file(working_file_id):
     Returns:
         dict: Working file corresponding to given ID.
     """
-    return client.fetch_one("working-files", working_file_id)
+    return raw.fetch_one("working-files", working_file_id, client=client)
 
 
-def update_comment(working_file, comment):
+def update_comment(working_file, comment, client=default):
     """
     Update the file comment in database for given working file.
 
@@ -934,13 +993,18 @@ def update_comment(working_file, comment):
         dict: Modified working file
     """
     working_file = normalize_model_parameter(working_file)
-    return client.put(
-        "/actions/working-files/%s/comment" % working_file["id"],
-        {"comment": comment},
+    return write_through(
+        "working-file:update",
+        raw.put(
+            "/actions/working-files/%s/comment" % working_file["id"],
+            {"comment": comment},
+            client=client,
+        ),
+        client=client,
     )
 
 
-def update_modification_date(working_file):
+def update_modification_date(working_file, client=default):
     """
     Update modification date of given working file with current time (now).
 
@@ -950,12 +1014,18 @@ def update_modification_date(working_file):
     Returns:
         dict: Modified working file
     """
-    return client.put(
-        "/actions/working-files/%s/modified" % working_file["id"], {}
+    return write_through(
+        "working-file:update",
+        raw.put(
+            "/actions/working-files/%s/modified" % working_file["id"],
+            {},
+            client=client,
+        ),
+        client=client,
     )
 
 
-def update_output_file(output_file, data):
+def update_output_file(output_file, data, client=default):
     """
     Update the data of given output file.
 
@@ -967,10 +1037,15 @@ def update_output_file(output_file, data):
     """
     output_file = normalize_model_parameter(output_file)
     path = "/data/output-files/%s" % output_file["id"]
-    return client.put(path, data)
+    return write_through(
+        "output-file:update",
+        raw.put(path, data, client=client),
+        readers=[get_output_file],
+        client=client,
+    )
 
 
-def set_project_file_tree(project, file_tree_name):
+def set_project_file_tree(project, file_tree_name, client=default):
     """
     (Deprecated) Set given file tree template on given project. This template
     will be used to generate file paths. The template is selected from sources.
@@ -986,10 +1061,10 @@ def set_project_file_tree(project, file_tree_name):
     project = normalize_model_parameter(project)
     data = {"tree_name": file_tree_name}
     path = "actions/projects/%s/set-file-tree" % project["id"]
-    return client.post(path, data)
+    return raw.post(path, data, client=client)
 
 
-def update_project_file_tree(project, file_tree):
+def update_project_file_tree(project, file_tree, client=default):
     """
     Set given dict as file tree template on given project. This template
     will be used to generate file paths.
@@ -1004,24 +1079,96 @@ def update_project_file_tree(project, file_tree):
     project = normalize_model_parameter(project)
     data = {"file_tree": file_tree}
     path = "data/projects/%s" % project["id"]
-    return client.put(path, data)
-
-
-def upload_working_file(working_file, file_path):
+    return raw.put(path, data, client=client)
+
+
+def upload_working_file(
+    working_file,
+    file_path,
+    progress_callback=None,
+    chunked=False,
+    retry=False,
+    checksum=None,
+    file_infos=None,
+    client=default,
+):
     """
     Save given file in working file storage.
 
     Args:
         working_file (str / dict): The working file dict or ID.
         file_path (str): Location on hard drive where to save the file.
+        progress_callback (func): Called while the file is sent with the
+        number of bytes sent, the body size and the throughput (see
+        gazu.client.upload).
+        chunked (bool): Send the file with chunked transfer encoding.
+        retry (bool): Send the file again if the upload fails.
+        checksum (str): Algorithm of a checksum of the file to compute while
+        it's sent (see gazu.client.upload).
+        file_infos (dict): Filled with the size and the checksum of the sent
+        file, to give to new_dependent_file or new_children_file.
     """
     working_file = normalize_model_parameter(working_file)
     url_path = "/data/working-files/%s/file" % working_file["id"]
-    client.upload(url_path, file_path)
+    raw.upload(
+        url_path,
+        file_path,
+        progress_callback=progress_callback,
+        chunked=chunked,
+        retry=retry,
+        checksum=checksum,
+        file_infos=file_infos,
+        client=client,
+    )
     return working_file
 
 
-def download_working_file(working_file, file_path=None):
+def upload_working_files_bulk(
+    working_files,
+    max_workers=4,
+    progress_callback=None,
+    chunked=False,
+    retry=False,
+    client=default,
+):
+    """
+    Save many files in working file storage at once, with several uploads
+    running in parallel.
+
+    Args:
+        working_files (list): Tuples made of a working file and the location
+        of its file on hard drive, like for upload_working_file.
+        max_workers (int): Number of files uploaded at the same time.
+        progress_callback (func): Called while each file is sent (see
+        upload_working_file).
+        chunked (bool): Send the files with chunked transfer encoding.
+        retry (bool): Send a file again if its upload fails.
+
+    Returns:
+        dict: Working file or error for each given file, with the number of
+        succeeded and failed uploads and the upload throughput (see
+        gazu.client.run_bulk).
+    """
+
+    def upload(working_file, file_path):
+        return upload_working_file(
+            working_file,
+            file_path,
+            progress_callback=progress_callback,
+            chunked=chunked,
+            retry=retry,
+            client=client,
+        )
+
+    return raw.run_bulk(
+        upload,
+        [tuple(working_file) for working_file in working_files],
+        file_paths=[working_file[1] for working_file in working_files],
+        max_workers=max_workers,
+    )
+
+
+def download_working_file(working_file, file_path=None, client=default):
     """
     Download given working file and save it at given location.
 
@@ -1031,15 +1178,18 @@ def download_working_file(working_file, file_path=None):
     """
     working_file = normalize_model_parameter(working_file)
     if file_path is None:
-        working_file = client.fetch_one("working-files", working_file["id"])
+        working_file = raw.fetch_one(
+            "working-files", working_file["id"], client=client
+        )
         file_path = working_file["path"]
-    return client.download(
+    return raw.download(
         "data/working-files/%s/file" % (working_file["id"]),
         file_path,
+        client=client,
     )
 
 
-def download_preview_file(preview_file, file_path):
+def download_preview_file(preview_file, file_path, client=default):
     """
     Download given preview file and save it at given location.
 
@@ -1048,16 +1198,19 @@ def download_preview_file(preview_file, file_path):
         file_path (str): Location on hard drive where to save the file.
     """
     preview_file = normalize_model_parameter(preview_file)
-    preview_file = client.fetch_one("preview-files", preview_file["id"])
+    preview_file = raw.fetch_one(
+        "preview-files", preview_file["id"], client=client
+    )
     file_type = 'movies' if preview_file['extension'] == 'mp4' else 'pictures'
-    return client.download(
+    return raw.download(
         "%s/originals/preview-files/%s.%s"
         % (file_type, preview_file["id"], preview_file["extension"]),
         file_path,
+        client=client,
     )
 
 
-def download_preview_file_thumbnail(preview_file, file_path):
+def download_preview_file_thumbnail(preview_file, file_path, client=default):
     """
     Download given preview file thumbnail and save it at given location.
 
@@ -1067,13 +1220,14 @@ def download_preview_file_thumbnail(preview_file, file_path):
 
     """
     preview_file = normalize_model_parameter(preview_file)
-    return client.download(
+    return raw.download(
         "pictures/thumbnails/preview-files/%s.png" % (preview_file["id"]),
         file_path,
+        client=client,
     )
 
 
-def update_preview(preview_file, data):
+def update_preview(preview_file, data, client=default):
     """
     Update the data of given preview file.
 
@@ -1085,50 +1239,54 @@ def update_preview(preview_file, data):
     """
     preview_file = normalize_model_parameter(preview_file)
     path = "/data/preview-files/%s" % preview_file["id"]
-    return client.put(path, data)
+    return write_through(
+        "preview-file:update",
+        raw.put(path, data, client=client),
+        client=client,
+    )
 
 
 # TODO: unittest
 @cache
-def all_file_status():
+def all_file_status(client=default):
     """
     Returns:
         list: Output file-status listed in database.
     """
-    return client.fetch_all("file-status")
+    return raw.fetch_all("file-status", client=client)
 
 
-def new_file_status(name, color):
+def new_file_status(name, color, client=default):
     """
     Create a new file status if not existing yet.
     """
     data = {"name": name, "color": color}
-    status = get_file_status_by_name(name)
+    status = get_file_status_by_name(name, client=client)
     if status is None:
-        return client.create("file-status", data)
+        return raw.create("file-status", data, client=client)
     else:
         return status
 
 
 @cache
-def get_file_status(status_id):
+def get_file_status(status_id, client=default):
     """
     Return file status object corresponding to given ID.
     """
-    return client.fetch_one("file-status", status_id)
+    return raw.fetch_one("file-status", status_id, client=client)
 
 
 @cache
-def get_file_status_by_name(name):
+def get_file_status_by_name(name, client=default):
     """
     Return file status object corresponding to given name
     """
-    return client.fetch_first("file-status?name=%s" % name)
+    return raw.fetch_first("file-status?name=%s" % name, client=client)
 
 
 # TODO: unittest
 @cache
-def get_children_file(children_file_id):
+def get_children_file(children_file_id, client=default):
     """
     Args:
         children_file_id (str): ID of claimed children file.
@@ -1137,12 +1295,19 @@ def get_children_file(children_file_id):
         dict: Children file matching given ID.
     """
     path = "data/children-files/%s" % (children_file_id)
-    return client.get(path)
+    return raw.get(path, client=client)
 
 
 # TODO: unittest
 def new_children_file(
-    output_file, output_type, path=None, size=None, file_status=None, render_info=None
+    output_file,
+    output_type,
+    path=None,
+    size=None,
+    file_status=None,
+    render_info=None,
+    checksum=None,
+    client=default,
 ):
     """
     Create a new children file of a output file
@@ -1150,6 +1315,9 @@ def new_children_file(
     Args:
         output_file (str / dict): The output file dict or ID.
         output_type (str / dict): The output type dict or ID.
+        size (int): Size of the file in bytes.
+        checksum (str): Checksum of the file, like the one computed by
+        upload_working_file.
 
     Returns:
         dict: Created children file.
@@ -1163,15 +1331,21 @@ def new_children_file(
         "size": size,
         "render_info": render_info,
     }
+    if checksum is not None:
+        data["checksum"] = checksum
     if file_status is not None:
         file_status = normalize_model_parameter(file_status)
         data["file_status_id"] = file_status["id"]
 
-    return client.post("data/files/%s/children-files/new" % output_file["id"], data)
+    return raw.post(
+        "data/files/%s/children-files/new" % output_file["id"],
+        data,
+        client=client,
+    )
 
 
 # TODO: unittest
-def update_children_file(children_file, data):
+def update_children_file(children_file, data, client=default):
     """
     Update the data of given children file.
 
@@ -1183,11 +1357,16 @@ def update_children_file(children_file, data):
     """
     children_file = normalize_model_parameter(children_file)
     path = "data/children-files/%s" % children_file["id"]
-    return client.put(path, data)
+    return write_through(
+        "children-file:update",
+        raw.put(path, data, client=client),
+        readers=[get_children_file],
+        client=client,
+    )
 
 
 # TODO: unittest
-def remove_children_file(children_file):
+def remove_children_file(children_file, client=default):
     """
     Remove children file from database.
 
@@ -1195,14 +1374,18 @@ def remove_children_file(children_file):
         task_status (str / dict): The task status dict or ID.
     """
     children_file = normalize_model_parameter(children_file)
-    return client.delete(
-        "data/children-files/%s" % children_file["id"], {"force": "true"}
+    result = raw.delete(
+        "data/children-files/%s" % children_file["id"],
+        {"force": "true"},
+        client=client,
     )
+    write_through("children-file:delete", children_file, client=client)
+    return result
 
 
 # TODO: unittest
 @cache
-def get_dependent_file(dependent_file_id):
+def get_dependent_file(dependent_file_id, client=default):
     """
     Args:
         dependent_file_id (str): ID of claimed dependent file.
@@ -1211,24 +1394,42 @@ def get_dependent_file(dependent_file_id):
         dict: dependent file matching given ID.
     """
     path = "data/dependent-files/%s" % (dependent_file_id)
-    return client.get(path)
+    return raw.get(path, client=client)
 
 
 # TODO: unittest
-def new_dependent_file(output_file, path, checksum=None, size=None):
+def new_dependent_file(
+    output_file, path, checksum=None, size=None, client=default
+):
     """
+    Create a new dependent file of a output file.
+
+    Args:
+        output_file (str / dict): The output file dict or ID.
+        path (str): Location of the dependent file.
+        checksum (str): Checksum of the file, like the one computed by
+        upload_working_file.
+        size (int): Size of the file in bytes.
+
+    Returns:
+        dict: Created dependent file.
     """
     output_file = normalize_model_parameter(output_file)
     data = {
         "path": path,
-        "checksum": checksum,
         "size": size,
     }
-    return client.post("data/files/%s/dependent-files/new" % output_file["id"], data)
+    if checksum is not None:
+        data["checksum"] = checksum
+    return raw.post(
+        "data/files/%s/dependent-files/new" % output_file["id"],
+        data,
+        client=client,
+    )
 
 
 # TODO: unittest
-def update_dependent_file(dependent_file, data):
+def update_dependent_file(dependent_file, data, client=default):
     """
     Update the data of given dependent file.
 
@@ -1240,11 +1441,16 @@ def update_dependent_file(dependent_file, data):
     """
     dependent_file = normalize_model_parameter(dependent_file)
     path = "data/dependent-files/%s" % dependent_file["id"]
-    return client.put(path, data)
+    return write_through(
+        "dependent-file:update",
+        raw.put(path, data, client=client),
+        readers=[get_dependent_file],
+        client=client,
+    )
 
 
 # TODO: unittest
-def remove_dependent_file(dependent_file):
+def remove_dependent_file(dependent_file, client=default):
     """
     Remove dependent file from database.
 
@@ -1252,12 +1458,23 @@ def remove_dependent_file(dependent_file):
         task_status (str / dict): The task status dict or ID.
     """
     dependent_file = normalize_model_parameter(dependent_file)
-    return client.delete(
-        "data/dependent-files/%s" % dependent_file["id"], {"force": "true"}
+    result = raw.delete(
+        "data/dependent-files/%s" % dependent_file["id"],
+        {"force": "true"},
+        client=client,
     )
+    write_through("dependent-file:delete", dependent_file, client=client)
+    return result
 
 
-def add_comment(output_file, task_status=None, comment="", person=None, attachments=[]):
+def add_comment(
+    output_file,
+    task_status=None,
+    comment="",
+    person=None,
+    attachments=[],
+    client=default,
+):
     """
     Add comment to given output file. Each comment requires a file_status. Since the
     addition of comment triggers a task status change. Comment text can be
@@ -1283,19 +1500,24 @@ def add_comment(output_file, task_status=None, comment="", person=None, attachme
         data["person_id"] = person["id"]
 
     if len(attachments) == 0:
-        return client.post("actions/files/%s/comment" % output_file["id"], data)
+        new_comment = raw.post(
+            "actions/files/%s/comment" % output_file["id"], data, client=client
+        )
 
     else:
         attachment = attachments.pop()
-        return client.upload(
+        new_comment = raw.upload(
             "actions/files/%s/comment" % output_file["id"],
             attachment,
             data=data,
             extra_files=attachments,
+            client=client,
         )
+    write_through("output-file:update", output_file, client=client)
+    return new_comment
 
 
-def remove_comment(comment):
+def remove_comment(comment, client=default):
     """
     Remove given comment and related (previews, news, notifications) from
     database.
@@ -1304,11 +1526,13 @@ def remove_comment(comment):
         comment (str / dict): The comment dict or the comment ID.
     """
     comment = normalize_model_parameter(comment)
-    return client.delete("data/comments/%s" % comment["id"])
+    result = raw.delete("data/comments/%s" % comment["id"], client=client)
+    write_through("comment:delete", comment, client=client)
+    return result
 
 
-@cache
-def all_comments_for_output_file(output_file):
+@cache(key_by_id=True)
+def all_comments_for_output_file(output_file, client=default):
     """
     Args:
         output_file (str / dict): The output_file dict or the output_file ID.
@@ -1317,11 +1541,13 @@ def all_comments_for_output_file(output_file):
         Comments linked to the given output_file.
     """
     output_file = normalize_model_parameter(output_file)
-    return client.fetch_all("files/%s/comments" % output_file["id"])
+    return raw.fetch_all(
+        "files/%s/comments" % output_file["id"], client=client
+    )
 
 
-@cache
-def get_last_comment_for_output_file(output_file):
+@cache(key_by_id=True)
+def get_last_comment_for_output_file(output_file, client=default):
     """
     Args:
         output_file (str / dict): The output_file dict or the output_file ID.
@@ -1330,12 +1556,14 @@ def get_last_comment_for_output_file(output_file):
         Last comment posted for given output_file.
     """
     output_file = normalize_model_parameter(output_file)
-    return client.fetch_first("files/%s/comments" % output_file["id"])
+    return raw.fetch_first(
+        "files/%s/comments" % output_file["id"], client=client
+    )
 
 
-def get_output_file_by_shotgun_id(shotgun_id):
+def get_output_file_by_shotgun_id(shotgun_id, client=default):
     path = "/data/files/shotgun/%s" % (shotgun_id)
-    return client.get(path)
+    return raw.get(path, client=client)
 
 
 # -----------------------
@@ -1349,33 +1577,42 @@ from .project import get_project
 import clique
 
 
-def get_attribute(func, id, retry=False):
+def get_attribute(func, id, retry=False, client=default):
     if not id:
         return None
 
     try:
-        return next(el for el in func() if el["id"] == id)
+        return next(el for el in func(client=client) if el["id"] == id)
     except:
         if retry:
             return None
 
         # try to clear cache and retry
         func.clear_cache()
-        return get_attribute(func, id, retry=True)
+        return get_attribute(func, id, retry=True, client=client)
 
 
-def get_output_file_data(output_file):
+def get_output_file_data(output_file, client=default):
     # shot
     if output_file.get("entity_id"):
-        output_file["entity"] = get_entity(output_file["entity_id"])
-        output_file["project"] = get_project(output_file["entity"]["project_id"])
+        output_file["entity"] = dict(
+            get_entity(output_file["entity_id"], client=client)
+        )
+        output_file["project"] = get_project(
+            output_file["entity"]["project_id"], client=client
+        )
         # sequence
-        output_file["entity"]["parent"] = get_entity(output_file["entity"]["parent_id"])
+        output_file["entity"]["parent"] = get_entity(
+            output_file["entity"]["parent_id"], client=client
+        )
     # asset
     elif output_file.get("asset_instance_id"):
-        output_file["asset_instance"] = get_asset(output_file["asset_instance_id"])
+        output_file["asset_instance"] = get_asset(
+            output_file["asset_instance_id"], client=client
+        )
         output_file["project"] = get_project(
-            output_file["asset_instance"]["project_id"]
+            output_file["asset_instance"]["project_id"],
+            client=client
         )
 
     if output_file.get("path") and "%" in output_file["path"]:
@@ -1386,17 +1623,17 @@ def get_output_file_data(output_file):
         frames = list(collection.indexes)
         output_file["frame_in"], output_file["frame_out"] = frames[0], frames[-1]
 
-    output_file["person"] = get_person(output_file["person_id"])
+    output_file["person"] = get_person(output_file["person_id"], client=client)
     output_file["file_status"] = get_attribute(
-        all_file_status, output_file["file_status_id"]
+        all_file_status, output_file["file_status_id"], client=client
     )
 
     output_file["output_type"] = get_attribute(
-        all_output_types, output_file["output_type_id"]
+        all_output_types, output_file["output_type_id"], client=client
     )
 
     output_file["task_type"] = get_attribute(
-        all_task_types, output_file["task_type_id"]
+        all_task_types, output_file["task_type_id"], client=client
     )
 
     return output_file
@@ -0,0 +1,174 @@
+import binascii
+import mimetypes
+import os
+import time
+
+from .checksum import Checksums
+
+CHUNK_SIZE = 64 * 1024
+
+
+class MultipartEncoder(object):
+    """
+    File-like object producing a multipart/form-data body. Files are read
+    while the body is sent, so memory usage does not depend on their size.
+    The body can be read again after a call to seek(0), to retry a failed
+    upload.
+
+    Args:
+        fields (dict): Form fields, sent before the files.
+        files (dict): Open files (in binary mode) by field name.
+        progress_callback (func): Called after each read with the number of
+        bytes read so far, the body size and the throughput in bytes per
+        second.
+        checksums (list): Algorithms of the checksums computed for each file
+        while it's read (see gazu.checksum.get_hasher).
+        throttle (func): Called with the size of each read piece before it's
+        returned, to limit the bandwidth.
+    """
+
+    def __init__(
+        self,
+        fields,
+        files,
+        progress_callback=None,
+        checksums=[],
+        throttle=None,
+    ):
+        self.boundary = binascii.hexlify(os.urandom(16)).decode("ascii")
+        self.content_type = "multipart/form-data; boundary=%s" % self.boundary
+        self.progress_callback = progress_callback
+        self.throttle = throttle
+        self.parts = []
+        self.file_parts = {}
+        for name, values in fields.items():
+            if isinstance(values, (list, tuple)):
+                values = list(values)
+            else:
+                values = [values]
+            for value in values:
+                if value is None:
+                    continue
+                if not isinstance(value, bytes):
+                    value = str(value).encode("utf-8")
+                self.parts.append(self.get_part_header(name))
+                self.parts.append(value + b"\r\n")
+        for name, file_object in files.items():
+            file_name = os.path.basename(getattr(file_object, "name", name))
+            self.parts.append(self.get_part_header(name, file_name))
+            self.file_parts[name] = FilePart(file_object, checksums)
+            self.parts.append(self.file_parts[name])
+            self.parts.append(b"\r\n")
+        self.parts.append(("--%s--\r\n" % self.boundary).encode("ascii"))
+        self.length = sum(len(part) for part in self.parts)
+        self.seek(0)
+
+    def get_part_header(self, name, file_name=None):
+        header = '--%s\r\nContent-Disposition: form-data; name="%s"' % (
+            self.boundary,
+            name,
+        )
+        if file_name is not None:
+            content_type = (
+                mimetypes.guess_type(file_name)[0]
+                or "application/octet-stream"
+            )
+            header += '; filename="%s"\r\nContent-Type: %s' % (
+                file_name,
+                content_type,
+            )
+        return (header + "\r\n\r\n").encode("utf-8")
+
+    def __len__(self):
+        return self.length
+
+    def __iter__(self):
+        self.seek(0)
+        chunk = self.read(CHUNK_SIZE)
+        while chunk:
+            yield chunk
+            chunk = self.read(CHUNK_SIZE)
+
+    def seek(self, position):
+        """
+        Go back to the start of the body. Other positions are not supported.
+        """
+        if position != 0:
+            raise ValueError("A multipart body can only be rewound")
+        for part in self.parts:
+            if isinstance(part, FilePart):
+                part.rewind()
+        self.part_index = 0
+        self.part_position = 0
+        self.bytes_read = 0
+        self.start_time = time.time()
+
+    def read(self, size=-1):
+        if size is None or size < 0:
+            size = self.length
+        chunks = []
+        remaining = size
+        while remaining > 0 and self.part_index < len(self.parts):
+            part = self.parts[self.part_index]
+            if isinstance(part, FilePart):
+                chunk = part.read(remaining)
+            else:
+                chunk = part[
+                    self.part_position : self.part_position + remaining
+                ]
+                self.part_position += len(chunk)
+            if chunk:
+                chunks.append(chunk)
+                remaining -= len(chunk)
+            else:
+                self.part_index += 1
+                self.part_position = 0
+        data = b"".join(chunks)
+        self.bytes_read += len(data)
+        if data and self.throttle is not None:
+            self.throttle(len(data))
+        if data and self.progress_callback is not None:
+            duration = time.time() - self.start_time
+            throughput = self.bytes_read / duration if duration > 0 else 0.0
+            self.progress_callback(self.bytes_read, self.length, throughput)
+        return data
+
+
+class FilePart(object):
+    """
+    File sent in a multipart body, from its position when it was given.
+    Its checksums are computed while it's read.
+    """
+
+    def __init__(self, file_object, checksums=[]):
+        self.file_object = file_object
+        self.start = file_object.tell()
+        file_object.seek(0, os.SEEK_END)
+        self.length = file_object.tell() - self.start
+        file_object.seek(self.start)
+        self.checksums = Checksums(checksums)
+
+    def __len__(self):
+        return self.length
+
+    def rewind(self):
+        self.file_object.seek(self.start)
+        self.checksums.reset()
+
+    def read(self, size):
+        data = self.file_object.read(size)
+        self.checksums.update(data)
+        return data
+
+
+class ChunkedBody(object):
+    """
+    Iterable over a body whose size is not given to the server, so it is
+    sent with chunked transfer encoding.
+    """
+
+    def __init__(self, body):
+        self.body = body
+
+    def __iter__(self):
+        return iter(self.body)
@@ -1,22 +1,24 @@
-from . import client
+from . import client as raw
 
 from .sorting import sort_by_name
 from .cache import cache
 from .helpers import normalize_model_parameter
 from .person import get_person
 
+default = raw.default_client
+
 
 @cache
-def all_project_status():
+def all_project_status(client=default):
     """
     Returns:
         list: Project status listed in database.
     """
-    return sort_by_name(client.fetch_all("project-status"))
+    return sort_by_name(raw.fetch_all("project-status", client=client))
 
 
 @cache
-def get_project_status_by_name(project_status_name):
+def get_project_status_by_name(project_status_name, client=default):
     """
     Args:
         project_status_name (str): Name of claimed project status.
@@ -24,29 +26,31 @@ def get_project_status_by_name(project_status_name):
     Returns:
         dict: Project status corresponding to given name.
     """
-    return client.fetch_first("project-status", {"name": project_name})
+    return raw.fetch_first(
+        "project-status", {"name": project_name}, client=client
+    )
 
 
 @cache
-def all_projects():
+def all_projects(client=default):
     """
     Returns:
         list: Projects stored in the database.
     """
-    return sort_by_name(client.fetch_all("projects"))
+    return sort_by_name(raw.fetch_all("projects", client=client))
 
 
 @cache
-def all_open_projects():
+def all_open_projects(client=default):
     """
     Returns:
         Open projects stored in the database.
     """
-    return sort_by_name(client.fetch_all("projects/open"))
+    return sort_by_name(raw.fetch_all("projects/open", client=client))
 
 
 @cache
-def get_project(project_id):
+def get_project(project_id, client=default):
     """
     Args:
         project_id (str): ID of claimed project.
@@ -54,10 +58,10 @@ def get_project(project_id):
     Returns:
         dict: Project corresponding to given id.
     """
-    return client.fetch_one("projects", project_id)
+    return raw.fetch_one("projects", project_id, client=client)
 
-@cache
-def get_project_url(project, section="assets"):
+@cache(key_by_id=True)
+def get_project_url(project, section="assets", client=default):
     """
     Args:
         project (str / dict): The project dict or the project ID.
@@ -69,13 +73,13 @@ def get_project_url(project, section="assets"):
     project = normalize_model_parameter(project)
     path = "{host}/productions/{project_id}/{section}/"
     return path.format(
-        host=client.get_zou_url_from_host(),
+        host=raw.get_zou_url_from_host(client=client),
         project_id=project["id"],
         section=section,
     )
 
 @cache
-def get_project_by_name(project_name):
+def get_project_by_name(project_name, client=default):
     """
     Args:
         project_name (str): Name of claimed project.
@@ -83,10 +87,10 @@ def get_project_by_name(project_name):
     Returns:
         dict: Project corresponding to given name.
     """
-    return client.fetch_first("projects", {"name": project_name})
+    return raw.fetch_first("projects", {"name": project_name}, client=client)
 
 
-def new_project(name, production_type="short"):
+def new_project(name, production_type="short", client=default):
     """
     Creates a new project.
 
@@ -98,13 +102,13 @@ def new_project(name, production_type="short"):
         dict: Created project.
     """
     data = {"name": name, "production_type": production_type}
-    project = get_project_by_name(name)
+    project = get_project_by_name(name, client=client)
     if project is None:
-        project = client.create("projects", data)
+        project = raw.create("projects", data, client=client)
     return project
 
 
-def remove_project(project, force=False):
+def remove_project(project, force=False, client=default):
     """
     Remove given project from database. (Prior to do that, make sure, there
     is no asset or shot left).
@@ -116,10 +120,10 @@ def remove_project(project, force=False):
     path = "data/projects/%s" % project["id"]
     if force:
         path += "?force=true"
-    return client.delete(path)
+    return raw.delete(path, client=client)
 
 
-def update_project(project):
+def update_project(project, client=default):
     """
     Save given project data into the API. Metadata are fully replaced by the
     ones set on given project.
@@ -130,10 +134,10 @@ def update_project(project):
     Returns:
         dict: Updated project.
     """
-    return client.put("data/projects/%s" % project["id"], project)
+    return raw.put("data/projects/%s" % project["id"], project, client=client)
 
 
-def update_project_data(project, data={}):
+def update_project_data(project, data={}, client=default):
     """
     Update the metadata for the provided project. Keys that are not provided
     are not changed.
@@ -146,14 +150,16 @@ def update_project_data(project, data={}):
         dict: Updated project.
     """
     project = normalize_model_parameter(project)
-    project = get_project(project["id"])
-    if "data" not in project or project["data"] is None:
-        project["data"] = {}
-    project["data"].update(data)
-    update_project(project)
+    current_project = get_project(project["id"], client=client)
+    updated_project = {
+        "id": current_project["id"],
+        "data": dict(current_project.get("data") or {}),
+    }
+    updated_project["data"].update(data)
+    update_project(updated_project, client=client)
 
 
-def close_project(project):
+def close_project(project, client=default):
     """
     Closes the provided project.
 
@@ -164,21 +170,21 @@ def close_project(project):
         dict: Updated project.
     """
     closed_status_id = None
-    for status in all_project_status():
+    for status in all_project_status(client=client):
         if status["name"].lower() == "closed":
             closed_status_id = status["id"]
 
-    project["project_status_id"] = closed_status_id
-    update_project(project)
+    closed_project = dict(project, project_status_id=closed_status_id)
+    update_project(closed_project, client=client)
 
-    return project
+    return closed_project
 
 
-def get_team_persons(project):
+def get_team_persons(project, client=default):
     if not project.get("team"):
-        project = get_project(project["id"])
+        project = get_project(project["id"], client=client)
 
     team = []
     for person in project.get("team", []):
-        team.append(get_person(person))
+        team.append(get_person(person, client=client))
     return team
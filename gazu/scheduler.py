@@ -0,0 +1,324 @@
+"""
+Process-wide scheduling of file transfers (client.upload and
+client.download). It limits the number of transfers running at the same
+time and the bandwidth they use, so several tools running in the same
+process don't saturate the network. API calls are never queued nor
+throttled: they always go ahead of file transfers.
+
+Waiting transfers start by priority class, then in order of arrival:
+
+* interactive: transfers a user is waiting for, like thumbnails.
+* normal: default class.
+* bulk: big batches, like the ones run by client.run_bulk.
+"""
+
+import contextlib
+import threading
+import time
+
+from collections import deque
+
+PRIORITIES = ["interactive", "normal", "bulk"]
+
+thread_settings = threading.local()
+
+
+class Ticket(object):
+    """
+    Transfer waiting in the queue of a scheduler.
+    """
+
+    def __init__(self, priority, wake=None):
+        self.priority = priority
+        self.wake = wake
+        self.queued_at = time.time()
+
+
+class TransferScheduler(object):
+    """
+    Grant transfer slots by priority and share a bandwidth budget between
+    running transfers.
+
+    Args:
+        max_transfers (int): Number of transfers running at the same time,
+        None for no limit.
+        max_bytes_per_second (int): Bandwidth shared by all transfers, None
+        for no limit.
+    """
+
+    def __init__(self, max_transfers=None, max_bytes_per_second=None):
+        self.condition = threading.Condition()
+        self.rate_lock = threading.Lock()
+        self.queues = dict((priority, deque()) for priority in PRIORITIES)
+        self.active = 0
+        self.set_limits(max_transfers, max_bytes_per_second)
+        self.stats = {
+            "transfers": 0,
+            "bytes": 0,
+            "wait_time": 0.0,
+            "throttle_time": 0.0,
+            "active_time": 0.0,
+            "max_queue_depth": 0,
+        }
+        self.active_since = None
+
+    def set_limits(self, max_transfers=None, max_bytes_per_second=None):
+        with self.condition:
+            self.max_transfers = max_transfers
+            self.notify()
+        with self.rate_lock:
+            self.max_bytes_per_second = max_bytes_per_second
+            self.tokens = float(max_bytes_per_second or 0)
+            self.last_refill = time.time()
+
+    def acquire(self, priority="normal"):
+        """
+        Wait until a transfer of given priority can start. If the wait is
+        interrupted, the transfer leaves the queue so it doesn't hold back
+        the next ones.
+        """
+        ticket = self.enqueue(priority)
+        with self.condition:
+            try:
+                while not self.can_start(ticket):
+                    self.condition.wait()
+            except BaseException:
+                self.cancel(ticket)
+                raise
+            self.start(ticket)
+
+    def enqueue(self, priority="normal", wake=None):
+        """
+        Queue a transfer without waiting for its turn. Callers which can't
+        block, like coroutines, then call start each time they are woken up
+        until it returns True, or cancel to leave the queue.
+
+        Args:
+            priority (str): One of PRIORITIES.
+            wake (func): Called without argument, from any thread, when the
+            transfer may be able to start.
+
+        Returns:
+            Ticket: The queued transfer.
+        """
+        if priority not in self.queues:
+            raise ValueError("Unknown transfer priority: %s" % priority)
+        ticket = Ticket(priority, wake)
+        with self.condition:
+            self.queues[priority].append(ticket)
+            self.stats["max_queue_depth"] = max(
+                self.stats["max_queue_depth"], self.get_queue_depth()
+            )
+        return ticket
+
+    def start(self, ticket):
+        """
+        Start the queued transfer if it's its turn.
+
+        Returns:
+            bool: True if the transfer started. It then holds a slot until
+            release is called.
+        """
+        with self.condition:
+            if not self.can_start(ticket):
+                return False
+            self.queues[ticket.priority].popleft()
+            if self.active == 0:
+                self.active_since = time.time()
+            self.active += 1
+            self.stats["transfers"] += 1
+            self.stats["wait_time"] += time.time() - ticket.queued_at
+            self.notify()
+            return True
+
+    def cancel(self, ticket):
+        """
+        Remove a transfer which did not start from the queue.
+        """
+        with self.condition:
+            if ticket in self.queues[ticket.priority]:
+                self.queues[ticket.priority].remove(ticket)
+                self.notify()
+
+    def release(self):
+        with self.condition:
+            self.active -= 1
+            if self.active == 0:
+                self.stats["active_time"] += time.time() - self.active_since
+                self.active_since = None
+            self.notify()
+
+    def notify(self):
+        """
+        Wake up the queued transfers so they check whether they can start.
+        It must be called while holding the condition.
+        """
+        self.condition.notify_all()
+        for queue in self.queues.values():
+            for ticket in queue:
+                if ticket.wake is not None:
+                    ticket.wake()
+
+    def can_start(self, ticket):
+        if self.max_transfers is not None and (
+            self.active >= self.max_transfers
+        ):
+            return False
+        for other_priority in PRIORITIES:
+            if self.queues[other_priority]:
+                return self.queues[other_priority][0] is ticket
+        return False
+
+    def get_queue_depth(self):
+        return sum(len(queue) for queue in self.queues.values())
+
+    @contextlib.contextmanager
+    def transfer(self, priority=None):
+        """
+        Context manager holding a transfer slot while its block runs.
+        """
+        self.acquire(priority or get_thread_priority())
+        try:
+            yield self
+        finally:
+            self.release()
+
+    def consume(self, size):
+        """
+        Count given number of transferred bytes and wait as long as needed
+        to respect the bandwidth limit.
+        """
+        delay = self.reserve(size)
+        if delay > 0:
+            time.sleep(delay)
+
+    def reserve(self, size):
+        """
+        Count given number of transferred bytes without waiting, for callers
+        which can't block, like coroutines.
+
+        Returns:
+            float: Seconds to wait before sending more data.
+        """
+        delay = 0.0
+        with self.rate_lock:
+            if self.max_bytes_per_second:
+                now = time.time()
+                self.tokens = min(
+                    float(self.max_bytes_per_second),
+                    self.tokens
+                    + (now - self.last_refill) * self.max_bytes_per_second,
+                )
+                self.last_refill = now
+                self.tokens -= size
+                if self.tokens < 0:
+                    delay = -self.tokens / self.max_bytes_per_second
+        with self.condition:
+            self.stats["bytes"] += size
+            self.stats["throttle_time"] += delay
+        return delay
+
+    def get_stats(self):
+        """
+        Returns:
+            dict: Running transfers, queued transfers by priority and in
+            total, transferred bytes, throughput (bytes per second while
+            transfers were running) and time spent waiting for a slot or for
+            bandwidth.
+        """
+        with self.condition:
+            stats = dict(self.stats)
+            stats["active"] = self.active
+            stats["queued"] = dict(
+                (priority, len(queue))
+                for priority, queue in self.queues.items()
+            )
+            stats["queue_depth"] = self.get_queue_depth()
+            if self.active_since is not None:
+                stats["active_time"] += time.time() - self.active_since
+        stats["max_transfers"] = self.max_transfers
+        stats["max_bytes_per_second"] = self.max_bytes_per_second
+        if stats["active_time"] > 0:
+            stats["throughput"] = stats["bytes"] / stats["active_time"]
+        else:
+            stats["throughput"] = 0.0
+        return stats
+
+
+default_scheduler = TransferScheduler()
+
+
+def set_limits(max_transfers=None, max_bytes_per_second=None):
+    """
+    Configure the transfers of the process. None means no limit, which is
+    the default.
+
+    Args:
+        max_transfers (int): Number of transfers running at the same time.
+        max_bytes_per_second (int): Bandwidth shared by all transfers.
+    """
+    default_scheduler.set_limits(max_transfers, max_bytes_per_second)
+
+
+def get_stats():
+    """
+    Returns:
+        dict: Statistics of the transfers of the process (see
+        TransferScheduler.get_stats).
+    """
+    return default_scheduler.get_stats()
+
+
+def set_thread_priority(priority):
+    """
+    Set the priority of the transfers started by the current thread when
+    they don't give one.
+
+    Args:
+        priority (str): One of PRIORITIES.
+
+    Returns:
+        str: Previous priority, to restore it afterwards.
+    """
+    if priority not in PRIORITIES:
+        raise ValueError("Unknown transfer priority: %s" % priority)
+    previous = get_thread_priority()
+    thread_settings.priority = priority
+    return previous
+
+
+def get_thread_priority():
+    """
+    Returns:
+        str: Priority of the transfers started by the current thread.
+    """
+    return getattr(thread_settings, "priority", "normal")
+
+
+def transfer(priority=None):
+    """
+    Context manager holding a slot of the process scheduler while a
+    transfer runs.
+
+    Args:
+        priority (str): One of PRIORITIES, the thread priority by default.
+    """
+    return default_scheduler.transfer(priority)
+
+
+def consume(size):
+    """
+    Count transferred bytes against the bandwidth limit of the process and
+    wait if it's exceeded.
+    """
+    default_scheduler.consume(size)
+
+
+def reserve(size):
+    """
+    Count transferred bytes against the bandwidth limit of the process.
+
+    Returns:
+        float: Seconds to wait before sending more data.
+    """
+    return default_scheduler.reserve(size)
@@ -1,34 +1,36 @@
 import string
 
-from . import client
+from . import client as raw
 from .sorting import sort_by_name
 from .helpers import normalize_model_parameter
 
-from .cache import cache
+from .cache import cache, write_through
+
+default = raw.default_client
 
 
 @cache
-def all_task_statuses():
+def all_task_statuses(client=default):
     """
     Returns:
         list: Task statuses stored in database.
     """
-    task_statuses = client.fetch_all("task-status")
+    task_statuses = raw.fetch_all("task-status", client=client)
     return sort_by_name(task_statuses)
 
 
 @cache
-def all_task_types():
+def all_task_types(client=default):
     """
     Returns:
         list: Task types stored in database.
     """
-    task_types = client.fetch_all("task-types")
+    task_types = raw.fetch_all("task-types", client=client)
     return sort_by_name(task_types)
 
 
-@cache
-def all_tasks_for_shot(shot, relations=False):
+@cache(key_by_id=True)
+def all_tasks_for_shot(shot, relations=False, client=default):
     """
     Args:
         shot (str / dict): The shot dict or the shot ID.
@@ -40,12 +42,12 @@ def all_tasks_for_shot(shot, relations=False):
     params = {}
     if relations:
         params = {"relations": "true"}
-    tasks = client.fetch_all("shots/%s/tasks" % shot["id"], params)
+    tasks = raw.fetch_all("shots/%s/tasks" % shot["id"], params, client=client)
     return sort_by_name(tasks)
 
 
-@cache
-def all_tasks_for_sequence(sequence, relations=False):
+@cache(key_by_id=True)
+def all_tasks_for_sequence(sequence, relations=False, client=default):
     """
     Args:
         sequence (str / dict): The sequence dict or the sequence ID.
@@ -57,12 +59,14 @@ def all_tasks_for_sequence(sequence, relations=False):
     params = {}
     if relations:
         params = {"relations": "true"}
-    tasks = client.fetch_all("sequences/%s/tasks" % sequence["id"], params)
+    tasks = raw.fetch_all(
+        "sequences/%s/tasks" % sequence["id"], params, client=client
+    )
     return sort_by_name(tasks)
 
 
-@cache
-def all_tasks_for_scene(scene, relations=False):
+@cache(key_by_id=True)
+def all_tasks_for_scene(scene, relations=False, client=default):
     """
     Args:
         sequence (str / dict): The scene dict or the scene ID.
@@ -74,12 +78,14 @@ def all_tasks_for_scene(scene, relations=False):
     params = {}
     if relations:
         params = {"relations": "true"}
-    tasks = client.fetch_all("scenes/%s/tasks" % scene["id"], params)
+    tasks = raw.fetch_all(
+        "scenes/%s/tasks" % scene["id"], params, client=client
+    )
     return sort_by_name(tasks)
 
 
-@cache
-def all_tasks_for_asset(asset, relations=False):
+@cache(key_by_id=True)
+def all_tasks_for_asset(asset, relations=False, client=default):
     """
     Args:
         asset (str / dict): The asset dict or the asset ID.
@@ -91,12 +97,14 @@ def all_tasks_for_asset(asset, relations=False):
     params = {}
     if relations:
         params = {"relations": "true"}
-    tasks = client.fetch_all("assets/%s/tasks" % asset["id"], params)
+    tasks = raw.fetch_all(
+        "assets/%s/tasks" % asset["id"], params, client=client
+    )
     return sort_by_name(tasks)
 
 
-@cache
-def all_tasks_for_episode(episode, relations=False):
+@cache(key_by_id=True)
+def all_tasks_for_episode(episode, relations=False, client=default):
     """
     Retrieve all tasks directly linked to given episode.
     """
@@ -104,12 +112,14 @@ def all_tasks_for_episode(episode, relations=False):
     params = {}
     if relations:
         params = {"relations": "true"}
-    tasks = client.fetch_all("episodes/%s/tasks" % episode["id"], params)
+    tasks = raw.fetch_all(
+        "episodes/%s/tasks" % episode["id"], params, client=client
+    )
     return sort_by_name(tasks)
 
 
-@cache
-def all_shot_tasks_for_sequence(sequence, relations=False):
+@cache(key_by_id=True)
+def all_shot_tasks_for_sequence(sequence, relations=False, client=default):
     """
     Retrieve all tasks directly linked to all shots of given sequence.
     """
@@ -117,12 +127,14 @@ def all_shot_tasks_for_sequence(sequence, relations=False):
     params = {}
     if relations:
         params = {"relations": "true"}
-    tasks = client.fetch_all("sequences/%s/shot-tasks" % sequence["id"], params)
+    tasks = raw.fetch_all(
+        "sequences/%s/shot-tasks" % sequence["id"], params, client=client
+    )
     return sort_by_name(tasks)
 
 
-@cache
-def all_shot_tasks_for_episode(episode, relations=False):
+@cache(key_by_id=True)
+def all_shot_tasks_for_episode(episode, relations=False, client=default):
     """
     Retrieve all tasks directly linked to all shots of given episode.
     """
@@ -130,12 +142,14 @@ def all_shot_tasks_for_episode(episode, relations=False):
     params = {}
     if relations:
         params = {"relations": "true"}
-    tasks = client.fetch_all("episodes/%s/shot-tasks" % episode["id"], params)
+    tasks = raw.fetch_all(
+        "episodes/%s/shot-tasks" % episode["id"], params, client=client
+    )
     return sort_by_name(tasks)
 
 
-@cache
-def all_tasks_for_task_status(project, task_type, task_status):
+@cache(key_by_id=True)
+def all_tasks_for_task_status(project, task_type, task_status, client=default):
     """
     Args:
         project (str / dict): The project dict or the project ID.
@@ -148,18 +162,19 @@ def all_tasks_for_task_status(project, task_type, task_status):
     project = normalize_model_parameter(project)
     task_type = normalize_model_parameter(task_type)
     task_status = normalize_model_parameter(task_status)
-    return client.fetch_all(
+    return raw.fetch_all(
         "tasks",
         {
             "project_id": project["id"],
             "task_type_id": task_type["id"],
             "task_status_id": task_status["id"],
         },
+        client=client,
     )
 
 
-@cache
-def all_tasks_for_task_type(project, task_type):
+@cache(key_by_id=True)
+def all_tasks_for_task_type(project, task_type, client=default):
     """
     Args:
         project (str / dict): The project dict or the project ID.
@@ -170,17 +185,18 @@ def all_tasks_for_task_type(project, task_type):
     """
     project = normalize_model_parameter(project)
     task_type = normalize_model_parameter(task_type)
-    return client.fetch_all(
+    return raw.fetch_all(
         "tasks",
         {
             "project_id": project["id"],
             "task_type_id": task_type["id"],
         },
+        client=client,
     )
 
 
-@cache
-def all_task_types_for_shot(shot):
+@cache(key_by_id=True)
+def all_task_types_for_shot(shot, client=default):
     """
     Args:
         shot (str / dict): The shot dict or the shot ID.
@@ -189,12 +205,14 @@ def all_task_types_for_shot(shot):
         list: Task types of task linked to given shot.
     """
     shot = normalize_model_parameter(shot)
-    task_types = client.fetch_all("shots/%s/task-types" % shot["id"])
+    task_types = raw.fetch_all(
+        "shots/%s/task-types" % shot["id"], client=client
+    )
     return sort_by_name(task_types)
 
 
-@cache
-def all_task_types_for_asset(asset):
+@cache(key_by_id=True)
+def all_task_types_for_asset(asset, client=default):
     """
     Args:
         asset (str / dict): The asset dict or the asset ID.
@@ -203,12 +221,14 @@ def all_task_types_for_asset(asset):
         list: Task types of tasks related to given asset.
     """
     asset = normalize_model_parameter(asset)
-    task_types = client.fetch_all("assets/%s/task-types" % asset["id"])
+    task_types = raw.fetch_all(
+        "assets/%s/task-types" % asset["id"], client=client
+    )
     return sort_by_name(task_types)
 
 
-@cache
-def all_task_types_for_scene(scene):
+@cache(key_by_id=True)
+def all_task_types_for_scene(scene, client=default):
     """
     Args:
         scene (str / dict): The scene dict or the scene ID.
@@ -217,12 +237,14 @@ def all_task_types_for_scene(scene):
         list: Task types of tasks linked to given scene.
     """
     scene = normalize_model_parameter(scene)
-    task_types = client.fetch_all("scenes/%s/task-types" % scene["id"])
+    task_types = raw.fetch_all(
+        "scenes/%s/task-types" % scene["id"], client=client
+    )
     return sort_by_name(task_types)
 
 
-@cache
-def all_task_types_for_sequence(sequence):
+@cache(key_by_id=True)
+def all_task_types_for_sequence(sequence, client=default):
     """
     Args:
         sequence (str / dict): The sequence dict or the sequence ID.
@@ -231,23 +253,27 @@ def all_task_types_for_sequence(sequence):
         list: Task types of tasks linked directly to given sequence.
     """
     sequence = normalize_model_parameter(sequence)
-    task_types = client.fetch_all("sequences/%s/task-types" % sequence["id"])
+    task_types = raw.fetch_all(
+        "sequences/%s/task-types" % sequence["id"], client=client
+    )
     return sort_by_name(task_types)
 
 
-@cache
-def all_task_types_for_episode(episode):
+@cache(key_by_id=True)
+def all_task_types_for_episode(episode, client=default):
     """
     Returns:
         list: Task types of tasks linked directly to given episode.
     """
     episode = normalize_model_parameter(episode)
-    task_types = client.fetch_all("episodes/%s/task-types" % episode["id"])
+    task_types = raw.fetch_all(
+        "episodes/%s/task-types" % episode["id"], client=client
+    )
     return sort_by_name(task_types)
 
 
-@cache
-def all_tasks_for_entity_and_task_type(entity, task_type):
+@cache(key_by_id=True)
+def all_tasks_for_entity_and_task_type(entity, task_type, client=default):
     """
     Args:
         entity (str / dict): The entity dict or the entity ID.
@@ -260,33 +286,34 @@ def all_tasks_for_entity_and_task_type(entity, task_type):
     task_type = normalize_model_parameter(task_type)
     task_type_id = task_type["id"]
     entity_id = entity["id"]
-    return client.fetch_all(
-        "entities/%s/task-types/%s/tasks" % (entity_id, task_type_id)
+    return raw.fetch_all(
+        "entities/%s/task-types/%s/tasks" % (entity_id, task_type_id),
+        client=client
     )
 
 
-@cache
-def all_tasks_for_person(person):
+@cache(key_by_id=True)
+def all_tasks_for_person(person, client=default):
     """
     Returns:
         list: Tasks that are not done for given person (only for open projects).
     """
     person = normalize_model_parameter(person)
-    return client.fetch_all("persons/%s/tasks" % person["id"])
+    return raw.fetch_all("persons/%s/tasks" % person["id"], client=client)
 
 
-@cache
-def all_done_tasks_for_person(person):
+@cache(key_by_id=True)
+def all_done_tasks_for_person(person, client=default):
     """
     Returns:
         list: Tasks that are done for given person (only for open projects).
     """
     person = normalize_model_parameter(person)
-    return client.fetch_all("persons/%s/done-tasks" % person["id"])
+    return raw.fetch_all("persons/%s/done-tasks" % person["id"], client=client)
 
 
-@cache
-def get_task_by_name(entity, task_type, name="main"):
+@cache(key_by_id=True)
+def get_task_by_name(entity, task_type, name="main", client=default):
     """
     Deprecated.
 
@@ -300,18 +327,19 @@ def get_task_by_name(entity, task_type, name="main"):
     """
     entity = normalize_model_parameter(entity)
     task_type = normalize_model_parameter(task_type)
-    return client.fetch_first(
+    return raw.fetch_first(
         "tasks",
         {
             "name": name,
             "task_type_id": task_type["id"],
             "entity_id": entity["id"],
         },
+        client=client,
     )
 
 
 @cache
-def get_task_type(task_type_id):
+def get_task_type(task_type_id, client=default):
     """
     Args:
         task_type_id (str): Id of claimed task type.
@@ -319,11 +347,11 @@ def get_task_type(task_type_id):
     Returns:
         dict: Task type matching given ID.
     """
-    return client.fetch_one("task-types", task_type_id)
+    return raw.fetch_one("task-types", task_type_id, client=client)
 
 
 @cache
-def get_task_type_by_name(task_type_name):
+def get_task_type_by_name(task_type_name, client=default):
     """
     Args:
         task_type_name (str): Name of claimed task type.
@@ -331,11 +359,13 @@ def get_task_type_by_name(task_type_name):
     Returns:
         dict: Task type object for given name.
     """
-    return client.fetch_first("task-types", {"name": task_type_name})
+    return raw.fetch_first(
+        "task-types", {"name": task_type_name}, client=client
+    )
 
 
-@cache
-def get_task_by_path(project, file_path, entity_type="shot"):
+@cache(key_by_id=True)
+def get_task_by_path(project, file_path, entity_type="shot", client=default):
     """
     Args:
         project (str / dict): The project dict or the project ID.
@@ -352,11 +382,11 @@ def get_task_by_path(project, file_path, entity_type="shot"):
         "project_id": project["id"],
         "type": entity_type,
     }
-    return client.post("data/tasks/from-path/", data)
+    return raw.post("data/tasks/from-path/", data, client=client)
 
 
 @cache
-def get_task_status(task):
+def get_task_status(task, client=default):
     """
     Args:
         task (str / dict): The task dict or the task ID.
@@ -365,11 +395,13 @@ def get_task_status(task):
         A task status object corresponding to status set on given task.
     """
     task = normalize_model_parameter(task)
-    return client.fetch_first("task-status", {"id": task["task_status_id"]})
+    return raw.fetch_first(
+        "task-status", {"id": task["task_status_id"]}, client=client
+    )
 
 
 @cache
-def get_task_status_by_name(name):
+def get_task_status_by_name(name, client=default):
     """
     Args:
         name (str / dict): The name of claimed task status.
@@ -377,11 +409,11 @@ def get_task_status_by_name(name):
     Returns:
         dict: Task status matching given name.
     """
-    return client.fetch_first("task-status", {"name": name})
+    return raw.fetch_first("task-status", {"name": name}, client=client)
 
 
 @cache
-def get_task_status_by_short_name(task_status_short_name):
+def get_task_status_by_short_name(task_status_short_name, client=default):
     """
     Args:
         short_name (str / dict): The short name of claimed task status.
@@ -389,12 +421,12 @@ def get_task_status_by_short_name(task_status_short_name):
     Returns:
         dict: Task status matching given short name.
     """
-    return client.fetch_first(
-        "task-status", {"short_name": task_status_short_name}
+    return raw.fetch_first(
+        "task-status", {"short_name": task_status_short_name}, client=client
     )
 
 
-def remove_task_status(task_status):
+def remove_task_status(task_status, client=default):
     """
     Remove given task status from database.
 
@@ -402,13 +434,17 @@ def remove_task_status(task_status):
         task_status (str / dict): The task status dict or ID.
     """
     task_status = normalize_model_parameter(task_status)
-    return client.delete(
-        "data/task-status/%s" % task_status["id"], {"force": "true"}
+    result = raw.delete(
+        "data/task-status/%s" % task_status["id"],
+        {"force": "true"},
+        client=client,
     )
+    write_through("task-status:delete", task_status, client=client)
+    return result
 
 
-@cache
-def get_task(task_id):
+@cache(key_by_id=True)
+def get_task(task_id, client=default):
     """
     Args:
         task_id (str): Id of claimed task.
@@ -417,7 +453,7 @@ def get_task(task_id):
         dict: Task matching given ID.
     """
     task_id = normalize_model_parameter(task_id)
-    return client.get("data/tasks/%s/full" % task_id["id"])
+    return raw.get("data/tasks/%s/full" % task_id["id"], client=client)
 
 
 def new_task(
@@ -427,6 +463,7 @@ def new_task(
     task_status=None,
     assigner=None,
     assignees=None,
+    client=default,
 ):
     """
     Create a new task for given entity and task type.
@@ -445,7 +482,7 @@ def new_task(
     entity = normalize_model_parameter(entity)
     task_type = normalize_model_parameter(task_type)
     if task_status is None:
-        task_status = get_task_status_by_name("Todo")
+        task_status = get_task_status_by_name("Todo", client=client)
 
     data = {
         "project_id": entity["project_id"],
@@ -463,13 +500,17 @@ def new_task(
     else:
         data["assignees"] = []
 
-    task = get_task_by_name(entity, task_type, name)
+    task = get_task_by_name(entity, task_type, name, client=client)
     if task is None:
-        task = client.post("data/tasks", data)
+        task = write_through(
+            "task:new",
+            raw.post("data/tasks", data, client=client),
+            client=client,
+        )
     return task
 
 
-def remove_task(task):
+def remove_task(task, client=default):
     """
     Remove given task from database.
 
@@ -477,10 +518,11 @@ def remove_task(task):
         task (str / dict): The task dict or the task ID.
     """
     task = normalize_model_parameter(task)
-    client.delete("data/tasks/%s" % task["id"], {"force": "true"})
+    raw.delete("data/tasks/%s" % task["id"], {"force": "true"}, client=client)
+    write_through("task:delete", task, client=client)
 
 
-def start_task(task):
+def start_task(task, client=default):
     """
     Change a task status to WIP and set its real start date to now.
 
@@ -492,10 +534,14 @@ def start_task(task):
     """
     task = normalize_model_parameter(task)
     path = "actions/tasks/%s/start" % task["id"]
-    return client.put(path, {})
+    return write_through(
+        "task:update", raw.put(path, {}, client=client), client=client
+    )
 
 
-def task_to_review(task, person, comment, revision=1, change_status=True):
+def task_to_review(
+    task, person, comment, revision=1, change_status=True, client=default
+):
     """
     Deprecated.
     Mark given task as pending, waiting for approval. Author is given through
@@ -521,11 +567,13 @@ def task_to_review(task, person, comment, revision=1, change_status=True):
         "change_status": change_status,
     }
 
-    return client.put(path, data)
+    return write_through(
+        "task:update", raw.put(path, data, client=client), client=client
+    )
 
 
-@cache
-def get_time_spent(task, date):
+@cache(key_by_id=True)
+def get_time_spent(task, date, client=default):
     """
     Get the time spent by CG artists on a task at a given date. A field contains
     the total time spent.  Durations are given in seconds. Date format is
@@ -540,10 +588,10 @@ def get_time_spent(task, date):
     """
     task = normalize_model_parameter(task)
     path = "actions/tasks/%s/time-spents/%s" % (task["id"], date)
-    return client.get(path)
+    return raw.get(path, client=client)
 
 
-def set_time_spent(task, person, date, duration):
+def set_time_spent(task, person, date, duration, client=default):
     """
     Set the time spent by a CG artist on a given task at a given date. Durations
     must be set in seconds. Date format is YYYY-MM-DD.
@@ -564,10 +612,12 @@ def set_time_spent(task, person, date, duration):
         date,
         person["id"],
     )
-    return client.post(path, {"duration": duration})
+    time_spent = raw.post(path, {"duration": duration}, client=client)
+    write_through("task:update", task, client=client)
+    return time_spent
 
 
-def add_time_spent(task, person, date, duration):
+def add_time_spent(task, person, date, duration, client=default):
     """
     Add given duration to the already logged duration for given task and person
     at a given date. Durations must be set in seconds. Date format is
@@ -589,7 +639,9 @@ def add_time_spent(task, person, date, duration):
         date,
         person["id"],
     )
-    return client.post(path, {"duration": duration})
+    time_spent = raw.post(path, {"duration": duration}, client=client)
+    write_through("task:update", task, client=client)
+    return time_spent
 
 
 def add_comment(
@@ -598,7 +650,8 @@ def add_comment(
     comment="",
     person=None,
     attachments=[],
-    created_at=None
+    created_at=None,
+    client=default
 ):
     """
     Add comment to given task. Each comment requires a task_status. Since the
@@ -627,19 +680,24 @@ def add_comment(
         data["created_at"] = created_at
 
     if len(attachments) == 0:
-        return client.post("actions/tasks/%s/comment" % task["id"], data)
+        new_comment = raw.post(
+            "actions/tasks/%s/comment" % task["id"], data, client=client
+        )
 
     else:
         attachment = attachments.pop()
-        return client.upload(
+        new_comment = raw.upload(
             "actions/tasks/%s/comment" % task["id"],
             attachment,
             data=data,
-            extra_files=attachments
+            extra_files=attachments,
+            client=client
         )
+    write_through("task:update", task, client=client)
+    return new_comment
 
 
-def remove_comment(comment):
+def remove_comment(comment, client=default):
     """
     Remove given comment and related (previews, news, notifications) from
     database.
@@ -648,10 +706,12 @@ def remove_comment(comment):
         comment (str / dict): The comment dict or the comment ID.
     """
     comment = normalize_model_parameter(comment)
-    return client.delete("data/comments/%s" % comment["id"])
+    result = raw.delete("data/comments/%s" % comment["id"], client=client)
+    write_through("comment:delete", comment, client=client)
+    return result
 
 
-def create_preview(task, comment):
+def create_preview(task, comment, client=default):
     """
     Create a preview into given comment.
 
@@ -668,22 +728,51 @@ def create_preview(task, comment):
         task["id"],
         comment["id"],
     )
-    return client.post(path, {})
+    return write_through(
+        "preview-file:new", raw.post(path, {}, client=client), client=client
+    )
 
 
-def upload_preview_file(preview, file_path):
+def upload_preview_file(
+    preview,
+    file_path,
+    progress_callback=None,
+    chunked=False,
+    retry=False,
+    client=default,
+):
     """
     Create a preview into given comment.
 
     Args:
         task (str / dict): The task dict or the task ID.
         file_path (str): Path of the file to upload as preview.
+        progress_callback (func): Called while the file is sent with the
+        number of bytes sent, the body size and the throughput (see
+        gazu.client.upload).
+        chunked (bool): Send the file with chunked transfer encoding.
+        retry (bool): Send the file again if the upload fails.
     """
     path = "pictures/preview-files/%s" % preview["id"]
-    client.upload(path, file_path)
+    raw.upload(
+        path,
+        file_path,
+        progress_callback=progress_callback,
+        chunked=chunked,
+        retry=retry,
+        client=client,
+    )
 
 
-def add_preview(task, comment, preview_file_path):
+def add_preview(
+    task,
+    comment,
+    preview_file_path,
+    progress_callback=None,
+    chunked=False,
+    retry=False,
+    client=default,
+):
     """
     Add a preview to given comment.
 
@@ -691,16 +780,75 @@ def add_preview(task, comment, preview_file_path):
         task (str / dict): The task dict or the task ID.
         comment (str / dict): The comment or the comment ID.
         preview_file_path (str): Path of the file to upload as preview.
+        progress_callback (func): Called while the file is sent with the
+        number of bytes sent, the body size and the throughput (see
+        gazu.client.upload).
+        chunked (bool): Send the file with chunked transfer encoding.
+        retry (bool): Send the file again if the upload fails.
 
     Returns:
         dict: Created preview file model.
     """
-    preview_file = create_preview(task, comment)
-    upload_preview_file(preview_file, preview_file_path)
+    preview_file = create_preview(task, comment, client=client)
+    upload_preview_file(
+        preview_file,
+        preview_file_path,
+        progress_callback=progress_callback,
+        chunked=chunked,
+        retry=retry,
+        client=client,
+    )
     return preview_file
 
 
-def set_main_preview(preview_file):
+def add_previews_bulk(
+    previews,
+    max_workers=4,
+    progress_callback=None,
+    chunked=False,
+    retry=False,
+    client=default,
+):
+    """
+    Add many previews at once. Previews are created and uploaded by several
+    workers in parallel, so the creation of a preview and the upload of
+    another one overlap.
+
+    Args:
+        previews (list): Tuples made of a task, a comment and the path of
+        the file to upload as preview, like for add_preview.
+        max_workers (int): Number of previews added at the same time.
+        progress_callback (func): Called while each file is sent (see
+        add_preview).
+        chunked (bool): Send the files with chunked transfer encoding.
+        retry (bool): Send a file again if its upload fails.
+
+    Returns:
+        dict: Created preview file or error for each given preview, with the
+        number of succeeded and failed previews and the upload throughput
+        (see gazu.client.run_bulk).
+    """
+
+    def add(task, comment, preview_file_path):
+        return add_preview(
+            task,
+            comment,
+            preview_file_path,
+            progress_callback=progress_callback,
+            chunked=chunked,
+            retry=retry,
+            client=client,
+        )
+
+    return raw.run_bulk(
+        add,
+        [tuple(preview) for preview in previews],
+        file_paths=[preview[2] for preview in previews],
+        max_workers=max_workers,
+    )
+
+
+def set_main_preview(preview_file, client=default):
     """
     Set given preview as thumbnail of given entity.
 
@@ -712,11 +860,13 @@ def set_main_preview(preview_file):
     """
     preview_file = normalize_model_parameter(preview_file)
     path = "actions/preview-files/%s/set-main-preview" % preview_file["id"]
-    return client.put(path, {})
+    return write_through(
+        "entity:update", raw.put(path, {}, client=client), client=client
+    )
 
 
-@cache
-def all_comments_for_task(task):
+@cache(key_by_id=True)
+def all_comments_for_task(task, client=default):
     """
     Args:
         task (str / dict): The task dict or the task ID.
@@ -725,11 +875,11 @@ def all_comments_for_task(task):
         Comments linked to the given task.
     """
     task = normalize_model_parameter(task)
-    return client.fetch_all("tasks/%s/comments" % task["id"])
+    return raw.fetch_all("tasks/%s/comments" % task["id"], client=client)
 
 
-@cache
-def get_last_comment_for_task(task):
+@cache(key_by_id=True)
+def get_last_comment_for_task(task, client=default):
     """
     Args:
         task (str / dict): The task dict or the task ID.
@@ -738,11 +888,10 @@ def get_last_comment_for_task(task):
         Last comment posted for given task.
     """
     task = normalize_model_parameter(task)
-    return client.fetch_first("tasks/%s/comments" % task["id"])
+    return raw.fetch_first("tasks/%s/comments" % task["id"], client=client)
 
 
-@cache
-def assign_task(task, person):
+def assign_task(task, person, client=default):
     """
     Assign one Person to a Task.
     Args:
@@ -750,15 +899,18 @@ def assign_task(task, person):
         person (str / dict): The person dict or the person ID.
 
     Returns:
-        (dict) the affected Task
+        (list) the affected Tasks
     """
     person = normalize_model_parameter(person)
     task = normalize_model_parameter(task)
     route = "/actions/persons/%s/assign" % person["id"]
-    return client.put(route, {"task_ids": task["id"]})
+    tasks = raw.put(route, {"task_ids": task["id"]}, client=client)
+    for assigned_task in tasks:
+        write_through("task:assign", assigned_task, client=client)
+    return tasks
 
 
-def new_task_type(name):
+def new_task_type(name, client=default):
     """
     Create a new task type with the given name.
 
@@ -769,10 +921,14 @@ def new_task_type(name):
         dict: The created task type
     """
     data = {"name": name}
-    return client.post("data/task-types", data)
+    return write_through(
+        "task-type:new",
+        raw.post("data/task-types", data, client=client),
+        client=client,
+    )
 
 
-def new_task_status(name, short_name, color):
+def new_task_status(name, short_name, color, client=default):
     """
     Create a new task status with the given name, short name and color.
 
@@ -789,10 +945,14 @@ def new_task_status(name, short_name, color):
     assert all(c in string.hexdigits for c in color[1:])
 
     data = {"name": name, "short_name": short_name, "color": color}
-    return client.post("data/task-status", data)
+    return write_through(
+        "task-status:new",
+        raw.post("data/task-status", data, client=client),
+        client=client,
+    )
 
 
-def update_task(task):
+def update_task(task, client=default):
     """
     Save given task data into the API. Metadata are fully replaced by the ones
     set on given task.
@@ -803,10 +963,14 @@ def update_task(task):
     Returns:
         dict: Updated task.
     """
-    return client.put("data/tasks/%s" % task["id"], task)
+    return write_through(
+        "task:update",
+        raw.put("data/tasks/%s" % task["id"], task, client=client),
+        client=client,
+    )
 
 
-def update_task_data(task, data={}):
+def update_task_data(task, data={}, client=default):
     """
     Update the metadata for the provided task. Keys that are not provided are
     not changed.
@@ -819,17 +983,18 @@ def update_task_data(task, data={}):
         dict: Updated task.
     """
     task = normalize_model_parameter(task)
-    current_task = get_task(task["id"])
+    current_task = get_task(task["id"], client=client)
 
-    updated_task = {"id": current_task["id"], "data": current_task["data"]}
-    if updated_task["data"] is None:
-        updated_task["data"] = {}
+    updated_task = {
+        "id": current_task["id"],
+        "data": dict(current_task["data"] or {}),
+    }
     updated_task["data"].update(data)
-    update_task(updated_task)
+    update_task(updated_task, client=client)
 
 
 @cache
-def get_task_url(task):
+def get_task_url(task, client=default):
     """
     Args:
         task (str / dict): The task dict or the task ID.
@@ -840,7 +1005,7 @@ def get_task_url(task):
     task = normalize_model_parameter(task)
     path = "{host}/productions/{project_id}/shots/tasks/{task_id}/"
     return path.format(
-        host=client.get_zou_url_from_host(),
+        host=raw.get_zou_url_from_host(client=client),
         project_id=task["project_id"],
         task_id=task["id"],
     )
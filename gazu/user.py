@@ -1,25 +1,27 @@
 import datetime
 
-from . import client
+from . import client as raw
 from .sorting import sort_by_name
 from .helpers import normalize_model_parameter
 
 from .cache import cache
 
+default = raw.default_client
+
 
 @cache
-def all_open_projects():
+def all_open_projects(client=default):
     """
     Returns:
         list: Projects for which the user is part of the team. Admins see all
         projects
     """
-    projects = client.fetch_all("user/projects/open")
+    projects = raw.fetch_all("user/projects/open", client=client)
     return sort_by_name(projects)
 
 
-@cache
-def all_asset_types_for_project(project):
+@cache(key_by_id=True)
+def all_asset_types_for_project(project, client=default):
     """
     Args:
         project (str / dict): The project dict or the project ID.
@@ -30,12 +32,12 @@ def all_asset_types_for_project(project):
     """
     project = normalize_model_parameter(project)
     path = "user/projects/%s/asset-types" % project["id"]
-    asset_types = client.fetch_all(path)
+    asset_types = raw.fetch_all(path, client=client)
     return sort_by_name(asset_types)
 
 
-@cache
-def all_assets_for_asset_type_and_project(project, asset_type):
+@cache(key_by_id=True)
+def all_assets_for_asset_type_and_project(project, asset_type, client=default):
     """
     Args:
         project (str / dict): The project dict or the project ID.
@@ -51,12 +53,12 @@ def all_assets_for_asset_type_and_project(project, asset_type):
         project["id"],
         asset_type["id"],
     )
-    assets = client.fetch_all(path)
+    assets = raw.fetch_all(path, client=client)
     return sort_by_name(assets)
 
 
-@cache
-def all_tasks_for_asset(asset):
+@cache(key_by_id=True)
+def all_tasks_for_asset(asset, client=default):
     """
     Args:
         asset (str / dict): The asset dict or the asset ID.
@@ -66,12 +68,12 @@ def all_tasks_for_asset(asset):
     """
     asset = normalize_model_parameter(asset)
     path = "user/assets/%s/tasks" % asset["id"]
-    tasks = client.fetch_all(path)
+    tasks = raw.fetch_all(path, client=client)
     return sort_by_name(tasks)
 
 
-@cache
-def all_tasks_for_shot(shot):
+@cache(key_by_id=True)
+def all_tasks_for_shot(shot, client=default):
     """
     Args:
         shot (str / dict): The shot dict or the shot ID.
@@ -81,12 +83,12 @@ def all_tasks_for_shot(shot):
     """
     shot = normalize_model_parameter(shot)
     path = "user/shots/%s/tasks" % shot["id"]
-    tasks = client.fetch_all(path)
+    tasks = raw.fetch_all(path, client=client)
     return sort_by_name(tasks)
 
 
-@cache
-def all_tasks_for_scene(scene):
+@cache(key_by_id=True)
+def all_tasks_for_scene(scene, client=default):
     """
     Args:
         scene (str / dict): The scene dict or the scene ID.
@@ -96,23 +98,23 @@ def all_tasks_for_scene(scene):
     """
     scene = normalize_model_parameter(scene)
     path = "user/scene/%s/tasks" % scene["id"]
-    tasks = client.fetch_all(path)
+    tasks = raw.fetch_all(path, client=client)
     return sort_by_name(tasks)
 
 
-@cache
-def all_tasks_for_sequence(sequence):
+@cache(key_by_id=True)
+def all_tasks_for_sequence(sequence, client=default):
     """
     Return the list of tasks for given asset and current user.
     """
     sequence = normalize_model_parameter(sequence)
     path = "user/sequences/%s/tasks" % sequence["id"]
-    tasks = client.fetch_all(path)
+    tasks = raw.fetch_all(path, client=client)
     return sort_by_name(tasks)
 
 
-@cache
-def all_task_types_for_asset(asset):
+@cache(key_by_id=True)
+def all_task_types_for_asset(asset, client=default):
     """
     Args:
         asset (str / dict): The asset dict or the asset ID.
@@ -122,12 +124,12 @@ def all_task_types_for_asset(asset):
     """
     asset = normalize_model_parameter(asset)
     path = "user/assets/%s/task-types" % asset["id"]
-    tasks = client.fetch_all(path)
+    tasks = raw.fetch_all(path, client=client)
     return sort_by_name(tasks)
 
 
-@cache
-def all_task_types_for_shot(shot):
+@cache(key_by_id=True)
+def all_task_types_for_shot(shot, client=default):
     """
     Args:
         shot (str / dict): The shot dict or the shot ID.
@@ -137,12 +139,12 @@ def all_task_types_for_shot(shot):
     """
     shot = normalize_model_parameter(shot)
     path = "user/shots/%s/task-types" % shot["id"]
-    task_types = client.fetch_all(path)
+    task_types = raw.fetch_all(path, client=client)
     return sort_by_name(task_types)
 
 
-@cache
-def all_task_types_for_scene(scene):
+@cache(key_by_id=True)
+def all_task_types_for_scene(scene, client=default):
     """
     Args:
         scene (str / dict): The scene dict or the scene ID.
@@ -152,23 +154,23 @@ def all_task_types_for_scene(scene):
     """
     scene = normalize_model_parameter(scene)
     path = "user/scenes/%s/task-types" % scene["id"]
-    task_types = client.fetch_all(path)
+    task_types = raw.fetch_all(path, client=client)
     return sort_by_name(task_types)
 
 
-@cache
-def all_task_types_for_sequence(sequence):
+@cache(key_by_id=True)
+def all_task_types_for_sequence(sequence, client=default):
     """
     return the list of task_tyes for given asset and current user.
     """
     sequence = normalize_model_parameter(sequence)
     path = "user/sequences/%s/task-types" % sequence["id"]
-    task_types = client.fetch_all(path)
+    task_types = raw.fetch_all(path, client=client)
     return sort_by_name(task_types)
 
 
-@cache
-def all_sequences_for_project(project):
+@cache(key_by_id=True)
+def all_sequences_for_project(project, client=default):
     """
     Args:
         project (str / dict): The project dict or the project ID.
@@ -178,12 +180,12 @@ def all_sequences_for_project(project):
     """
     project = normalize_model_parameter(project)
     path = "user/projects/%s/sequences" % project["id"]
-    sequences = client.fetch_all(path)
+    sequences = raw.fetch_all(path, client=client)
     return sort_by_name(sequences)
 
 
-@cache
-def all_episodes_for_project(project):
+@cache(key_by_id=True)
+def all_episodes_for_project(project, client=default):
     """
     Args:
         project (str / dict): The project dict or the project ID.
@@ -192,12 +194,12 @@ def all_episodes_for_project(project):
         list: Episodes for which user has tasks assigned for given project.
     """
     path = "user/projects/%s/episodes" % project["id"]
-    asset_types = client.fetch_all(path)
+    asset_types = raw.fetch_all(path, client=client)
     return sort_by_name(asset_types)
 
 
-@cache
-def all_shots_for_sequence(sequence):
+@cache(key_by_id=True)
+def all_shots_for_sequence(sequence, client=default):
     """
     Args:
         sequence (str / dict): The sequence dict or the sequence ID.
@@ -207,12 +209,12 @@ def all_shots_for_sequence(sequence):
     """
     sequence = normalize_model_parameter(sequence)
     path = "user/sequences/%s/shots" % sequence["id"]
-    shots = client.fetch_all(path)
+    shots = raw.fetch_all(path, client=client)
     return sort_by_name(shots)
 
 
-@cache
-def all_scenes_for_sequence(sequence):
+@cache(key_by_id=True)
+def all_scenes_for_sequence(sequence, client=default):
     """
     Args:
         sequence (str / dict): The sequence dict or the sequence ID.
@@ -222,20 +224,20 @@ def all_scenes_for_sequence(sequence):
     """
     sequence = normalize_model_parameter(sequence)
     path = "user/sequences/%s/scenes" % sequence["id"]
-    scenes = client.fetch_all(path)
+    scenes = raw.fetch_all(path, client=client)
     return sort_by_name(scenes)
 
 
 @cache
-def all_tasks_to_do():
+def all_tasks_to_do(client=default):
     """
     Returns:
         list: Tasks assigned to current user which are not complete.
     """
-    return client.fetch_all("user/tasks")
+    return raw.fetch_all("user/tasks", client=client)
 
 
-def log_desktop_session_log_in():
+def log_desktop_session_log_in(client=default):
     """
     Add a log entry to mention that the user logged in his computer.
 
@@ -244,4 +246,4 @@ def log_desktop_session_log_in():
     """
     path = "/data/user/desktop-login-logs"
     data = {"date": datetime.datetime.now().isoformat()}
-    return client.post(path, data)
+    return raw.post(path, data, client=client)
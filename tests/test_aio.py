@@ -0,0 +1,345 @@
+import asyncio
+import hashlib
+import inspect
+import json
+import os
+import tempfile
+import unittest
+
+import requests_mock
+
+import gazu
+import gazu.aio
+
+try:
+    import aiohttp
+except ImportError:
+    aiohttp = None
+
+
+class AioTestCase(unittest.TestCase):
+    def test_functions_are_awaitable(self):
+        self.assertTrue(inspect.iscoroutinefunction(gazu.aio.task.get_task))
+        self.assertTrue(
+            inspect.iscoroutinefunction(gazu.aio.shot.all_shots_for_project)
+        )
+        self.assertTrue(
+            inspect.iscoroutinefunction(gazu.aio.files.get_output_file)
+        )
+        self.assertTrue(
+            inspect.iscoroutinefunction(gazu.aio.task.add_previews_bulk)
+        )
+        self.assertFalse(hasattr(gazu.aio.task.get_task, "get_cache_infos"))
+
+    def test_functions_match_sync_modules(self):
+        for name in ["asset", "files", "shot", "task"]:
+            sync_module = getattr(gazu, name)
+            async_module = getattr(gazu.aio, name)
+            for function_name, function in inspect.getmembers(
+                sync_module, inspect.isfunction
+            ):
+                if function.__module__ != sync_module.__name__:
+                    continue
+                async_function = getattr(async_module, function_name)
+                self.assertEqual(
+                    list(inspect.signature(async_function).parameters),
+                    list(inspect.signature(function).parameters),
+                    "%s.%s" % (name, function_name),
+                )
+
+    def test_default_client_is_linked(self):
+        self.assertEqual(gazu.aio.get_host(), gazu.get_host())
+        self.assertIs(
+            gazu.aio.default.tokens, gazu.client.default_client.tokens
+        )
+
+
+@unittest.skipIf(aiohttp is None, "aiohttp is not installed")
+class AioClientTestCase(unittest.TestCase):
+    def setUp(self):
+        self.client = gazu.aio.create_client("http://other-server/api")
+        self.client.session = FakeSession()
+        gazu.client.set_retry_policy(backoff_factor=0, client=self.client)
+
+    def run_async(self, coroutine):
+        return asyncio.run(coroutine)
+
+    def test_fetch_all(self):
+        self.client.session.add(
+            "GET",
+            "data/task-types",
+            [{"text": json.dumps([{"name": "Modeling", "id": "type-1"}])}],
+        )
+        task_types = self.run_async(
+            gazu.aio.task.all_task_types(client=self.client)
+        )
+        self.assertEqual(task_types[0]["name"], "Modeling")
+
+    def test_concurrent_requests(self):
+        for index in range(20):
+            self.client.session.add(
+                "GET",
+                "data/shots/shot-%s" % index,
+                [{"text": json.dumps({"id": "shot-%s" % index})}],
+            )
+
+        async def fetch_shots():
+            return await asyncio.gather(
+                *[
+                    gazu.aio.shot.get_shot(
+                        "shot-%s" % index, client=self.client
+                    )
+                    for index in range(20)
+                ]
+            )
+
+        shots = self.run_async(fetch_shots())
+        self.assertEqual(
+            [shot["id"] for shot in shots],
+            ["shot-%s" % index for index in range(20)],
+        )
+        self.assertEqual(self.client.session.max_in_flight, 20)
+
+    def test_nested_calls(self):
+        self.client.session.add(
+            "GET", "data/task-status", [{"text": json.dumps([{"id": "s-1"}])}]
+        )
+        self.client.session.add(
+            "GET", "data/tasks", [{"text": json.dumps([])}]
+        )
+        self.client.session.add(
+            "POST",
+            "data/tasks",
+            [{"text": json.dumps({"id": "task-1", "name": "main"})}],
+        )
+        task = self.run_async(
+            gazu.aio.task.new_task(
+                {"id": "shot-1", "project_id": "project-1"},
+                {"id": "type-1"},
+                client=self.client,
+            )
+        )
+        self.assertEqual(task["id"], "task-1")
+
+    def test_retry_and_refresh(self):
+        self.client.tokens = {"access_token": "old", "refresh_token": "rt"}
+        self.client.session.add(
+            "GET",
+            "data/task-types",
+            [
+                {"status": 502, "text": "{}"},
+                {"status": 401, "text": "{}"},
+                {"text": json.dumps([{"id": "type-1", "name": "Layout"}])},
+            ],
+        )
+        self.client.session.add(
+            "GET",
+            "auth/refresh-token",
+            [{"text": json.dumps({"access_token": "new"})}],
+        )
+        task_types = self.run_async(
+            gazu.aio.task.all_task_types(client=self.client)
+        )
+        self.assertEqual(task_types[0]["id"], "type-1")
+        self.assertEqual(self.client.tokens["access_token"], "new")
+        self.assertEqual(
+            self.client.session.requests[-1][2]["Authorization"],
+            "Bearer new",
+        )
+        self.assertEqual(
+            gazu.client.get_retry_stats(client=self.client)["retries"], 1
+        )
+
+    def test_upload(self):
+        with open("./tests/fixtures/v1.png", "rb") as test_file:
+            data = test_file.read()
+        self.client.session.add(
+            "POST", "data/working-files/file", [{"text": json.dumps({})}]
+        )
+        progress = []
+        file_infos = {}
+        result = self.run_async(
+            gazu.aio.client.upload(
+                "data/working-files/file",
+                "./tests/fixtures/v1.png",
+                progress_callback=lambda *args: progress.append(args),
+                checksum="sha256",
+                file_infos=file_infos,
+                client=self.client,
+            )
+        )
+        self.assertEqual(result, {})
+        headers, body = self.client.session.bodies[-1]
+        self.assertIn(data, body)
+        self.assertEqual(headers["Content-Length"], str(len(body)))
+        self.assertEqual(progress[-1][0], len(body))
+        self.assertEqual(file_infos["size"], len(data))
+        self.assertEqual(
+            file_infos["checksum"], hashlib.sha256(data).hexdigest()
+        )
+
+    def test_download(self):
+        data = b"0123456789" * 1000
+        file_path = os.path.join(tempfile.mkdtemp(), "movie.mp4")
+        self.client.session.add(
+            "GET",
+            "movies/movie.mp4",
+            [{"body": data, "headers": {"ETag": '"v1"'}}],
+        )
+        progress = []
+        result = self.run_async(
+            gazu.aio.client.download(
+                "movies/movie.mp4",
+                file_path,
+                progress_callback=lambda *args: progress.append(args),
+                checksum="md5",
+                client=self.client,
+            )
+        )
+        with open(file_path, "rb") as downloaded_file:
+            self.assertEqual(downloaded_file.read(), data)
+        self.assertEqual(result["size"], len(data))
+        self.assertEqual(result["checksum"], hashlib.md5(data).hexdigest())
+        self.assertEqual(progress[-1][0], len(data))
+        self.assertFalse(os.path.exists(file_path + ".part.json"))
+
+    def test_write_through_sync_cache(self):
+        default_client = gazu.aio.default
+        session = default_client.session
+        session_loop = default_client.session_loop
+        default_client.session = FakeSession()
+        default_client.session_loop = None
+        default_client.session.add(
+            "POST",
+            "data/task-types",
+            [{"text": json.dumps({"id": "type-2", "name": "Layout"})}],
+        )
+        with requests_mock.mock() as mock:
+            mock_task_types = mock.get(
+                gazu.client.get_full_url("data/task-types"),
+                text=json.dumps([]),
+            )
+            try:
+                gazu.cache.enable()
+                gazu.task.all_task_types()
+                self.run_async(gazu.aio.task.new_task_type("Layout"))
+                gazu.task.all_task_types()
+            finally:
+                gazu.cache.clear_all()
+                gazu.cache.disable()
+                default_client.session = session
+                default_client.session_loop = session_loop
+        self.assertEqual(mock_task_types.call_count, 2)
+
+    def test_queued_transfers(self):
+        gazu.scheduler.default_scheduler = gazu.scheduler.TransferScheduler(
+            max_transfers=1
+        )
+        running = []
+        max_running = []
+
+        async def transfer():
+            async with gazu.aioclient._transfer():
+                running.append(1)
+                max_running.append(len(running))
+                await asyncio.sleep(0.01)
+                running.pop()
+
+        async def main():
+            loop = asyncio.get_running_loop()
+            loop.run_in_executor = None
+            await asyncio.gather(*[transfer() for _ in range(20)])
+
+        try:
+            self.run_async(main())
+            stats = gazu.scheduler.get_stats()
+        finally:
+            gazu.scheduler.default_scheduler = (
+                gazu.scheduler.TransferScheduler()
+            )
+        self.assertEqual(max(max_running), 1)
+        self.assertEqual(stats["transfers"], 20)
+        self.assertEqual(stats["max_queue_depth"], 19)
+        self.assertEqual(stats["queue_depth"], 0)
+
+    def test_log_in(self):
+        self.client.session.add(
+            "POST",
+            "auth/login",
+            [{"text": json.dumps({"login": True, "access_token": "token"})}],
+        )
+        self.run_async(gazu.aio.log_in("frank", "test", client=self.client))
+        self.assertEqual(self.client.tokens["access_token"], "token")
+
+
+class FakeResponse(object):
+    def __init__(self, status=200, text="", headers=None, body=None):
+        self.status = status
+        self.headers = headers or {}
+        self.body = text
+        self.content = FakeContent(body or text.encode("utf-8"))
+
+    async def text(self):
+        return self.body
+
+    def release(self):
+        pass
+
+
+class FakeContent(object):
+    def __init__(self, data):
+        self.data = data
+
+    async def iter_chunked(self, size):
+        for index in range(0, len(self.data), size):
+            yield self.data[index : index + size]
+
+
+class FakeRequest(object):
+    def __init__(self, session, response, headers=None, data=None):
+        self.session = session
+        self.response = response
+        self.headers = headers
+        self.data = data
+
+    async def __aenter__(self):
+        if self.data is not None:
+            body = b"".join([chunk async for chunk in self.data])
+            self.session.bodies.append((self.headers, body))
+        self.session.in_flight += 1
+        self.session.max_in_flight = max(
+            self.session.max_in_flight, self.session.in_flight
+        )
+        await asyncio.sleep(0.01)
+        self.session.in_flight -= 1
+        return self.response
+
+    async def __aexit__(self, *args):
+        pass
+
+    def __await__(self):
+        return self.__aenter__().__await__()
+
+
+class FakeSession(object):
+    closed = False
+
+    def __init__(self):
+        self.routes = {}
+        self.requests = []
+        self.bodies = []
+        self.in_flight = 0
+        self.max_in_flight = 0
+
+    def add(self, method, path, responses):
+        self.routes[(method, path)] = responses
+
+    def request(self, method, url, headers=None, data=None, **kwargs):
+        self.requests.append((method, url, headers))
+        path = url.split("/api/", 1)[1].split("?")[0]
+        responses = self.routes[(method, path)]
+        response = responses.pop(0) if len(responses) > 1 else responses[0]
+        return FakeRequest(self, FakeResponse(**response), headers, data)
+
+    def get(self, url, headers=None, **kwargs):
+        return self.request("GET", url, headers=headers, **kwargs)
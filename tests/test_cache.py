@@ -1,10 +1,24 @@
+import copy
+import os
+import shutil
+import tempfile
 import unittest
 import requests_mock
 import json
+import threading
 import time
 
+from collections import OrderedDict
+
+import gazu.asset
 import gazu.client
+import gazu.entity
+import gazu.person
 import gazu.project
+import gazu.shot
+import gazu.task
+
+from utils import fakeid
 
 
 class CacheTestCase(unittest.TestCase):
@@ -80,9 +94,25 @@ class CacheTestCase(unittest.TestCase):
             gazu.project.get_project("project-3")
             gazu.project.get_project("project-01")
             self.assertEqual(mock_3.call_count, 1)
-            self.assertEqual(mock_1.call_count, 2)
+            self.assertEqual(mock_1.call_count, 1)
+            gazu.project.get_project("project-02")
+            self.assertEqual(mock_2.call_count, 2)
+            gazu.project.get_project.set_cache_max_size(300)
+            gazu.project.get_project.clear_cache()
             gazu.cache.disable()
 
+    def test_remove_oldest_entries(self):
+        memo = OrderedDict()
+        for key in ["a", "b", "c"]:
+            memo[key] = {"value": key}
+        gazu.cache.mark_as_recently_used(memo, "a")
+        self.assertEqual(
+            gazu.cache.remove_oldest_entries(memo, 2),
+            [("b", {"value": "b"})],
+        )
+        self.assertEqual(list(memo.keys()), ["c", "a"])
+        self.assertEqual(gazu.cache.remove_oldest_entries(memo, 2), [])
+
     def test_cache_infos(self):
         with requests_mock.mock() as mock:
             mock.get(
@@ -116,3 +146,752 @@ class CacheTestCase(unittest.TestCase):
             self.assertEqual(cache_infos['expired_hits'], 1)
 
             gazu.cache.disable()
+
+    def test_read_only(self):
+        with requests_mock.mock() as mock:
+            mock.get(
+                gazu.client.get_full_url("data/projects"),
+                text=json.dumps(
+                    [{"name": "Agent 327", "id": "project-01", "data": {}}]
+                ),
+            )
+            gazu.cache.enable(read_only=True)
+            gazu.project.all_projects.clear_cache()
+            projects = gazu.project.all_projects()
+            self.assertIs(gazu.project.all_projects(), projects)
+            with self.assertRaises(TypeError):
+                projects.append({})
+            with self.assertRaises(TypeError):
+                projects[0]["name"] = "Big Buck Bunny"
+            with self.assertRaises(TypeError):
+                projects[0]["data"].update({"fps": 24})
+            self.assertEqual(json.loads(json.dumps(projects)), projects)
+
+            projects_copy = copy.deepcopy(projects)
+            projects_copy[0]["name"] = "Big Buck Bunny"
+            self.assertEqual(type(projects_copy[0]), dict)
+            self.assertEqual(projects[0]["name"], "Agent 327")
+
+            gazu.cache.enable()
+            projects = gazu.project.all_projects()
+            projects[0]["name"] = "Big Buck Bunny"
+            self.assertEqual(
+                gazu.project.all_projects()[0]["name"], "Agent 327"
+            )
+
+            # Values are only frozen when read-only mode is enabled.
+            gazu.project.all_projects.clear_cache()
+            gazu.project.all_projects()
+            entry = gazu.cache.get_backend().get(
+                gazu.project.all_projects.cache_namespace,
+                gazu.cache.get_cache_key((), {}),
+            )
+            self.assertIs(type(entry["value"]), list)
+            gazu.cache.enable(read_only=True)
+            with self.assertRaises(TypeError):
+                gazu.project.all_projects().append({})
+            gazu.project.all_projects.clear_cache()
+            gazu.cache.disable()
+
+    def test_get_cache_key(self):
+        self.assertEqual(
+            gazu.cache.get_cache_key(
+                ({"id": "shot-01", "name": "SH01"}, "main"), {}, True
+            ),
+            gazu.cache.get_cache_key(
+                ({"id": "shot-01", "name": "SH01 v2"}, "main"), {}, True
+            ),
+        )
+        self.assertEqual(
+            gazu.cache.get_cache_key(({"id": "shot-01"},), {}, True),
+            gazu.cache.get_cache_key(("shot-01",), {}, True),
+        )
+        self.assertNotEqual(
+            gazu.cache.get_cache_key(
+                ({"id": "shot-01", "name": "SH01"}, "main"), {}
+            ),
+            gazu.cache.get_cache_key(
+                ({"id": "shot-01", "name": "SH01 v2"}, "main"), {}
+            ),
+        )
+        self.assertEqual(
+            gazu.cache.get_cache_key((), {"a": 1, "b": [{"c": 2}]}),
+            gazu.cache.get_cache_key((), {"b": [{"c": 2}], "a": 1}),
+        )
+        self.assertNotEqual(
+            gazu.cache.get_cache_key((1,), {}),
+            gazu.cache.get_cache_key(("1",), {}),
+        )
+        self.assertNotEqual(
+            gazu.cache.get_cache_key(("shot-01",), {}),
+            gazu.cache.get_cache_key((), {"shot": "shot-01"}),
+        )
+        key = gazu.cache.get_cache_key((object(), {"a", "b"}), {})
+        self.assertEqual(hash(key), hash(key))
+
+    def test_model_dicts_share_cache_slot(self):
+        with requests_mock.mock() as mock:
+            project_id = fakeid("project-01")
+            mock_shots = mock.get(
+                gazu.client.get_full_url(
+                    "data/projects/%s/shots" % project_id
+                ),
+                text=json.dumps([{"name": "SH01", "id": "shot-01"}]),
+            )
+            gazu.cache.enable()
+            gazu.shot.all_shots_for_project({"id": project_id})
+            gazu.shot.all_shots_for_project(
+                {"id": project_id, "name": "Agent 327"}
+            )
+            gazu.shot.all_shots_for_project(project_id)
+            self.assertEqual(mock_shots.call_count, 1)
+            gazu.shot.all_shots_for_project.clear_cache()
+            gazu.cache.disable()
+
+    def test_model_dicts_keyed_by_content(self):
+        with requests_mock.mock() as mock:
+            task_id = fakeid("task-01")
+            for status_id, name in [("wip", "WIP"), ("done", "Done")]:
+                mock.get(
+                    gazu.client.get_full_url(
+                        "data/task-status?id=%s" % status_id
+                    ),
+                    text=json.dumps([{"id": status_id, "name": name}]),
+                )
+            gazu.cache.enable()
+            gazu.task.get_task_status.clear_cache()
+            status = gazu.task.get_task_status(
+                {"id": task_id, "task_status_id": "wip"}
+            )
+            self.assertEqual(status["name"], "WIP")
+            status = gazu.task.get_task_status(
+                {"id": task_id, "task_status_id": "done"}
+            )
+            self.assertEqual(status["name"], "Done")
+            gazu.task.get_task_status.clear_cache()
+            gazu.cache.disable()
+
+    def test_clients_have_their_own_entries(self):
+        other_client = gazu.create_client("http://other-server/api")
+        with requests_mock.mock() as mock:
+            mock_default = mock.get(
+                gazu.client.get_full_url("data/task-types"),
+                text=json.dumps([{"name": "Modeling", "id": "task-type-01"}]),
+            )
+            mock_other = mock.get(
+                "http://other-server/api/data/task-types",
+                text=json.dumps([{"name": "Layout", "id": "task-type-02"}]),
+            )
+            gazu.cache.enable()
+            gazu.task.all_task_types.clear_cache()
+            task_types = gazu.task.all_task_types()
+            other_task_types = gazu.task.all_task_types(client=other_client)
+            self.assertEqual(task_types[0]["name"], "Modeling")
+            self.assertEqual(other_task_types[0]["name"], "Layout")
+            gazu.task.all_task_types(client=gazu.client.default_client)
+            gazu.task.all_task_types(client=other_client)
+            self.assertEqual(mock_default.call_count, 1)
+            self.assertEqual(mock_other.call_count, 1)
+            gazu.task.all_task_types.clear_cache()
+            gazu.cache.disable()
+
+    def test_fetch_many_uses_cache(self):
+        with requests_mock.mock() as mock:
+            for index in range(3):
+                mock.get(
+                    gazu.client.get_full_url("data/persons/person-%s" % index),
+                    text=json.dumps({"id": "person-%s" % index}),
+                )
+            gazu.cache.enable()
+            gazu.person.get_person.clear_cache()
+            gazu.person.get_person("person-1")
+            self.assertEqual(
+                gazu.person.get_person.get_cache_value("person-1")["id"],
+                "person-1",
+            )
+            self.assertRaises(
+                KeyError, gazu.person.get_person.get_cache_value, "person-2"
+            )
+            persons = gazu.client.fetch_many(
+                "persons", ["person-0", "person-1", "person-2"]
+            )
+            self.assertEqual(
+                [person["id"] for person in persons],
+                ["person-0", "person-1", "person-2"],
+            )
+            self.assertEqual(mock.call_count, 3)
+            gazu.person.get_person("person-2")
+            self.assertEqual(mock.call_count, 3)
+            gazu.person.get_person.clear_cache()
+            gazu.cache.disable()
+
+    def test_expired_entries_are_revalidated(self):
+        other_client = gazu.create_client("http://other-server/api")
+        task_types = [{"name": "Modeling", "id": "task-type-01"}]
+        new_task_types = [{"name": "Layout", "id": "type-02"}] + task_types
+        with requests_mock.mock() as mock:
+            mock.get(
+                "http://other-server/api/data/task-types",
+                [
+                    {
+                        "text": json.dumps(task_types),
+                        "headers": {"ETag": '"v1"'},
+                    },
+                    {"status_code": 304, "text": ""},
+                    {
+                        "text": json.dumps(new_task_types),
+                        "headers": {"ETag": '"v2"'},
+                    },
+                ],
+            )
+            gazu.cache.enable()
+            gazu.task.all_task_types.set_cache_expire(1)
+            gazu.task.all_task_types(client=other_client)
+            self.assertNotIn("If-None-Match", mock.last_request.headers)
+            time.sleep(1.1)
+            self.assertEqual(
+                gazu.task.all_task_types(client=other_client), task_types
+            )
+            self.assertEqual(mock.call_count, 2)
+            self.assertEqual(
+                mock.last_request.headers["If-None-Match"], '"v1"'
+            )
+            stats = gazu.client.get_validator_stats(client=other_client)
+            self.assertEqual(stats["not_modified"], 1)
+            self.assertEqual(stats["saved_bytes"], len(json.dumps(task_types)))
+            self.assertFalse(hasattr(other_client, "validators"))
+
+            # A changed response is downloaded once, by the revalidation.
+            time.sleep(1.1)
+            self.assertEqual(
+                gazu.task.all_task_types(client=other_client), new_task_types
+            )
+            self.assertEqual(mock.call_count, 3)
+            stats = gazu.client.get_validator_stats(client=other_client)
+            self.assertEqual(stats["conditional_requests"], 2)
+
+            gazu.cache.disable()
+            mock.get(
+                "http://other-server/api/data/task-types",
+                text=json.dumps(task_types),
+            )
+            gazu.task.all_task_types(client=other_client)
+            self.assertNotIn("If-None-Match", mock.last_request.headers)
+            gazu.task.all_task_types.set_cache_expire(120)
+            gazu.task.all_task_types.clear_cache()
+
+    def test_concurrent_misses_are_coalesced(self):
+        calls = []
+        started = threading.Event()
+        release = threading.Event()
+
+        @gazu.cache.cache
+        def slow_function(value):
+            calls.append(value)
+            started.set()
+            release.wait()
+            return {"value": value}
+
+        gazu.cache.enable()
+        results = []
+        threads = [
+            threading.Thread(
+                target=lambda: results.append(slow_function("task-types"))
+            )
+            for _ in range(8)
+        ]
+        threads[0].start()
+        started.wait()
+        for thread in threads[1:]:
+            thread.start()
+        while slow_function.get_cache_infos()["coalesced"] < 7:
+            time.sleep(0.01)
+        release.set()
+        for thread in threads:
+            thread.join()
+
+        self.assertEqual(calls, ["task-types"])
+        self.assertEqual(results, [{"value": "task-types"}] * 8)
+        cache_infos = slow_function.get_cache_infos()
+        self.assertEqual(cache_infos["misses"], 1)
+        self.assertEqual(cache_infos["coalesced"], 7)
+        self.assertEqual(slow_function("task-types"), {"value": "task-types"})
+        self.assertEqual(slow_function.get_cache_infos()["hits"], 1)
+        slow_function.clear_cache()
+        gazu.cache.cached_functions.remove(slow_function)
+        gazu.cache.disable()
+
+    def test_failed_calls_are_not_cached(self):
+        @gazu.cache.cache
+        def failing_function():
+            raise ValueError("Server unavailable")
+
+        gazu.cache.enable()
+        with self.assertRaises(ValueError):
+            failing_function()
+        self.assertEqual(failing_function.get_cache_infos()["current_size"], 0)
+        failing_function.clear_cache()
+        gazu.cache.cached_functions.remove(failing_function)
+        gazu.cache.disable()
+
+    def test_sqlite_backend(self):
+        cache_folder = tempfile.mkdtemp()
+        cache_path = os.path.join(cache_folder, "cache.sqlite")
+        try:
+            with requests_mock.mock() as mock:
+                mock_1 = mock.get(
+                    gazu.client.get_full_url("data/projects/project-01"),
+                    text=json.dumps({"name": "Agent 327", "id": "project-01"}),
+                )
+                mock_2 = mock.get(
+                    gazu.client.get_full_url("data/projects/project-02"),
+                    text=json.dumps({"name": "Caminandes", "id": "project-02"}),
+                )
+
+                gazu.cache.enable(
+                    backend=gazu.cache.SQLiteBackend(cache_path)
+                )
+                gazu.project.get_project.clear_cache()
+                gazu.project.get_project("project-01")
+                gazu.project.get_project("project-01")
+                self.assertEqual(mock_1.call_count, 1)
+                backend = gazu.cache.get_backend()
+                (data,) = backend.get_connection().execute(
+                    "SELECT entry FROM entries"
+                ).fetchone()
+                self.assertEqual(
+                    json.loads(bytes(data).decode("utf-8"))["value"]["name"],
+                    "Agent 327",
+                )
+                gazu.cache.enable(read_only=True)
+                self.assertIs(gazu.cache.get_backend(), backend)
+
+                # A new backend on the same file acts as another process.
+                gazu.cache.enable(
+                    read_only=True,
+                    backend=gazu.cache.SQLiteBackend(cache_path),
+                )
+                project = gazu.project.get_project("project-01")
+                self.assertEqual(project["name"], "Agent 327")
+                self.assertEqual(mock_1.call_count, 1)
+                with self.assertRaises(TypeError):
+                    project["name"] = "Big Buck Bunny"
+
+                gazu.project.get_project.set_cache_max_size(1)
+                gazu.project.get_project("project-02")
+                gazu.project.get_project("project-01")
+                self.assertEqual(mock_2.call_count, 1)
+                self.assertEqual(mock_1.call_count, 2)
+                cache_infos = gazu.project.get_project.get_cache_infos()
+                self.assertEqual(cache_infos["current_size"], 1)
+
+                gazu.project.get_project.set_cache_expire(1)
+                time.sleep(1.1)
+                gazu.project.get_project("project-01")
+                self.assertEqual(mock_1.call_count, 3)
+
+                gazu.project.get_project.clear_cache()
+                cache_infos = gazu.project.get_project.get_cache_infos()
+                self.assertEqual(cache_infos["current_size"], 0)
+        finally:
+            gazu.project.get_project.set_cache_expire(120)
+            gazu.project.get_project.set_cache_max_size(300)
+            gazu.cache.enable(backend="memory")
+            gazu.cache.disable()
+            shutil.rmtree(cache_folder)
+
+    def test_sqlite_backend_users(self):
+        cache_folder = tempfile.mkdtemp()
+        alice = gazu.client.create_client("http://kitsu-test/api")
+        bob = gazu.client.create_client("http://kitsu-test/api")
+        gazu.client.set_tokens(
+            {"access_token": "a1", "refresh_token": "alice"}, client=alice
+        )
+        gazu.client.set_tokens(
+            {"access_token": "b1", "refresh_token": "bob"}, client=bob
+        )
+        try:
+            with requests_mock.mock() as mock:
+                mock_projects = mock.get(
+                    "http://kitsu-test/api/data/projects/open",
+                    [
+                        {"text": json.dumps([{"id": "project-01"}])},
+                        {"text": json.dumps([{"id": "project-02"}])},
+                    ],
+                )
+                gazu.cache.enable(
+                    backend=gazu.cache.SQLiteBackend(
+                        os.path.join(cache_folder, "cache.sqlite")
+                    )
+                )
+                gazu.project.all_open_projects.clear_cache()
+                alice_projects = gazu.project.all_open_projects(client=alice)
+                bob_projects = gazu.project.all_open_projects(client=bob)
+                self.assertEqual(mock_projects.call_count, 2)
+                self.assertEqual(alice_projects, [{"id": "project-01"}])
+                self.assertEqual(bob_projects, [{"id": "project-02"}])
+
+                # A token refresh keeps the user entries.
+                alice.tokens["access_token"] = "a2"
+                self.assertEqual(
+                    gazu.project.all_open_projects(client=alice),
+                    alice_projects,
+                )
+                self.assertEqual(mock_projects.call_count, 2)
+        finally:
+            gazu.cache.enable(backend="memory")
+            gazu.cache.disable()
+            shutil.rmtree(cache_folder)
+
+    def test_set_backend(self):
+        backend = gazu.cache.get_backend()
+        gazu.cache.enable()
+        self.assertIs(gazu.cache.get_backend(), backend)
+        self.assertIsInstance(backend, gazu.cache.MemoryBackend)
+        gazu.cache.disable()
+
+    def test_invalidate(self):
+        task_id = fakeid("task-01")
+        shot_id = fakeid("shot-01")
+        with requests_mock.mock() as mock:
+            mock_task = mock.get(
+                gazu.client.get_full_url("data/tasks/%s/full" % task_id),
+                text=json.dumps({"name": "main", "id": task_id}),
+            )
+            mock_tasks = mock.get(
+                gazu.client.get_full_url("data/shots/%s/tasks" % shot_id),
+                text=json.dumps([{"name": "main", "id": task_id}]),
+            )
+            mock_types = mock.get(
+                gazu.client.get_full_url("data/task-types"),
+                text=json.dumps([{"name": "Modeling", "id": "type-01"}]),
+            )
+            gazu.cache.enable()
+            gazu.task.get_task(task_id)
+            gazu.task.all_tasks_for_shot(shot_id)
+            gazu.task.all_task_types()
+            self.assertEqual(gazu.cache.invalidate({"id": task_id}), 2)
+            gazu.task.get_task(task_id)
+            gazu.task.all_tasks_for_shot(shot_id)
+            gazu.task.all_task_types()
+            self.assertEqual(mock_task.call_count, 2)
+            self.assertEqual(mock_tasks.call_count, 2)
+            self.assertEqual(mock_types.call_count, 1)
+            self.assertEqual(gazu.cache.invalidate(shot_id), 1)
+            self.assertEqual(gazu.cache.invalidate(shot_id), 0)
+            gazu.cache.clear_all()
+            gazu.cache.disable()
+
+    def test_event_invalidation(self):
+        task_id = fakeid("task-01")
+        shot_id = fakeid("shot-01")
+        project_id = fakeid("project-01")
+        event_client = FakeEventClient()
+        gazu.cache.enable_event_invalidation(event_client)
+        self.assertIn("task:update", event_client.main_namespace.handlers)
+        with requests_mock.mock() as mock:
+            mock_task = mock.get(
+                gazu.client.get_full_url("data/tasks/%s/full" % task_id),
+                text=json.dumps({"name": "main", "id": task_id}),
+            )
+            mock_shots = mock.get(
+                gazu.client.get_full_url(
+                    "data/projects/%s/shots" % project_id
+                ),
+                text=json.dumps([{"name": "SH01", "id": shot_id}]),
+            )
+            gazu.cache.enable()
+            gazu.task.get_task(task_id)
+            gazu.shot.all_shots_for_project(project_id)
+
+            event_client.emit(
+                "task:update", {"task_id": task_id, "project_id": project_id}
+            )
+            gazu.task.get_task(task_id)
+            gazu.shot.all_shots_for_project(project_id)
+            self.assertEqual(mock_task.call_count, 2)
+            self.assertEqual(mock_shots.call_count, 1)
+
+            event_client.emit(
+                "shot:new",
+                {"shot_id": fakeid("shot-02"), "project_id": project_id},
+            )
+            gazu.task.get_task(task_id)
+            gazu.shot.all_shots_for_project(project_id)
+            self.assertEqual(mock_task.call_count, 2)
+            self.assertEqual(mock_shots.call_count, 2)
+            gazu.cache.clear_all()
+            gazu.cache.disable()
+
+
+    def test_write_through(self):
+        project_id = fakeid("project-01")
+        sequence_id = fakeid("sequence-01")
+        shot_id = fakeid("shot-01")
+        with requests_mock.mock() as mock:
+            mock_by_name = mock.get(
+                gazu.client.get_full_url(
+                    "data/shots/all?sequence_id=%s&name=SH01" % sequence_id
+                ),
+                text=json.dumps([]),
+            )
+            mock_shots = mock.get(
+                gazu.client.get_full_url(
+                    "data/projects/%s/shots" % project_id
+                ),
+                text=json.dumps([]),
+            )
+            mock_shot = mock.get(
+                gazu.client.get_full_url("data/shots/%s" % shot_id),
+                text=json.dumps({"id": shot_id, "name": "SH01"}),
+            )
+            mock.post(
+                gazu.client.get_full_url(
+                    "data/projects/%s/shots" % project_id
+                ),
+                text=json.dumps(
+                    {
+                        "id": shot_id,
+                        "name": "SH01",
+                        "project_id": project_id,
+                        "parent_id": sequence_id,
+                    }
+                ),
+            )
+            mock.put(
+                gazu.client.get_full_url("data/entities/%s" % shot_id),
+                text=json.dumps({"id": shot_id, "name": "SH01 v2"}),
+            )
+            gazu.cache.enable()
+            gazu.shot.all_shots_for_project(project_id)
+            gazu.shot.get_shot(shot_id)
+            gazu.shot.new_shot(project_id, sequence_id, "SH01")
+            self.assertEqual(mock_by_name.call_count, 1)
+
+            gazu.shot.get_shot_by_name(sequence_id, "SH01")
+            gazu.shot.all_shots_for_project(project_id)
+            gazu.shot.get_shot(shot_id)
+            self.assertEqual(mock_by_name.call_count, 2)
+            self.assertEqual(mock_shots.call_count, 2)
+            self.assertEqual(mock_shot.call_count, 1)
+
+            gazu.shot.update_shot({"id": shot_id, "name": "SH01 v2"})
+            gazu.shot.get_shot(shot_id)
+            gazu.shot.all_shots_for_project(project_id)
+            self.assertEqual(mock_shot.call_count, 2)
+            self.assertEqual(mock_shots.call_count, 2)
+            gazu.cache.clear_all()
+            gazu.cache.disable()
+
+    def test_write_through_readers(self):
+        asset_type_id = fakeid("asset-type-01")
+        with requests_mock.mock() as mock:
+            mock_get = mock.get(
+                gazu.client.get_full_url(
+                    "data/asset-types/%s" % asset_type_id
+                ),
+                text=json.dumps({"id": asset_type_id, "name": "Props"}),
+            )
+            mock.put(
+                gazu.client.get_full_url(
+                    "data/asset-types/%s" % asset_type_id
+                ),
+                text=json.dumps({"id": asset_type_id, "name": "Prop"}),
+            )
+            gazu.cache.enable()
+            gazu.asset.get_asset_type(asset_type_id)
+            gazu.asset.update_asset_type({"id": asset_type_id, "name": "Prop"})
+            asset_type = gazu.asset.get_asset_type(asset_type_id)
+            self.assertEqual(asset_type["name"], "Prop")
+            self.assertEqual(mock_get.call_count, 1)
+            gazu.cache.clear_all()
+            gazu.cache.disable()
+
+    def test_write_through_assignees(self):
+        person_id = fakeid("person-01")
+        task_id = fakeid("task-01")
+        entity = {"id": fakeid("shot-01"), "project_id": fakeid("project-01")}
+        task = {
+            "id": task_id,
+            "entity_id": entity["id"],
+            "assignees": [person_id],
+        }
+        with requests_mock.mock() as mock:
+            mock_tasks = mock.get(
+                gazu.client.get_full_url("data/persons/%s/tasks" % person_id),
+                text=json.dumps([]),
+            )
+            mock_assign = mock.put(
+                gazu.client.get_full_url(
+                    "actions/persons/%s/assign" % person_id
+                ),
+                text=json.dumps([task]),
+            )
+            mock.get(
+                gazu.client.get_full_url(
+                    "data/tasks?name=main&entity_id=%s&task_type_id=%s"
+                    % (entity["id"], fakeid("type-01"))
+                ),
+                text=json.dumps([]),
+            )
+            mock.post(
+                gazu.client.get_full_url("data/tasks"),
+                text=json.dumps(task),
+            )
+            gazu.cache.enable()
+            gazu.task.all_tasks_for_person(person_id)
+            gazu.task.assign_task(task_id, person_id)
+            gazu.task.assign_task(task_id, person_id)
+            self.assertEqual(mock_assign.call_count, 2)
+            gazu.task.all_tasks_for_person(person_id)
+            self.assertEqual(mock_tasks.call_count, 2)
+
+            gazu.task.new_task(
+                entity,
+                {"id": fakeid("type-01")},
+                task_status={"id": fakeid("status-01")},
+                assignees=[{"id": person_id}],
+            )
+            gazu.task.all_tasks_for_person(person_id)
+            self.assertEqual(mock_tasks.call_count, 3)
+            gazu.cache.clear_all()
+            gazu.cache.disable()
+
+    def test_stale_while_revalidate(self):
+        values = ["first", "second"]
+        refresh_started = threading.Event()
+        release = threading.Event()
+
+        @gazu.cache.cache
+        def slow_list():
+            value = values.pop(0)
+            if value == "second":
+                refresh_started.set()
+                release.wait()
+            return [value]
+
+        gazu.cache.enable()
+        slow_list.set_cache_stale_while_revalidate()
+        slow_list.set_cache_expire(1)
+        self.assertEqual(slow_list(), ["first"])
+        time.sleep(1.1)
+        self.assertEqual(slow_list(), ["first"])
+        refresh_started.wait()
+        self.assertEqual(slow_list(), ["first"])
+        cache_infos = slow_list.get_cache_infos()
+        self.assertEqual(cache_infos["refreshes_in_flight"], 1)
+        self.assertEqual(cache_infos["stale_hits"], 2)
+
+        release.set()
+        while slow_list.get_cache_infos()["refreshes"] < 1:
+            time.sleep(0.01)
+        self.assertEqual(slow_list(), ["second"])
+        cache_infos = slow_list.get_cache_infos()
+        self.assertEqual(cache_infos["refreshes_in_flight"], 0)
+        self.assertEqual(cache_infos["hits"], 1)
+        self.assertGreater(cache_infos["average_refresh_latency"], 0)
+        slow_list.clear_cache()
+        gazu.cache.cached_functions.remove(slow_list)
+        gazu.cache.disable()
+
+    def test_memory_budget(self):
+        @gazu.cache.cache
+        def big_list(name, nb_items):
+            return [{"id": "%s-%s" % (name, i)} for i in range(nb_items)]
+
+        @gazu.cache.cache
+        def small_dict(name):
+            return {"id": name}
+
+        gazu.cache.enable()
+        small_dict("small-01")
+        big_list("big-01", 1000)
+        big_list("big-02", 1000)
+        infos = gazu.cache.get_cache_infos()
+        big_bytes = big_list.get_cache_infos()["current_bytes"]
+        small_bytes = small_dict.get_cache_infos()["current_bytes"]
+        self.assertGreater(big_bytes, 100 * small_bytes)
+        self.assertEqual(
+            infos["functions"][big_list.cache_namespace]["current_bytes"],
+            big_bytes,
+        )
+        self.assertGreaterEqual(infos["current_bytes"], big_bytes + small_bytes)
+
+        gazu.cache.set_memory_budget(
+            infos["current_bytes"] - big_bytes // 4
+        )
+        self.assertEqual(small_dict.get_cache_infos()["current_size"], 1)
+        self.assertEqual(big_list.get_cache_infos()["current_size"], 1)
+        self.assertLessEqual(
+            gazu.cache.get_cache_infos()["current_bytes"],
+            gazu.cache.get_cache_infos()["memory_budget"],
+        )
+
+        gazu.cache.set_memory_budget(small_bytes)
+        big_list("big-03", 1000)
+        self.assertEqual(big_list.get_cache_infos()["current_size"], 0)
+        self.assertEqual(small_dict.get_cache_infos()["current_size"], 1)
+
+        gazu.cache.set_memory_budget(0)
+        big_list.clear_cache()
+        gazu.cache.cached_functions.remove(big_list)
+        small_dict.clear_cache()
+        gazu.cache.cached_functions.remove(small_dict)
+        gazu.cache.disable()
+
+    def test_preload(self):
+        project_id = fakeid("project-01")
+        shot_id = fakeid("shot-01")
+        asset_id = fakeid("asset-01")
+        person_id = fakeid("person-01")
+        routes = {
+            "data/projects/%s" % project_id: {"id": project_id},
+            "data/projects/%s/episodes" % project_id: [],
+            "data/projects/%s/sequences" % project_id: [],
+            "data/projects/%s/shots" % project_id: [
+                {"id": shot_id, "name": "SH01"}
+            ],
+            "data/projects/%s/assets" % project_id: [
+                {"id": asset_id, "name": "Tree"}
+            ],
+            "data/projects/%s/asset-types" % project_id: [],
+            "data/task-types": [],
+            "data/task-status": [],
+            "data/output-types": [],
+            "data/persons": [{"id": person_id, "first_name": "John"}],
+        }
+        with requests_mock.mock() as mock:
+            mocks = [
+                mock.get(gazu.client.get_full_url(path), text=json.dumps(data))
+                for (path, data) in routes.items()
+            ]
+            gazu.cache.enable()
+            results = gazu.cache.preload(project_id)
+            self.assertEqual(results["shots"][0]["id"], shot_id)
+            for route_mock in mocks:
+                self.assertEqual(route_mock.call_count, 1)
+
+            self.assertEqual(gazu.shot.get_shot(shot_id)["name"], "SH01")
+            self.assertEqual(gazu.asset.get_asset(asset_id)["name"], "Tree")
+            self.assertEqual(gazu.entity.get_entity(asset_id)["name"], "Tree")
+            self.assertEqual(
+                gazu.person.get_person(person_id)["first_name"], "John"
+            )
+            gazu.shot.all_shots_for_project(project_id)
+            gazu.cache.clear_all()
+            gazu.cache.disable()
+
+class FakeNamespace(object):
+    def __init__(self):
+        self.handlers = {}
+
+    def on(self, event_name, event_handler):
+        self.handlers[event_name] = event_handler
+
+
+class FakeEventClient(object):
+    def __init__(self):
+        self.main_namespace = FakeNamespace()
+
+    def emit(self, event_name, data):
+        self.main_namespace.handlers[event_name](data)
@@ -1,20 +1,28 @@
+import base64
 import cgi
 import datetime
+import hashlib
 import json
 import io
+import os
 import sys
+import tempfile
+import zlib
 
 import unittest
+import requests
 import requests_mock
 import gazu
 
 from gazu import client
 from gazu.exception import (
+    DownloadFailedException,
     RouteNotFoundException,
     AuthFailedException,
     MethodNotAllowedException,
     NotAuthenticatedException,
     NotAllowedException,
+    ServerErrorException,
 )
 
 
@@ -40,6 +48,294 @@ class BaseFuncTestCase(ClientTestCase):
         self.assertEqual(client.get_host(), "newhost")
         client.set_host("http://gazu-server/")
 
+    def test_set_connection_pool(self):
+        other_client = client.create_client("http://other-server/api")
+        client.set_connection_pool(
+            pool_maxsize=32, keep_alive=False, client=other_client
+        )
+        adapter = other_client.session.get_adapter("http://other-server/api")
+        self.assertEqual(adapter._pool_maxsize, 32)
+        self.assertEqual(other_client.session.headers["Connection"], "close")
+        client.set_connection_pool(client=other_client)
+        self.assertNotIn("Connection", other_client.session.headers)
+
+    def test_set_timeout(self):
+        other_client = client.create_client("http://other-server/api")
+        client.set_timeout(connect=3, read=30, client=other_client)
+        self.assertEqual(client.get_timeout(client=other_client), (3, 30))
+        with requests_mock.mock() as mock:
+            mock.get("http://other-server/api/data/persons", text="[]")
+            client.fetch_all("persons", client=other_client)
+            self.assertEqual(mock.last_request.timeout, (3, 30))
+        client.set_timeout(client=other_client)
+        self.assertIsNone(client.get_timeout(client=other_client))
+
+    def test_get_connection_stats(self):
+        other_client = client.create_client("http://other-server/api")
+        stats = client.get_connection_stats(client=other_client)
+        self.assertEqual(stats["requests"], 0)
+        self.assertEqual(stats["reused_connections"], 0)
+
+        class FakePool(object):
+            num_connections = 2
+            num_requests = 5
+
+            def close(self):
+                pass
+
+        adapter = other_client.session.get_adapter("http://other-server/api")
+        adapter.poolmanager.pools["other-server"] = FakePool()
+        stats = client.get_connection_stats(client=other_client)
+        self.assertEqual(stats["pools"], 1)
+        self.assertEqual(stats["new_connections"], 2)
+        self.assertEqual(stats["reused_connections"], 3)
+        client.set_connection_pool(client=other_client)
+        stats = client.get_connection_stats(client=other_client)
+        self.assertEqual(stats["pools"], 0)
+        self.assertEqual(stats["requests"], 5)
+        self.assertEqual(stats["reused_connections"], 3)
+
+    def test_set_compression(self):
+        other_client = client.create_client("http://other-server/api")
+        headers = other_client.session.headers
+        self.assertIn("gzip", headers["Accept-Encoding"])
+        client.set_compression(False, client=other_client)
+        self.assertEqual(headers["Accept-Encoding"], "identity")
+        client.set_compression(request_threshold=100, client=other_client)
+        self.assertIn("gzip", headers["Accept-Encoding"])
+
+        data = [{"name": "Asset %s" % index} for index in range(50)]
+        with requests_mock.mock() as mock:
+            mock.post("http://other-server/api/import/kitsu/assets", text="{}")
+            client.import_data("assets", data, client=other_client)
+            request = mock.last_request
+            self.assertEqual(request.headers["Content-Encoding"], "gzip")
+            self.assertEqual(
+                json.loads(zlib.decompress(request.body, 16 + zlib.MAX_WBITS)),
+                data,
+            )
+            mock.post("http://other-server/api/data/assets", text="{}")
+            client.post("data/assets", {"name": "Tree"}, client=other_client)
+            self.assertNotIn("Content-Encoding", mock.last_request.headers)
+
+    def test_get_transfer_stats(self):
+        other_client = client.create_client("http://other-server/api")
+        data = [{"name": "Asset %s" % index} for index in range(50)]
+        body = json.dumps(data).encode("utf-8")
+        asset_id = "a24a6ea4-ce75-4665-a070-57453082c25a"
+        with requests_mock.mock() as mock:
+            mock.get(
+                "http://other-server/api/data/assets",
+                content=client.gzip_compress(body),
+                headers={"Content-Encoding": "gzip"},
+            )
+            mock.put(
+                "http://other-server/api/data/assets/%s" % asset_id,
+                text="{}",
+            )
+            self.assertEqual(
+                client.get("data/assets", client=other_client), data
+            )
+            client.get(
+                "data/assets", params={"name": "Tree"}, client=other_client
+            )
+            client.put(
+                "data/assets/%s" % asset_id,
+                {"name": "Tree"},
+                client=other_client,
+            )
+        stats = client.get_transfer_stats(client=other_client)
+        self.assertEqual(stats["data/assets"]["requests"], 2)
+        self.assertEqual(stats["data/assets"]["received_bytes"], 2 * len(body))
+        self.assertLess(stats["data/assets"]["received_wire_bytes"], len(body))
+        self.assertEqual(
+            stats["data/assets/:id"]["sent_bytes"],
+            len(gazu.encoder.dumps({"name": "Tree"})),
+        )
+        self.assertEqual(stats["data/assets/:id"]["received_bytes"], 2)
+
+    def test_retry(self):
+        other_client = client.create_client("http://other-server/api")
+        client.set_retry_policy(
+            max_retries=2, backoff_factor=0, client=other_client
+        )
+        url = "http://other-server/api/data/persons"
+        with requests_mock.mock() as mock:
+            mock.get(
+                url,
+                [
+                    {"status_code": 502, "text": "{}"},
+                    {"exc": requests.exceptions.ConnectionError},
+                    {"text": json.dumps([{"id": "person-1"}])},
+                ],
+            )
+            persons = client.fetch_all("persons", client=other_client)
+            self.assertEqual(persons[0]["id"], "person-1")
+            self.assertEqual(mock.call_count, 3)
+
+            mock.get(url, status_code=503, text="{}")
+            self.assertRaises(
+                ServerErrorException,
+                client.get,
+                "data/persons",
+                client=other_client,
+            )
+            self.assertEqual(mock.call_count, 6)
+        stats = client.get_retry_stats(client=other_client)
+        self.assertEqual(stats["retries"], 4)
+        self.assertEqual(stats["retried_requests"], 2)
+        self.assertEqual(stats["failed_requests"], 1)
+
+    def test_retry_post(self):
+        other_client = client.create_client("http://other-server/api")
+        client.set_retry_policy(backoff_factor=0, client=other_client)
+        with requests_mock.mock() as mock:
+            mock.post(
+                "http://other-server/api/data/persons",
+                [{"status_code": 502, "text": "{}"}, {"text": "{}"}],
+            )
+            self.assertRaises(
+                ServerErrorException,
+                client.post,
+                "data/persons",
+                {},
+                client=other_client,
+            )
+            self.assertEqual(mock.call_count, 1)
+            mock.post(
+                "http://other-server/api/data/persons",
+                [{"status_code": 502, "text": "{}"}, {"text": "{}"}],
+            )
+            client.post("data/persons", {}, retry=True, client=other_client)
+            self.assertEqual(mock.call_count, 3)
+
+    def test_retry_after(self):
+        other_client = client.create_client("http://other-server/api")
+        with requests_mock.mock() as mock:
+            mock.get(
+                "http://other-server/api/data/persons",
+                status_code=429,
+                headers={"Retry-After": "2"},
+            )
+            response = requests.get("http://other-server/api/data/persons")
+        self.assertEqual(client.get_retry_after(response), 2)
+        self.assertEqual(
+            client.get_retry_delay(0, response, client=other_client), 2
+        )
+        client.set_retry_policy(max_backoff=1, client=other_client)
+        self.assertEqual(
+            client.get_retry_delay(0, response, client=other_client), 1
+        )
+        client.set_retry_policy(client=other_client)
+        for attempt in range(10):
+            delay = client.get_retry_delay(attempt, client=other_client)
+            self.assertTrue(0 <= delay <= 30)
+
+    def test_refresh_access_token(self):
+        other_client = client.create_client(
+            "http://other-server/api",
+            tokens={"access_token": "old", "refresh_token": "refresh"},
+        )
+        with requests_mock.mock() as mock:
+            mock_refresh = mock.get(
+                "http://other-server/api/auth/refresh-token",
+                text=json.dumps({"access_token": "new"}),
+            )
+            mock.get(
+                "http://other-server/api/data/persons",
+                [
+                    {"status_code": 401, "text": "{}"},
+                    {"text": json.dumps([{"id": "person-1"}])},
+                ],
+            )
+            persons = client.fetch_all("persons", client=other_client)
+            self.assertEqual(persons[0]["id"], "person-1")
+            self.assertEqual(
+                mock_refresh.last_request.headers["Authorization"],
+                "Bearer refresh",
+            )
+            self.assertEqual(
+                mock.last_request.headers["Authorization"], "Bearer new"
+            )
+            self.assertEqual(other_client.tokens["access_token"], "new")
+
+            client.refresh_access_token("old", client=other_client)
+            self.assertEqual(mock_refresh.call_count, 1)
+
+            mock.get(
+                "http://other-server/api/auth/refresh-token", status_code=401
+            )
+            mock.get("http://other-server/api/data/persons", status_code=401)
+            self.assertRaises(
+                NotAuthenticatedException,
+                client.fetch_all,
+                "persons",
+                client=other_client,
+            )
+
+    def test_fetch_many(self):
+        with requests_mock.mock() as mock:
+            for index in range(5):
+                mock.get(
+                    client.get_full_url("data/persons/person-%s" % index),
+                    text=json.dumps({"id": "person-%s" % index}),
+                )
+            ids = ["person-3", "person-1", "person-3", "person-0", "person-4"]
+            persons = client.fetch_many("persons", ids, max_workers=3)
+            self.assertEqual([person["id"] for person in persons], ids)
+            self.assertEqual(mock.call_count, 4)
+
+    def test_iter_all(self):
+        with requests_mock.mock() as mock:
+            for page, ids in enumerate([["t1", "t2"], ["t3", "t4"], ["t5"]]):
+                mock.get(
+                    client.get_full_url(
+                        "data/tasks?project_id=p1&page=%s&limit=2" % (page + 1)
+                    ),
+                    text=json.dumps(
+                        {
+                            "data": [{"id": task_id} for task_id in ids],
+                            "nb_pages": 3,
+                            "page": page + 1,
+                        }
+                    ),
+                )
+            for prefetch in [False, True]:
+                tasks = client.iter_all(
+                    "tasks",
+                    {"project_id": "p1"},
+                    page_size=2,
+                    prefetch=prefetch,
+                )
+                self.assertEqual(
+                    [task["id"] for task in tasks],
+                    ["t1", "t2", "t3", "t4", "t5"],
+                )
+
+    def test_iter_all_without_pagination(self):
+        with requests_mock.mock() as mock:
+            mock.get(
+                client.get_full_url("data/persons?page=1&limit=100"),
+                text=json.dumps([{"id": "person-%s" % i} for i in range(50)]),
+            )
+            persons = client.iter_all("persons")
+            self.assertEqual(next(persons)["id"], "person-0")
+            self.assertEqual(len(list(persons)), 49)
+
+    def test_iter_json_array(self):
+        document = json.dumps([{"name": "a]"}, 12345, 1.5e3, None, [1, 2]])
+        for size in [1, 3, 100]:
+            chunks = [
+                document[index : index + size]
+                for index in range(0, len(document), size)
+            ]
+            self.assertEqual(
+                list(client.iter_json_array(chunks)), json.loads(document)
+            )
+        self.assertRaises(
+            ValueError, list, client.iter_json_array(['{"id": 1}'])
+        )
+
     def test_set_tokens(self):
         pass
 
@@ -91,6 +387,31 @@ class BaseFuncTestCase(ClientTestCase):
                 client.post("data/persons", {"birth_date": now}),
                 {"id": "person-01", "first_name": "John"},
             )
+            self.assertEqual(
+                mock.last_request.json(), {"birth_date": now.isoformat()}
+            )
+
+    def test_set_json_codec(self):
+        codec_name = gazu.encoder.get_json_codec()
+        now = datetime.datetime(2020, 1, 2, 3, 4, 5)
+        try:
+            self.assertEqual(gazu.encoder.set_json_codec("json"), "json")
+            self.assertEqual(gazu.encoder.get_json_codec(), "json")
+            self.assertEqual(
+                gazu.encoder.loads(
+                    gazu.encoder.dumps({"date": now}).encode("utf-8")
+                ),
+                {"date": "2020-01-02T03:04:05"},
+            )
+            self.assertIn(
+                gazu.encoder.set_json_codec("auto"),
+                ["orjson", "ujson", "json"],
+            )
+            self.assertRaises(
+                ValueError, gazu.encoder.set_json_codec, "yaml"
+            )
+        finally:
+            gazu.encoder.set_json_codec(codec_name)
 
     def test_put(self):
         with requests_mock.mock() as mock:
@@ -190,7 +511,7 @@ class BaseFuncTestCase(ClientTestCase):
                 )
 
                 def verify_file_callback(request):
-                    body_file = io.BytesIO(request.body)
+                    body_file = io.BytesIO(request.body.read())
                     _, pdict = cgi.parse_header(request.headers['Content-Type'])
                     if sys.version_info[0] == 3:
                         pdict["boundary"] = bytes(pdict["boundary"], "UTF-8")
@@ -216,7 +537,7 @@ class BaseFuncTestCase(ClientTestCase):
                 )
 
                 def verify_file_callback(request):
-                    body_file = io.BytesIO(request.body)
+                    body_file = io.BytesIO(request.body.read())
                     _, pdict = cgi.parse_header(request.headers['Content-Type'])
                     if sys.version_info[0] == 3:
                         pdict["boundary"] = bytes(pdict["boundary"], "UTF-8")
@@ -240,6 +561,228 @@ class BaseFuncTestCase(ClientTestCase):
                     extra_files=["./tests/fixtures/v1.png"]
                 )
 
+    def test_upload_streaming(self):
+        other_client = client.create_client("http://other-server/api")
+        client.set_retry_policy(backoff_factor=0, client=other_client)
+        bodies = []
+        progress = []
+
+        def read_body(request, context):
+            bodies.append(b"".join(request.body))
+            context.status_code = 503 if len(bodies) == 1 else 200
+            return '{"id": "preview-1"}'
+
+        with requests_mock.mock() as mock:
+            mock.post(
+                "http://other-server/api/pictures/preview", text=read_body
+            )
+            result = client.upload(
+                "pictures/preview",
+                "./tests/fixtures/v1.png",
+                progress_callback=lambda *args: progress.append(args),
+                retry=True,
+                client=other_client,
+            )
+            self.assertEqual(result["id"], "preview-1")
+            self.assertNotIn("Transfer-Encoding", mock.last_request.headers)
+            client.upload(
+                "pictures/preview",
+                "./tests/fixtures/v1.png",
+                chunked=True,
+                client=other_client,
+            )
+            self.assertEqual(
+                mock.last_request.headers["Transfer-Encoding"], "chunked"
+            )
+        self.assertEqual(len(bodies), 3)
+        self.assertEqual(bodies[0], bodies[1])
+        with open("./tests/fixtures/v1.png", "rb") as test_file:
+            self.assertIn(test_file.read(), bodies[1])
+        self.assertEqual(progress[-1][0], len(bodies[1]))
+        self.assertEqual(progress[-1][1], len(bodies[1]))
+
+    def test_upload_checksum(self):
+        with open("./tests/fixtures/v1.png", "rb") as test_file:
+            data = test_file.read()
+
+        def read_body(request, context):
+            b"".join(request.body)
+            return '{"id": "working-file-1"}'
+
+        with requests_mock.mock() as mock:
+            mock.post(
+                client.get_full_url("data/working-files/file"), text=read_body
+            )
+            file_infos = {}
+            result = client.upload(
+                "data/working-files/file",
+                "./tests/fixtures/v1.png",
+                checksum="sha256",
+                file_infos=file_infos,
+            )
+        self.assertEqual(result, {"id": "working-file-1"})
+        self.assertEqual(file_infos["size"], len(data))
+        self.assertEqual(
+            file_infos["checksum"], hashlib.sha256(data).hexdigest()
+        )
+
+    def serve_ranges(self, data, requested_ranges):
+
+        def callback(request, context):
+            requested_ranges.append(request.headers.get("Range"))
+            if "Range" not in request.headers:
+                return data
+            start, end = request.headers["Range"][6:].split("-")
+            end = int(end) + 1 if end else len(data)
+            context.status_code = 206
+            context.headers["Content-Range"] = "bytes %s-%s/%s" % (
+                start,
+                end - 1,
+                len(data),
+            )
+            return data[int(start) : end]
+
+        return callback
+
+    def test_download_ranges(self):
+        data = bytes(bytearray(range(256))) * 400
+        requested_ranges = []
+        file_path = os.path.join(tempfile.mkdtemp(), "movie.mp4")
+        progress = []
+        min_range_size = client.MIN_RANGE_SIZE
+        client.MIN_RANGE_SIZE = 10000
+        try:
+            with requests_mock.mock() as mock:
+                mock.get(
+                    client.get_full_url("movies/movie.mp4"),
+                    content=self.serve_ranges(data, requested_ranges),
+                )
+                result = client.download(
+                    "movies/movie.mp4",
+                    file_path,
+                    ranges=4,
+                    progress_callback=lambda *args: progress.append(args),
+                )
+        finally:
+            client.MIN_RANGE_SIZE = min_range_size
+        with open(file_path, "rb") as downloaded_file:
+            self.assertEqual(downloaded_file.read(), data)
+        self.assertEqual(result["ranges"], 4)
+        self.assertEqual(result["size"], len(data))
+        self.assertEqual(
+            sorted(requested_ranges[1:]),
+            ["bytes=25600-51199", "bytes=51200-76799", "bytes=76800-102399"],
+        )
+        self.assertEqual(progress[-1][:2], (len(data), len(data)))
+        self.assertFalse(os.path.exists(file_path + ".part"))
+
+    def test_download_resume(self):
+        data = b"0123456789" * 100
+        requested_ranges = []
+        file_path = os.path.join(tempfile.mkdtemp(), "movie.mp4")
+        state = {"size": 1000, "validator": '"v1"', "ranges": [[300, 1000]]}
+        with open(file_path + ".part", "wb") as part_file:
+            part_file.write(data[:300])
+        with open(file_path + ".part.json", "w") as state_file:
+            json.dump(state, state_file)
+        with requests_mock.mock() as mock:
+            mock.get(
+                client.get_full_url("movies/movie.mp4"),
+                content=self.serve_ranges(data, requested_ranges),
+                headers={"ETag": '"v1"'},
+            )
+            result = client.download("movies/movie.mp4", file_path)
+            self.assertEqual(requested_ranges, ["bytes=300-999"])
+            self.assertEqual(mock.last_request.headers["If-Range"], '"v1"')
+            self.assertEqual(result["resumed_bytes"], 300)
+            with open(file_path, "rb") as downloaded_file:
+                self.assertEqual(downloaded_file.read(), data)
+            self.assertFalse(os.path.exists(file_path + ".part.json"))
+
+            # The state is written as soon as the download starts.
+            def interrupt(written, size, throughput):
+                if not os.path.exists(file_path + ".part.json"):
+                    raise AssertionError("No download state")
+                raise RuntimeError("Interrupted")
+
+            self.assertRaises(
+                RuntimeError,
+                client.download,
+                "movies/movie.mp4",
+                file_path,
+                progress_callback=interrupt,
+            )
+            with open(file_path + ".part.json") as state_file:
+                self.assertEqual(json.load(state_file)["validator"], '"v1"')
+
+            # Without state, nothing tells the part file is still valid.
+            del requested_ranges[:]
+            os.remove(file_path + ".part.json")
+            result = client.download("movies/movie.mp4", file_path)
+            self.assertEqual(requested_ranges, ["bytes=0-"])
+            self.assertEqual(result["resumed_bytes"], 0)
+
+            with open(file_path + ".part", "wb") as part_file:
+                part_file.write(b"garbage")
+            mock.get(client.get_full_url("movies/movie.mp4"), content=data)
+            result = client.download("movies/movie.mp4", file_path)
+            self.assertEqual(result["resumed_bytes"], 0)
+            with open(file_path, "rb") as downloaded_file:
+                self.assertEqual(downloaded_file.read(), data)
+
+    def test_download_checksum(self):
+        data = b"0123456789" * 100
+        digest = base64.b64encode(hashlib.md5(data).digest()).decode()
+        file_path = os.path.join(tempfile.mkdtemp(), "movie.mp4")
+        url = client.get_full_url("movies/movie.mp4")
+        with open(file_path + ".part", "wb") as part_file:
+            part_file.write(data[:300])
+        with requests_mock.mock() as mock:
+            mock.get(
+                url,
+                content=self.serve_ranges(data, []),
+                headers={"Repr-Digest": "md5=:%s:" % digest},
+            )
+            result = client.download(
+                "movies/movie.mp4", file_path, checksum="sha256"
+            )
+            self.assertTrue(result["verified"])
+            self.assertEqual(
+                result["checksum"], hashlib.sha256(data).hexdigest()
+            )
+
+            mock.get(url, content=data[::-1], headers={"Content-MD5": digest})
+            self.assertRaises(
+                DownloadFailedException,
+                client.download,
+                "movies/movie.mp4",
+                file_path,
+                resume=False,
+            )
+            self.assertFalse(os.path.exists(file_path + ".part"))
+
+            mock.get(url, content=data)
+            result = client.download("movies/movie.mp4", file_path)
+            self.assertFalse(result["verified"])
+            self.assertIsNone(result["checksum"])
+
+    def test_download_failure_keeps_part_file(self):
+        file_path = os.path.join(tempfile.mkdtemp(), "movie.mp4")
+        with requests_mock.mock() as mock:
+            mock.get(
+                client.get_full_url("movies/movie.mp4"),
+                content=b"01234",
+                headers={"Content-Length": "10"},
+            )
+            self.assertRaises(
+                DownloadFailedException,
+                client.download,
+                "movies/movie.mp4",
+                file_path,
+            )
+        self.assertFalse(os.path.exists(file_path))
+        self.assertEqual(os.path.getsize(file_path + ".part"), 5)
+
     def test_check_status(self):
         class Request(object):
             def __init__(self, status_code):
@@ -293,3 +836,31 @@ class BaseFuncTestCase(ClientTestCase):
             )
             current_user = client.get_current_user()
             self.assertEqual(current_user["id"], "123")
+
+    def test_kitsu_client(self):
+        other_client = gazu.create_client("http://other-server/api")
+        other_client.tokens = {"access_token": "othertoken"}
+        with requests_mock.mock() as mock:
+            mock.get(
+                "http://other-server/api/data/projects/open",
+                text=json.dumps([{"name": "Agent 327", "id": "project-1"}]),
+            )
+            mock.get(
+                client.get_full_url("data/projects/open"),
+                text=json.dumps(
+                    [{"name": "Big Buck Bunny", "id": "project-2"}]
+                ),
+            )
+            projects = gazu.project.all_open_projects(client=other_client)
+            self.assertEqual(projects[0]["id"], "project-1")
+            self.assertEqual(
+                mock.last_request.headers["Authorization"], "Bearer othertoken"
+            )
+            projects = gazu.project.all_open_projects()
+            self.assertEqual(projects[0]["id"], "project-2")
+
+        gazu.set_host("http://another-server/api", client=other_client)
+        self.assertEqual(
+            gazu.get_host(client=other_client), "http://another-server/api"
+        )
+        self.assertNotEqual(gazu.get_host(), "http://another-server/api")
@@ -1,4 +1,5 @@
 import datetime
+import hashlib
 import json
 import os
 import requests_mock
@@ -629,6 +630,97 @@ class FilesTestCase(unittest.TestCase):
             )["file_tree"]
             self.assertEqual(file_tree["name"], "standard file tree")
 
+    def test_upload_working_files_bulk(self):
+        progress = []
+
+        def read_body(request, context):
+            b"".join(request.body)
+            return json.dumps({})
+
+        with requests_mock.mock() as mock:
+            for index in range(4):
+                mock.post(
+                    gazu.client.get_full_url(
+                        "data/working-files/%s/file"
+                        % fakeid("working-file-%s" % index)
+                    ),
+                    text=read_body,
+                )
+            report = gazu.files.upload_working_files_bulk(
+                [
+                    (
+                        fakeid("working-file-%s" % index),
+                        "./tests/fixtures/v1.png",
+                    )
+                    for index in range(4)
+                ],
+                max_workers=2,
+                progress_callback=lambda *args: progress.append(args),
+                chunked=True,
+            )
+            self.assertEqual(
+                mock.last_request.headers["Transfer-Encoding"], "chunked"
+            )
+            self.assertEqual(
+                len([args for args in progress if args[0] == args[1]]), 4
+            )
+            self.assertEqual(report["succeeded"], 4)
+            self.assertEqual(report["failed"], 0)
+            self.assertEqual(
+                report["results"][3]["result"],
+                {"id": fakeid("working-file-3")},
+            )
+            self.assertEqual(mock.call_count, 4)
+
+    def test_upload_working_file_checksum(self):
+        with open("./tests/fixtures/v1.png", "rb") as test_file:
+            data = test_file.read()
+
+        def read_body(request, context):
+            b"".join(request.body)
+            return json.dumps({})
+
+        with requests_mock.mock() as mock:
+            mock.post(
+                gazu.client.get_full_url(
+                    "data/working-files/%s/file" % fakeid("working-file-1")
+                ),
+                text=read_body,
+            )
+            mock.post(
+                gazu.client.get_full_url(
+                    "data/files/%s/dependent-files/new"
+                    % fakeid("output-file-1")
+                ),
+                text=json.dumps({"id": fakeid("dependent-file-1")}),
+            )
+            file_infos = {}
+            working_file = gazu.files.upload_working_file(
+                fakeid("working-file-1"),
+                "./tests/fixtures/v1.png",
+                checksum="md5",
+                file_infos=file_infos,
+            )
+            self.assertEqual(working_file, {"id": fakeid("working-file-1")})
+            gazu.files.new_dependent_file(
+                fakeid("output-file-1"),
+                "/path/v1.png",
+                checksum=file_infos["checksum"],
+                size=file_infos["size"],
+            )
+            self.assertEqual(
+                mock.last_request.json(),
+                {
+                    "path": "/path/v1.png",
+                    "checksum": hashlib.md5(data).hexdigest(),
+                    "size": len(data),
+                },
+            )
+            gazu.files.new_dependent_file(
+                fakeid("output-file-1"), "/path/v1.png"
+            )
+            self.assertNotIn("checksum", mock.last_request.json())
+
     def test_download_preview_file(self):
         with open("./tests/fixtures/v1.png", "rb") as thumbnail_file:
             with requests_mock.mock() as mock:
@@ -1,9 +1,12 @@
 import unittest
 import requests_mock
+import gazu.cache
 import gazu.client
 import gazu.project
 import json
 
+from utils import fakeid
+
 
 class ProjectTestCase(unittest.TestCase):
     def test_all(self):
@@ -44,6 +47,81 @@ class ProjectTestCase(unittest.TestCase):
             project = gazu.project.get_project_by_name("Test")
             self.assertEqual(project["name"], "Test")
 
+    def test_update_project_data_read_only(self):
+        with requests_mock.mock() as mock:
+            mock.get(
+                gazu.client.get_full_url(
+                    "data/projects/%s" % fakeid("project-01")
+                ),
+                text=json.dumps(
+                    {
+                        "name": "Agent 327",
+                        "id": fakeid("project-01"),
+                        "data": {"a": 1},
+                    }
+                ),
+            )
+            mock.put(
+                gazu.client.get_full_url(
+                    "data/projects/%s" % fakeid("project-01")
+                ),
+                text=json.dumps({"id": fakeid("project-01")}),
+            )
+            gazu.cache.enable(read_only=True)
+            try:
+                gazu.project.get_project.clear_cache()
+                gazu.project.update_project_data(
+                    fakeid("project-01"), {"b": 2}
+                )
+                self.assertEqual(
+                    mock.last_request.json(),
+                    {"id": fakeid("project-01"), "data": {"a": 1, "b": 2}},
+                )
+                self.assertEqual(
+                    gazu.project.get_project(fakeid("project-01"))["data"],
+                    {"a": 1},
+                )
+            finally:
+                gazu.project.get_project.clear_cache()
+                gazu.cache.disable()
+
+    def test_close_project_read_only(self):
+        with requests_mock.mock() as mock:
+            mock.get(
+                gazu.client.get_full_url("data/projects/project-01"),
+                text=json.dumps({"name": "Agent 327", "id": "project-01"}),
+            )
+            mock.get(
+                gazu.client.get_full_url("data/project-status"),
+                text=json.dumps(
+                    [
+                        {"name": "Open", "id": "status-1"},
+                        {"name": "Closed", "id": "status-2"},
+                    ]
+                ),
+            )
+            mock.put(
+                gazu.client.get_full_url("data/projects/project-01"),
+                text=json.dumps({"id": "project-01"}),
+            )
+            gazu.cache.enable(read_only=True)
+            try:
+                gazu.project.get_project.clear_cache()
+                gazu.project.all_project_status.clear_cache()
+                project = gazu.project.get_project("project-01")
+                closed_project = gazu.project.close_project(project)
+                self.assertEqual(
+                    closed_project["project_status_id"], "status-2"
+                )
+                self.assertEqual(
+                    mock.last_request.json()["project_status_id"], "status-2"
+                )
+                self.assertNotIn("project_status_id", project)
+            finally:
+                gazu.project.get_project.clear_cache()
+                gazu.project.all_project_status.clear_cache()
+                gazu.cache.disable()
+
     def test_remove_project(self):
         with requests_mock.mock() as mock:
             mock = mock.delete(
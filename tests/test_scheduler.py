@@ -0,0 +1,159 @@
+import os
+import tempfile
+import threading
+import time
+import unittest
+
+import requests_mock
+
+from gazu import client, scheduler
+
+
+class SchedulerTestCase(unittest.TestCase):
+    def tearDown(self):
+        scheduler.default_scheduler = scheduler.TransferScheduler()
+
+    def test_max_transfers(self):
+        transfer_scheduler = scheduler.TransferScheduler(max_transfers=2)
+        running = []
+        max_running = []
+        lock = threading.Lock()
+
+        def run():
+            with transfer_scheduler.transfer():
+                with lock:
+                    running.append(1)
+                    max_running.append(len(running))
+                time.sleep(0.02)
+                with lock:
+                    running.pop()
+
+        threads = [threading.Thread(target=run) for _ in range(6)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        self.assertEqual(max(max_running), 2)
+        stats = transfer_scheduler.get_stats()
+        self.assertEqual(stats["transfers"], 6)
+        self.assertEqual(stats["active"], 0)
+        self.assertEqual(stats["queue_depth"], 0)
+        self.assertGreaterEqual(stats["max_queue_depth"], 4)
+
+    def test_priorities(self):
+        transfer_scheduler = scheduler.TransferScheduler(max_transfers=1)
+        started = []
+        threads = []
+        transfer_scheduler.acquire()
+
+        def run(priority):
+            with transfer_scheduler.transfer(priority):
+                started.append(priority)
+
+        for priority in ["bulk", "normal", "bulk", "interactive"]:
+            thread = threading.Thread(target=run, args=(priority,))
+            thread.start()
+            threads.append(thread)
+            while transfer_scheduler.get_queue_depth() < len(threads):
+                time.sleep(0.001)
+        self.assertEqual(
+            transfer_scheduler.get_stats()["queued"],
+            {"interactive": 1, "normal": 1, "bulk": 2},
+        )
+        transfer_scheduler.release()
+        for thread in threads:
+            thread.join()
+        self.assertEqual(started, ["interactive", "normal", "bulk", "bulk"])
+        with self.assertRaises(ValueError):
+            transfer_scheduler.acquire("urgent")
+
+    def test_interrupted_acquire(self):
+        transfer_scheduler = scheduler.TransferScheduler(max_transfers=1)
+        transfer_scheduler.acquire()
+
+        def interrupt(timeout=None):
+            raise KeyboardInterrupt()
+
+        transfer_scheduler.condition.wait = interrupt
+        with self.assertRaises(KeyboardInterrupt):
+            transfer_scheduler.acquire("interactive")
+        del transfer_scheduler.condition.wait
+        self.assertEqual(transfer_scheduler.get_queue_depth(), 0)
+
+        transfer_scheduler.release()
+        thread = threading.Thread(target=transfer_scheduler.acquire)
+        thread.start()
+        thread.join(5)
+        self.assertFalse(thread.is_alive())
+        self.assertEqual(transfer_scheduler.get_stats()["active"], 1)
+
+    def test_enqueue(self):
+        transfer_scheduler = scheduler.TransferScheduler(max_transfers=1)
+        woken = []
+        transfer_scheduler.acquire()
+        first = transfer_scheduler.enqueue("normal", lambda: woken.append(1))
+        second = transfer_scheduler.enqueue("bulk", lambda: woken.append(2))
+        self.assertFalse(transfer_scheduler.start(first))
+        transfer_scheduler.release()
+        self.assertEqual(woken, [1, 2])
+        self.assertFalse(transfer_scheduler.start(second))
+        transfer_scheduler.cancel(first)
+        self.assertTrue(transfer_scheduler.start(second))
+        stats = transfer_scheduler.get_stats()
+        self.assertEqual(stats["active"], 1)
+        self.assertEqual(stats["queue_depth"], 0)
+
+    def test_thread_priority(self):
+        self.assertEqual(scheduler.get_thread_priority(), "normal")
+        previous = scheduler.set_thread_priority("bulk")
+        self.assertEqual(previous, "normal")
+        self.assertEqual(scheduler.get_thread_priority(), "bulk")
+        scheduler.set_thread_priority(previous)
+        self.assertEqual(scheduler.get_thread_priority(), "normal")
+
+        priorities = client.run_bulk(
+            lambda: scheduler.get_thread_priority(), [()]
+        )
+        self.assertEqual(priorities["results"][0]["result"], "bulk")
+
+    def test_bandwidth_limit(self):
+        transfer_scheduler = scheduler.TransferScheduler(
+            max_bytes_per_second=10000
+        )
+        start = time.time()
+        for _ in range(3):
+            transfer_scheduler.consume(10000)
+        self.assertGreaterEqual(time.time() - start, 0.15)
+        stats = transfer_scheduler.get_stats()
+        self.assertEqual(stats["bytes"], 30000)
+        self.assertGreater(stats["throttle_time"], 0)
+
+    def test_reserve(self):
+        transfer_scheduler = scheduler.TransferScheduler(
+            max_bytes_per_second=10000
+        )
+        start = time.time()
+        self.assertEqual(transfer_scheduler.reserve(5000), 0.0)
+        self.assertAlmostEqual(
+            transfer_scheduler.reserve(15000), 1.0, delta=0.1
+        )
+        self.assertLess(time.time() - start, 0.1)
+        self.assertEqual(transfer_scheduler.get_stats()["bytes"], 20000)
+
+    def test_transfers_are_scheduled(self):
+        scheduler.set_limits(max_transfers=1)
+        data = b"0123456789" * 100
+        file_path = os.path.join(tempfile.mkdtemp(), "movie.mp4")
+        with requests_mock.mock() as mock:
+            mock.get(client.get_full_url("movies/movie.mp4"), content=data)
+            mock.post(
+                client.get_full_url("pictures/preview"),
+                text=lambda request, context: request.body.read() and "{}",
+            )
+            client.download("movies/movie.mp4", file_path)
+            client.upload("pictures/preview", file_path)
+        stats = scheduler.get_stats()
+        self.assertEqual(stats["transfers"], 2)
+        self.assertGreater(stats["bytes"], 2 * len(data))
+        self.assertGreater(stats["throughput"], 0)
+        self.assertEqual(stats["max_transfers"], 1)
@@ -1,3 +1,4 @@
+import os
 import unittest
 import json
 import requests_mock
@@ -437,3 +438,50 @@ class TaskTestCase(unittest.TestCase):
             self.assertEqual(
                 gazu.task.set_main_preview(preview_file), result
             )
+
+    def test_add_previews_bulk(self):
+        with requests_mock.mock() as mock:
+            for index in range(3):
+                mock.post(
+                    gazu.client.get_full_url(
+                        "actions/tasks/%s/comments/%s/add-preview"
+                        % (
+                            fakeid("task-%s" % index),
+                            fakeid("comment-%s" % index),
+                        )
+                    ),
+                    text=json.dumps({"id": "preview-%s" % index}),
+                )
+                mock.post(
+                    gazu.client.get_full_url(
+                        "pictures/preview-files/preview-%s" % index
+                    ),
+                    status_code=500 if index == 1 else 200,
+                    text=json.dumps({}),
+                )
+            report = gazu.task.add_previews_bulk(
+                [
+                    (
+                        fakeid("task-%s" % index),
+                        fakeid("comment-%s" % index),
+                        "./tests/fixtures/v1.png",
+                    )
+                    for index in range(3)
+                ],
+                max_workers=3,
+            )
+            self.assertEqual(report["succeeded"], 2)
+            self.assertEqual(report["failed"], 1)
+            self.assertEqual(
+                report["results"][0]["result"], {"id": "preview-0"}
+            )
+            self.assertIsInstance(
+                report["results"][1]["error"],
+                gazu.client.ServerErrorException,
+            )
+            self.assertEqual(
+                report["results"][2]["item"][2], "./tests/fixtures/v1.png"
+            )
+            self.assertEqual(
+                report["bytes"], 2 * os.path.getsize("./tests/fixtures/v1.png")
+            )